@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Benchmarks of vrfy's hot paths on synthetic directory trees.
+
+Usage:
+    python benchmarks/vrfyBench.py [--scale 0.5] [--output results.json] [--baseline baseline.json]
+
+Trees are built in a temporary directory, i.e. files are read from the page cache (warm cache numbers).
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+# benchmark the working tree, not an installed vrfy package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vrfy.vrfy import vrfy  # noqa: E402
+from vrfy.manifest import manifest  # noqa: E402
+from vrfy.hasher import hasher  # noqa: E402
+
+
+class vrfyBench:
+    BASELINE_VERSION = 1
+    # name: (number of directories, files per directory, file size, nesting depth of directories)
+    TREES = {
+        "small": (100, 100, 4 * 1024, 1),
+        "large": (1, 4, 64 * 1024 * 1024, 1),
+        "deep": (200, 2, 16 * 1024, 200),
+        "wide": (2000, 2, 16 * 1024, 1),
+    }
+    PARSER_ENTRIES = 200000
+    DEFAULT_TOLERANCE = 0.10
+
+    def __init__(self, workDir: str, scale: float = 1.0, repeat: int = 3, jobs: int = 1,
+                 algorithm: str = hasher.DEFAULT_ALGORITHM):
+        """
+        Parameters:
+            workDir (str): Directory the synthetic trees are created in.
+            scale (float): Factor applied to number of directories and size of files.
+            repeat (int): Number of runs per benchmark, the fastest run is reported.
+            jobs (int): Number of concurrent hashing jobs passed to vrfy.
+            algorithm (str): Hash algorithm passed to vrfy.
+        """
+        self.WorkDir = workDir
+        self.Scale = scale
+        self.Repeat = max(1, int(repeat))
+        self.Jobs = jobs
+        self.Algorithm = algorithm
+
+    def Run(self, treeNames: list) -> dict:
+        """
+        Builds the trees >>treeNames<< and runs all benchmarks.
+
+        Returns:
+            dict: dict[benchmark name] = {"seconds", "files", "bytes", "mb_per_s", "files_per_s", "peak_rss_mb"}.
+        """
+        results = dict()
+        for treeName in treeNames:
+            master, backup, numFiles, numBytes = self.__buildTree__(treeName)
+            results[treeName + "/WriteChecksumFile"] = self.__measure__(
+                lambda: self.__walk__(master, master, "WriteChecksumFile"), numFiles, numBytes)
+            results[treeName + "/VerifyFilesAgainstChecksums"] = self.__measure__(
+                lambda: self.__walk__(master, master, "VerifyFilesAgainstChecksums"), numFiles, numBytes)
+            # sums.csv files were written to master only, remove them so that both trees match
+            self.__removeSums__(master)
+            results[treeName + "/VerifyFiles"] = self.__measure__(
+                lambda: self.__walk__(master, backup, "VerifyFiles"), 2 * numFiles, 2 * numBytes)
+        results.update(self.__runParsers__())
+        return results
+
+    @classmethod
+    def Compare(cls, results: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> list:
+        """
+        Compares >>results<< with a baseline report written by main().
+
+        Returns:
+            list: Names of benchmarks that are slower than the baseline by more than >>tolerance<< (fraction).
+        """
+        regressions = []
+        baseResults = baseline.get("results", dict())
+        for name, result in sorted(results.items()):
+            if name not in baseResults:
+                print(name + ": no baseline")
+                continue
+            baseSeconds = baseResults[name]["seconds"]
+            change = (result["seconds"] - baseSeconds) / baseSeconds if baseSeconds > 0 else 0.0
+            status = ""
+            if change > tolerance:
+                status = "  REGRESSION"
+                regressions.append(name)
+            print("{:<40} {:9.4f}s -> {:9.4f}s ({:+6.1f}%){}".format(name, baseSeconds, result["seconds"],
+                                                                      change * 100.0, status))
+        return regressions
+
+    def __walk__(self, pathMaster: str, pathBackup: str, methodName: str) -> None:
+        """
+        Runs vrfy method >>methodName<< recursively, like the CLI does.
+        """
+        with vrfy(jobs=self.Jobs, algorithm=self.Algorithm, fullHash=True) as vf:
+            for resultObject in vf.Walk(pathMaster, pathBackup, getattr(vf, methodName)):
+                pass
+
+    def __runParsers__(self) -> dict:
+        """
+        Times the checksum file parsers on files with PARSER_ENTRIES entries.
+        """
+        numEntries = max(1, int(self.PARSER_ENTRIES * self.Scale))
+        parserDir = os.path.join(self.WorkDir, "parsers")
+        os.makedirs(parserDir, exist_ok=True)
+        digest = "0" * 64
+        with open(os.path.join(parserDir, "sums.csv"), "w") as f:
+            f.write(vrfy.SUMS_HEADER + ";" + str(vrfy.SUMS_VERSION) + ";" + hasher.ALGORITHM_SHA256 + "\n")
+            for index in range(numEntries):
+                f.write("file" + str(index) + ".bin;" + digest + ";4096;1700000000000000000\n")
+        with open(os.path.join(parserDir, "data.sha256sum"), "w") as f:
+            for index in range(numEntries):
+                f.write(digest + "  file" + str(index) + ".bin\n")
+        with open(os.path.join(parserDir, manifest.FILE_NAME), "w") as f:
+            f.write(manifest.HEADER + ";" + str(manifest.VERSION) + ";" + hasher.ALGORITHM_SHA256 + "\n")
+            for index in range(numEntries):
+                f.write("dir" + str(index // 100) + "/file" + str(index) + ".bin;" + digest +
+                        ";4096;1700000000000000000\n")
+
+        vf = vrfy()
+        results = dict()
+        for name, fileName, func in (
+                ("sums.csv", "sums.csv", lambda: vf.__readSumsCsvFile__(parserDir)),
+                ("sha256sum", "data.sha256sum",
+                 lambda: vf.__getChecksumsFromFile__(os.path.join(parserDir, "data.sha256sum"))),
+                ("manifest", manifest.FILE_NAME, lambda: manifest.Read(parserDir))):
+            fileSize = os.path.getsize(os.path.join(parserDir, fileName))
+            results["parser/" + name] = self.__measure__(func, numEntries, fileSize)
+        vf.Close()
+        return results
+
+    def __measure__(self, func, numFiles: int, numBytes: int) -> dict:
+        """
+        Runs >>func<< >>Repeat<< times and returns timing and memory figures of the fastest run.
+        """
+        best = None
+        self.__resetPeakRss__()
+        for run in range(self.Repeat):
+            start = time.perf_counter()
+            func()
+            seconds = time.perf_counter() - start
+            best = seconds if best is None else min(best, seconds)
+        return {"seconds": best, "files": numFiles, "bytes": numBytes,
+                "mb_per_s": numBytes / best / 1e6 if best > 0 else 0.0,
+                "files_per_s": numFiles / best if best > 0 else 0.0,
+                "peak_rss_mb": self.__peakRss__() / 1024.0}
+
+    def __buildTree__(self, treeName: str) -> tuple:
+        """
+        Creates master and backup copies of tree >>treeName<<.
+
+        Returns:
+            master, backup, numFiles, numBytes (str, str, int, int): Tuple. Paths and size of one copy.
+        """
+        numDirs, filesPerDir, fileSize, depth = self.TREES[treeName]
+        numDirs = max(1, int(numDirs * self.Scale)) if depth == 1 else max(1, int(depth * self.Scale))
+        fileSize = max(1, int(fileSize * self.Scale))
+        master = os.path.join(self.WorkDir, treeName, "master")
+        backup = os.path.join(self.WorkDir, treeName, "backup")
+        numFiles = 0
+        for index in range(numDirs):
+            if depth == 1:
+                relPath = "d" + str(index)
+            else:
+                # nested chain d0/d1/.../dN
+                relPath = os.path.join(*["d" + str(level) for level in range(index + 1)])
+            os.makedirs(os.path.join(master, relPath), exist_ok=True)
+            for fileIndex in range(filesPerDir):
+                with open(os.path.join(master, relPath, "f" + str(fileIndex) + ".bin"), "wb") as f:
+                    f.write(os.urandom(fileSize))
+                numFiles += 1
+        shutil.copytree(master, backup)
+        return master, backup, numFiles, numFiles * fileSize
+
+    @staticmethod
+    def __removeSums__(path: str) -> None:
+        """
+        Removes all sums.csv files below >>path<<.
+        """
+        for dirPath, dirNames, fileNames in os.walk(path):
+            if "sums.csv" in fileNames:
+                os.remove(os.path.join(dirPath, "sums.csv"))
+
+    @staticmethod
+    def __resetPeakRss__() -> None:
+        """
+        Resets the peak resident set size of the process (Linux only, ignored elsewhere).
+        """
+        try:
+            with open("/proc/self/clear_refs", "w") as f:
+                f.write("5")
+        except OSError:
+            pass
+
+    @staticmethod
+    def __peakRss__() -> float:
+        """
+        Returns the peak resident set size of the process in KiB.
+        """
+        try:
+            with open("/proc/self/status") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        return float(line.split()[1])
+        except OSError:
+            pass
+        return float(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks of vrfy's hashing, tree walk and parsers.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Scale number of directories and file sizes")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark, the fastest is reported")
+    parser.add_argument("--trees", nargs="+", choices=sorted(vrfyBench.TREES.keys()),
+                        default=sorted(vrfyBench.TREES.keys()), help="Synthetic trees to benchmark")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Number of files hashed concurrently")
+    parser.add_argument("-a", "--algorithm", choices=hasher.ALGORITHMS, default=hasher.DEFAULT_ALGORITHM)
+    parser.add_argument("--workdir", help="Directory for synthetic trees (default: temporary directory)")
+    parser.add_argument("--output", help="Write results as JSON, e.g. to be used as baseline")
+    parser.add_argument("--baseline", help="Compare results against a JSON file written with --output")
+    parser.add_argument("--tolerance", type=float, default=vrfyBench.DEFAULT_TOLERANCE,
+                        help="Slowdown (fraction) reported as regression (default: 0.1)")
+    args = parser.parse_args()
+
+    workDir = tempfile.mkdtemp(prefix="vrfybench-", dir=args.workdir)
+    try:
+        bench = vrfyBench(workDir, scale=args.scale, repeat=args.repeat, jobs=args.jobs, algorithm=args.algorithm)
+        results = bench.Run(args.trees)
+    finally:
+        shutil.rmtree(workDir, ignore_errors=True)
+
+    print("{:<40} {:>10} {:>10} {:>12} {:>10}".format("benchmark", "seconds", "MB/s", "files/s", "peak MB"))
+    for name, result in sorted(results.items()):
+        print("{:<40} {:10.4f} {:10.1f} {:12.1f} {:10.1f}".format(name, result["seconds"], result["mb_per_s"],
+                                                                  result["files_per_s"], result["peak_rss_mb"]))
+
+    report = {"version": vrfyBench.BASELINE_VERSION, "vrfy": vrfy.VERSION_STR, "python": platform.python_version(),
+              "platform": platform.platform(), "scale": args.scale, "jobs": args.jobs, "algorithm": args.algorithm,
+              "results": results}
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("scale") != args.scale:
+            print("WARNING: Baseline was recorded with scale " + str(baseline.get("scale")))
+        print()
+        regressions = vrfyBench.Compare(results, baseline, args.tolerance)
+        if len(regressions) > 0:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
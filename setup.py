@@ -27,6 +27,11 @@ setup(
 
     python_requires=">=3.7",
 
+    extras_require={
+        'blake3': ['blake3'],
+        'xxhash': ['xxhash'],
+    },
+
     keywords=["vrfy", "verify", "check", "directory", "hash"],
 
     classifiers=["Development Status :: 4 - Beta",
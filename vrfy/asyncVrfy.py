@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+import asyncio
+import concurrent.futures
+import os
+from vrfy.vrfy import vrfy
+from vrfy.hashCache import hashCache
+
+
+class weightedSemaphore:
+    """
+    Semaphore for asyncio whose permits are acquired and released in amounts, e.g. bytes. Requests larger than the
+    capacity are granted alone, so that they can not block forever.
+    """
+    def __init__(self, capacity: int):
+        """
+        Parameters:
+            capacity (int): Number of permits.
+        """
+        self.Capacity = max(1, int(capacity))
+        self.__used = 0
+        self.__condition = None
+
+    async def Acquire(self, amount: int) -> int:
+        """
+        Waits until >>amount<< permits are available and acquires them.
+
+        Returns:
+            int: Number of acquired permits, to be passed to Release().
+        """
+        amount = min(max(0, int(amount)), self.Capacity)
+        condition = self.__getCondition__()
+        async with condition:
+            await condition.wait_for(lambda: self.__used + amount <= self.Capacity)
+            self.__used += amount
+        return amount
+
+    async def Release(self, amount: int) -> None:
+        """
+        Releases >>amount<< permits returned by Acquire().
+        """
+        condition = self.__getCondition__()
+        async with condition:
+            self.__used -= amount
+            condition.notify_all()
+
+    def __getCondition__(self) -> asyncio.Condition:
+        """
+        Returns the condition variable, created on first use within the running event loop.
+        """
+        if self.__condition is None:
+            self.__condition = asyncio.Condition()
+        return self.__condition
+
+
+class loopExecutor:
+    """
+    Executor for vrfy, which is called from a worker thread and runs the hashing jobs of one operation on a thread
+    pool, scheduled by the event loop. Each job waits for its share of the open file and bytes in flight limits.
+    """
+    def __init__(self, loop, pool: concurrent.futures.Executor, openFiles: weightedSemaphore,
+                 bytesInFlight: weightedSemaphore):
+        """
+        Parameters:
+            loop (asyncio.AbstractEventLoop): Event loop the jobs are scheduled on.
+            pool (concurrent.futures.Executor): Thread pool the jobs are executed on.
+            openFiles (weightedSemaphore): Limit of concurrently opened files.
+            bytesInFlight (weightedSemaphore): Limit of bytes of concurrently processed files.
+        """
+        self.__loop = loop
+        self.__pool = pool
+        self.__openFiles = openFiles
+        self.__bytesInFlight = bytesInFlight
+        self.__futures = []
+        self.__cancelled = False
+
+    def Map(self, func, items: list, fileStats: list = None) -> list:
+        """
+        Applies >>func<< to all >>items<< and returns the results in the order of >>items<<. Blocks the calling
+        thread, which must not be the thread of the event loop. >>fileStats<< is not used.
+
+        Raises:
+            concurrent.futures.CancelledError: The operation was cancelled.
+        """
+        if self.__cancelled:
+            raise concurrent.futures.CancelledError()
+        futures = self.__futures = []
+        for item in items:
+            numFiles, numBytes = self.__cost__(item)
+            futures.append(asyncio.run_coroutine_threadsafe(self.__run__(func, item, numFiles, numBytes), self.__loop))
+        try:
+            if self.__cancelled:
+                raise concurrent.futures.CancelledError()
+            return [future.result() for future in futures]
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+        finally:
+            self.__futures = []
+
+    def Cancel(self) -> None:
+        """
+        Cancels all pending jobs. Running and further calls of Map() raise concurrent.futures.CancelledError.
+        """
+        self.__cancelled = True
+        for future in list(self.__futures):
+            future.cancel()
+
+    def Close(self) -> None:
+        # the thread pool is owned by asyncVrfy
+        pass
+
+    async def __run__(self, func, item, numFiles: int, numBytes: int):
+        """
+        Executes a single job on the thread pool, once its limits were acquired.
+        """
+        files = await self.__openFiles.Acquire(numFiles)
+        try:
+            size = await self.__bytesInFlight.Acquire(numBytes)
+            try:
+                job = self.__loop.run_in_executor(self.__pool, func, item)
+                try:
+                    return await asyncio.shield(job)
+                except asyncio.CancelledError:
+                    # keep limits acquired until the job really finished
+                    await asyncio.wait([job])
+                    raise
+            finally:
+                await self.__bytesInFlight.Release(size)
+        finally:
+            await self.__openFiles.Release(files)
+
+    @staticmethod
+    def __cost__(item) -> tuple:
+        """
+        Returns the number of files opened and bytes read by a job, e.g. a file path or a tuple of file paths.
+        """
+        paths = [item] if isinstance(item, str) else [value for value in item if isinstance(value, str)]
+        numBytes = 0
+        for path in paths:
+            try:
+                numBytes += os.stat(path).st_size
+            except OSError:
+                pass
+        return len(paths), numBytes
+
+
+class asyncVrfy:
+    """
+    asyncio counterpart of vrfy: Operations run in worker threads and return the same vrfy.Result objects, hashing jobs
+    are limited by the number of open files and the number of bytes in flight. Cancelling an operation stops it before
+    its next hashing job.
+    """
+    DEFAULT_MAX_OPEN_FILES = 64
+    DEFAULT_MAX_BYTES_IN_FLIGHT = 256 * 1024 * 1024
+
+    def __init__(self, jobs: int = 4, maxOpenFiles: int = DEFAULT_MAX_OPEN_FILES,
+                 maxBytesInFlight: int = DEFAULT_MAX_BYTES_IN_FLIGHT, cache: hashCache = None, **options):
+        """
+        Parameters:
+            jobs (int): Number of files that get hashed concurrently, and number of concurrently executed operations.
+            maxOpenFiles (int): Maximum number of files opened concurrently for hashing.
+            maxBytesInFlight (int): Maximum total size of files hashed concurrently. Larger files are hashed alone.
+            cache (hashCache): Optional persistent hash cache, shared by all operations.
+            options: Further keyword arguments of vrfy(), e.g. algorithm or compare.
+        """
+        if "jobs" in options or "executor" in options:
+            raise ValueError("Executor options are not supported by asyncVrfy")
+        self.Jobs = max(1, int(jobs))
+        self.__cache = cache
+        self.__options = options
+        # validate options, with an executor that owns no threads (the instance holds no resources to close)
+        vrfy(executor=loopExecutor(None, None, None, None), **options)
+        self.__openFiles = weightedSemaphore(maxOpenFiles)
+        self.__bytesInFlight = weightedSemaphore(maxBytesInFlight)
+        self.__hashPool = concurrent.futures.ThreadPoolExecutor(max_workers=self.Jobs)
+        self.__operationPool = concurrent.futures.ThreadPoolExecutor(max_workers=self.Jobs)
+
+    async def Close(self) -> None:
+        """
+        Waits for running operations, releases worker threads and closes the hash cache.
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.__operationPool.shutdown)
+        await loop.run_in_executor(None, self.__hashPool.shutdown)
+        if self.__cache is not None:
+            await loop.run_in_executor(None, self.__cache.Close)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, excType, excValue, traceback):
+        await self.Close()
+
+    def GetVersion(self) -> str:
+        """
+        Returns version string.
+        """
+        return vrfy.VERSION_STR
+
+    async def VerifyFile(self, filePath: str, expectedChecksum: str = "") -> vrfy.Result:
+        """
+        Verifies the contents of file "filePath" against the checksum provided with "expectedChecksum".
+        See vrfy.VerifyFile().
+        """
+        return await self.__execute__("VerifyFile", filePath, expectedChecksum)
+
+    async def VerifyFileList(self, filePaths: list, expectedChecksum: str = "") -> vrfy.Result:
+        """
+        Verifies the contents of all files in >>filePaths<< against one checksum file or checksum value.
+        See vrfy.VerifyFileList().
+        """
+        return await self.__execute__("VerifyFileList", list(filePaths), expectedChecksum)
+
+    async def VerifyFilesAgainstChecksums(self, path: str) -> vrfy.Result:
+        """
+        Verifies the contents of directory >>path<< against the included checksums in sums.csv.
+        See vrfy.VerifyFilesAgainstChecksums().
+        """
+        return await self.__execute__("VerifyFilesAgainstChecksums", path)
+
+    async def WriteChecksumFile(self, path: str, update: bool = False) -> vrfy.Result:
+        """
+        Creates file sums.csv with checksums for files in >>path<<. See vrfy.WriteChecksumFile().
+        """
+        return await self.__execute__("WriteChecksumFile", path, None, update)
+
+    async def VerifyFiles(self, pathMaster: str, pathBackup: str) -> vrfy.Result:
+        """
+        Verifies the contents of directory "pathMaster" against the contents of "pathBackup".
+        See vrfy.VerifyFiles().
+        """
+        return await self.__execute__("VerifyFiles", pathMaster, pathBackup)
+
+    async def __execute__(self, methodName: str, *args) -> vrfy.Result:
+        """
+        Executes vrfy method >>methodName<< in a worker thread, using a loopExecutor for hashing.
+
+        Raises:
+            asyncio.CancelledError: The operation was cancelled. Returns once the worker thread stopped.
+        """
+        loop = asyncio.get_running_loop()
+        executor = loopExecutor(loop, self.__hashPool, self.__openFiles, self.__bytesInFlight)
+        vf = vrfy(executor=executor, cache=self.__cache, **self.__options)
+        operation = asyncio.wrap_future(self.__operationPool.submit(getattr(vf, methodName), *args), loop=loop)
+        try:
+            return await asyncio.shield(operation)
+        except asyncio.CancelledError:
+            executor.Cancel()
+            # wait for the worker thread, it stops at its next hashing job
+            await asyncio.wait([operation])
+            if not operation.cancelled():
+                operation.exception()
+            raise
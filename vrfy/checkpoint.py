@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+import functools
+import json
+import os
+import time
+from vrfy.vrfy import vrfy
+
+
+class checkpoint:
+    """
+    Journal of completed directories, which allows to resume an interrupted (recursive) operation.
+
+    The journal is a JSON lines file: A header with the operation it belongs to, followed by one line per finished
+    directory holding its paths and vrfy.Result. Lines are flushed immediately and synced to disk at intervals, a
+    partially written last line (e.g. after a power loss) is discarded when resuming.
+    """
+    VERSION = 1
+    DEFAULT_SYNC_INTERVAL = 10.0
+
+    def __init__(self, filePath: str, operation: str, resume: bool = False,
+                 syncInterval: float = DEFAULT_SYNC_INTERVAL):
+        """
+        Parameters:
+            filePath (str): Path + name of the journal file.
+            operation (str): Identifier of the operation, e.g. function name and paths. Resuming a journal of a
+                                different operation is refused.
+            resume (bool): Continue an existing journal. Otherwise, an existing journal is overwritten.
+            syncInterval (float): Maximum number of seconds between two fsync() calls.
+
+        Raises:
+            OSError: Journal file can not be read or written.
+            ValueError: Journal file belongs to a different operation or is no checkpoint journal.
+        """
+        self.Path = filePath
+        self.Operation = operation
+        self.SyncInterval = syncInterval
+        # number of directories whose results were taken from the journal
+        self.Resumed = 0
+        self.__done = dict()
+        validSize = 0
+        if resume and os.path.isfile(filePath):
+            validSize = self.__read__()
+        if validSize > 0:
+            self.__file = open(filePath, "r+")
+            # drop a partially written last line
+            self.__file.truncate(validSize)
+            self.__file.seek(validSize)
+        else:
+            self.__file = open(filePath, "w")
+            self.__file.write(json.dumps({"checkpoint": self.VERSION, "operation": operation}) + "\n")
+            self.Sync()
+        self.__lastSync = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.Close()
+
+    def Wrap(self, func):
+        """
+        Returns a wrapper of >>func<<, which returns journaled results of finished directories instead of executing
+        >>func<<, and records the results of all other directories. The signature of >>func<< is preserved, i.e. the
+        wrapper can be passed to vrfy.Walk().
+        """
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            paths = [str(arg) for arg in args]
+            resultObject = self.Lookup(paths)
+            if resultObject is None:
+                resultObject = func(*args, **kwargs)
+                self.Record(paths, resultObject)
+            return resultObject
+        return wrapper
+
+    def Lookup(self, paths: list):
+        """
+        Returns the journaled result of directory >>paths<<, or None if it was not finished yet. Paths are compared as
+        absolute paths, like the paths of the operation.
+        """
+        absolutePaths = tuple(os.path.abspath(path) for path in paths)
+        values = self.__done.get(absolutePaths)
+        if values is None:
+            return None
+        self.Resumed += 1
+        resultObject = vrfy.Result.FromDict(values)
+        # journaled result paths are absolute, report them as given to this run
+        givenPaths = dict(zip(absolutePaths, paths))
+        resultObject.Path = givenPaths.get(resultObject.Path, resultObject.Path)
+        resultObject.PathBackup = givenPaths.get(resultObject.PathBackup, resultObject.PathBackup)
+        return resultObject
+
+    def Record(self, paths: list, resultObject) -> None:
+        """
+        Appends the result of a finished directory to the journal.
+
+        Parameters:
+            paths (list): Path(s) the operation was executed on, journaled as absolute paths.
+            resultObject (vrfy.Result): Result of the directory, journaled with absolute paths.
+        """
+        values = resultObject.ToDict()
+        values["Path"] = os.path.abspath(values["Path"])
+        values["PathBackup"] = os.path.abspath(values["PathBackup"])
+        self.__file.write(json.dumps({"paths": [os.path.abspath(path) for path in paths], "result": values}) + "\n")
+        self.__file.flush()
+        if time.monotonic() - self.__lastSync >= self.SyncInterval:
+            self.Sync()
+
+    def Sync(self) -> None:
+        """
+        Writes all recorded results to disk.
+        """
+        self.__file.flush()
+        os.fsync(self.__file.fileno())
+        self.__lastSync = time.monotonic()
+
+    def Close(self) -> None:
+        """
+        Syncs and closes the journal.
+        """
+        if self.__file is not None:
+            self.Sync()
+            self.__file.close()
+            self.__file = None
+
+    def __read__(self) -> int:
+        """
+        Reads the results of finished directories from an existing journal.
+
+        Returns:
+            int: Size of the valid part of the journal in bytes, 0 if the journal is empty.
+        """
+        validSize = 0
+        with open(self.Path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entry = json.loads(line.decode("utf-8"))
+                except ValueError:
+                    break
+                if not isinstance(entry, dict):
+                    break
+                if validSize == 0:
+                    if entry.get("checkpoint") != self.VERSION:
+                        raise ValueError("No valid checkpoint journal: " + str(self.Path))
+                    if entry.get("operation") != self.Operation:
+                        raise ValueError("Checkpoint journal " + str(self.Path) + " belongs to a different "
+                                         "operation: " + str(entry.get("operation")))
+                elif "paths" in entry and "result" in entry:
+                    self.__done[tuple(entry["paths"])] = entry["result"]
+                else:
+                    break
+                validSize += len(line)
+        return validSize
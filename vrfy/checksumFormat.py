@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+
+class checksumFormat:
+    """
+    Line level helpers shared by the checksum file formats (sums.csv, *.sha256sum and vrfy.manifest): line ends, hex
+    digests and quoting of file names.
+    """
+    ESCAPES = {"\\": "\\", '"': '"', "n": "\n", "r": "\r"}
+
+    @staticmethod
+    def StripLineEnd(line: str) -> str:
+        """
+        Removes the line break (LF or CR LF) from the end of >>line<<.
+        """
+        if line.endswith("\n"):
+            line = line[:-1]
+            if line.endswith("\r"):
+                line = line[:-1]
+        return line
+
+    @staticmethod
+    def IsHexDigest(value: str) -> bool:
+        """
+        Returns True, if >>value<< only consists of pairs of hex digits.
+        """
+        try:
+            return 2 * len(bytes.fromhex(value)) == len(value)
+        except ValueError:
+            return False
+
+    @staticmethod
+    def QuoteFileName(fileName: str) -> str:
+        """
+        Returns >>fileName<< as field of a checksum file. Names including line breaks or starting with a double quote
+        are enclosed in double quotes, with backslashes, double quotes and line breaks escaped by a backslash.
+        """
+        if "\n" not in fileName and "\r" not in fileName and not fileName.startswith('"'):
+            return fileName
+        return '"' + fileName.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n").replace("\r", "\\r") + '"'
+
+    @classmethod
+    def UnquoteFileName(cls, field: str) -> str:
+        """
+        Returns the file name of checksum file field >>field<<, see QuoteFileName().
+
+        Raises:
+            ValueError: Invalid quoted file name.
+        """
+        if not field.startswith('"'):
+            return field
+        if len(field) < 2 or not field.endswith('"'):
+            raise ValueError("Unterminated quoted file name: " + field)
+        return cls.Unescape(field[1:-1])
+
+    @classmethod
+    def Unescape(cls, value: str) -> str:
+        """
+        Replaces the backslash escape sequences of backslash, double quote, line feed ("n") and carriage return ("r")
+        in >>value<<.
+
+        Raises:
+            ValueError: Unknown or incomplete escape sequence.
+        """
+        if "\\" not in value:
+            return value
+        parts = []
+        index = 0
+        while index < len(value):
+            character = value[index]
+            if character == "\\":
+                if index + 1 >= len(value) or value[index + 1] not in cls.ESCAPES:
+                    raise ValueError("Invalid escape sequence: " + value)
+                character = cls.ESCAPES[value[index + 1]]
+                index += 1
+            parts.append(character)
+            index += 1
+        return "".join(parts)
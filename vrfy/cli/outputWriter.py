@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+import csv
+import json
+import sys
+from vrfy.vrfy import vrfy
+
+
+class lineBuffer(list):
+    """
+    List of pending output lines, usable as file object of csv.writer.
+    """
+    write = list.append
+
+
+class outputWriter:
+    """
+    Writes results as machine-readable records, either JSON lines or CSV: One record per directory, one per reported
+    file (mismatched, missing, additional or moved file, or unreadable line of a checksum file) and a summary record.
+    Records are collected and written in chunks instead of line by line.
+
+    All records have the fields of FIELDS:
+        Record:         "directory", "file" or "summary".
+        Path:           Directory (master path, backup path for directories missing in master).
+        File:           File name, or line of the checksum file for Status "BAD LINE".
+        Status:         Directory/summary: "PASS" or "FAIL". File: "MISMATCH", "MISSING", "ADDITIONAL", "MOVED" or
+                        "BAD LINE".
+        DirStatus:      Directory: vrfy.DIR_BOTH, DIR_MISSING or DIR_ADDITIONAL.
+        MasterChecksum: File: Checksum of the master copy or calculated checksum, if known.
+        BackupChecksum: File: Checksum of the backup copy or stored checksum, if known.
+        Detail:         Directory: "path error", if the directory is missing. File: Offset of the first differing
+                        byte, changed attributes (comma separated) or new path of a moved file. Summary: JSON encoded
+                        counters of the run (JSON lines: object "Stats").
+    """
+    FORMAT_TEXT = "text"
+    FORMAT_JSONL = "jsonl"
+    FORMAT_CSV = "csv"
+    FORMATS = (FORMAT_TEXT, FORMAT_JSONL, FORMAT_CSV)
+
+    FIELDS = ("Record", "Path", "File", "Status", "DirStatus", "MasterChecksum", "BackupChecksum", "Detail")
+    RECORD_DIRECTORY = "directory"
+    RECORD_FILE = "file"
+    RECORD_SUMMARY = "summary"
+
+    # number of records collected before they are written
+    CHUNK_SIZE = 1000
+
+    def __init__(self, outputFormat: str, stream=None):
+        """
+        Parameters:
+            outputFormat (str): FORMAT_JSONL or FORMAT_CSV.
+            stream (file): Text stream to write to (default: sys.stdout).
+
+        Raises:
+            ValueError: Unknown >>outputFormat<<.
+        """
+        if outputFormat not in (self.FORMAT_JSONL, self.FORMAT_CSV):
+            raise ValueError("Unknown output format: " + str(outputFormat))
+        self.Format = outputFormat
+        self.__stream = stream if stream is not None else sys.stdout
+        self.__pending = lineBuffer()
+        self.__csv = None
+        if outputFormat == self.FORMAT_CSV:
+            self.__csv = csv.writer(self.__pending, lineterminator="\n")
+            self.__csv.writerow(self.FIELDS)
+
+    def Write(self, resultObject: vrfy.Result) -> None:
+        """
+        Adds the records of a (per-directory) result.
+        """
+        if resultObject.DirStatus == vrfy.DIR_ADDITIONAL:
+            path = resultObject.PathBackup
+        else:
+            path = resultObject.Path
+        self.__record__(self.RECORD_DIRECTORY, path, "", "PASS" if resultObject.Result else "FAIL",
+                        dirStatus=resultObject.DirStatus, detail="path error" if resultObject.PathError else "")
+        for badLine in resultObject.BadLines:
+            self.__record__(self.RECORD_FILE, path, str(badLine), "BAD LINE")
+        for fileName in resultObject.ChecksumMismatch:
+            if fileName in resultObject.MismatchOffsets:
+                detail = str(resultObject.MismatchOffsets[fileName])
+            else:
+                detail = ",".join(resultObject.ChangedAttributes.get(fileName, []))
+            self.__record__(self.RECORD_FILE, path, fileName, "MISMATCH",
+                            masterChecksum=resultObject.MasterChecksums.get(fileName, ""),
+                            backupChecksum=resultObject.BackupChecksums.get(fileName, ""), detail=detail)
+        for fileName, movedTo in resultObject.MovedFiles.items():
+            self.__record__(self.RECORD_FILE, path, fileName, "MOVED", detail=movedTo)
+        for fileName in resultObject.MissingFiles:
+            self.__record__(self.RECORD_FILE, path, fileName, "MISSING",
+                            masterChecksum=resultObject.MasterChecksums.get(fileName, ""),
+                            backupChecksum=resultObject.BackupChecksums.get(fileName, ""))
+        for fileName in resultObject.AdditionalFiles:
+            self.__record__(self.RECORD_FILE, path, fileName, "ADDITIONAL",
+                            masterChecksum=resultObject.MasterChecksums.get(fileName, ""),
+                            backupChecksum=resultObject.BackupChecksums.get(fileName, ""))
+        if len(self.__pending) >= self.CHUNK_SIZE:
+            self.Flush()
+
+    def Finish(self, result: bool, stats: dict) -> None:
+        """
+        Adds the summary record and writes all pending records.
+
+        Parameters:
+            result (bool): Overall result of the run.
+            stats (dict): Counters and timing of the run, e.g. vrfyStats.ToDict().
+        """
+        if self.Format == self.FORMAT_JSONL:
+            self.__record__(self.RECORD_SUMMARY, "", "", "PASS" if result else "FAIL", stats=stats)
+        else:
+            self.__record__(self.RECORD_SUMMARY, "", "", "PASS" if result else "FAIL",
+                            detail=json.dumps(stats, sort_keys=True))
+        self.Flush()
+
+    def Flush(self) -> None:
+        """
+        Writes all pending records to the stream.
+        """
+        if len(self.__pending) > 0:
+            self.__stream.write("".join(self.__pending))
+            del self.__pending[:]
+        self.__stream.flush()
+
+    def __record__(self, record: str, path: str, fileName: str, status: str, dirStatus: str = "",
+                   masterChecksum: str = "", backupChecksum: str = "", detail: str = "", stats: dict = None) -> None:
+        """
+        Adds a single record.
+        """
+        values = (record, str(path), str(fileName), status, dirStatus, masterChecksum, backupChecksum, str(detail))
+        if self.__csv is not None:
+            self.__csv.writerow(values)
+            return
+        entry = dict(zip(self.FIELDS, values))
+        if stats is not None:
+            entry["Stats"] = stats
+        self.__pending.append(json.dumps(entry) + "\n")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+import sys
+import threading
+import time
+from vrfy.vrfyStats import vrfyStats
+
+
+class progressDisplay:
+    """
+    Observer for vrfy.AddObserver(), which shows a status line with progress, throughput and ETA. On a terminal, the
+    line is updated in place; otherwise a line is printed at a lower rate.
+    """
+    TTY_INTERVAL = 0.5
+    LOG_INTERVAL = 10.0
+
+    def __init__(self, stream=None):
+        """
+        Parameters:
+            stream (file): Text stream to write to (default: sys.stderr).
+        """
+        self.__stream = stream if stream is not None else sys.stderr
+        self.__isTty = hasattr(self.__stream, "isatty") and self.__stream.isatty()
+        self.__interval = self.TTY_INTERVAL if self.__isTty else self.LOG_INTERVAL
+        self.__lock = threading.Lock()
+        self.__lastUpdate = 0.0
+        self.__visible = False
+
+    def __call__(self, stats: vrfyStats, event: str) -> None:
+        if event == vrfyStats.EVENT_DONE:
+            self.Clear()
+            return
+        now = time.monotonic()
+        if event != vrfyStats.EVENT_PRESCAN and now - self.__lastUpdate < self.__interval:
+            return
+        with self.__lock:
+            self.__lastUpdate = now
+            if self.__isTty:
+                self.__stream.write("\r" + self.Format(stats) + "\033[K")
+                self.__visible = True
+            else:
+                self.__stream.write(self.Format(stats) + "\n")
+            self.__stream.flush()
+
+    def Clear(self) -> None:
+        """
+        Removes the status line from the terminal, e.g. before other output is printed.
+        """
+        with self.__lock:
+            if self.__visible:
+                self.__stream.write("\r\033[K")
+                self.__stream.flush()
+                self.__visible = False
+
+    @classmethod
+    def Format(cls, stats: vrfyStats) -> str:
+        """
+        Returns the status line for >>stats<<.
+        """
+        line = ""
+        progress = stats.Progress()
+        if progress is not None:
+            line += "[" + "{:5.1f}".format(progress * 100.0) + "%] "
+        line += str(stats.Directories) + " dirs, " + str(stats.HashedFiles) + " files, " + \
+            cls.FormatBytes(stats.HashedBytes) + " hashed"
+        if stats.TotalBytes is not None:
+            line += " of " + cls.FormatBytes(stats.TotalBytes)
+        line += ", " + cls.FormatBytes(stats.BytesPerSecond()) + "/s, " + \
+            "{:.1f}".format(stats.FilesPerSecond()) + " files/s"
+        if stats.CacheHits > 0:
+            line += ", " + str(stats.CacheHits) + " cached"
+        eta = stats.ETA()
+        if eta is not None:
+            line += ", ETA " + cls.FormatDuration(eta)
+        return line
+
+    @staticmethod
+    def FormatBytes(numBytes: float) -> str:
+        """
+        Returns >>numBytes<< with binary unit, e.g. "1.5 GiB".
+        """
+        for unit in ("B", "KiB", "MiB", "GiB", "TiB"):
+            if numBytes < 1024.0 or unit == "TiB":
+                return ("{:.0f} " if unit == "B" else "{:.1f} ").format(numBytes) + unit
+            numBytes /= 1024.0
+
+    @staticmethod
+    def FormatDuration(seconds: float) -> str:
+        """
+        Returns >>seconds<< as "h:mm:ss".
+        """
+        seconds = int(seconds)
+        return str(seconds // 3600) + ":" + "{:02d}".format(seconds // 60 % 60) + ":" + "{:02d}".format(seconds % 60)
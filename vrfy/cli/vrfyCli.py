@@ -1,16 +1,49 @@
 #!/usr/bin/env python3
 from vrfy.vrfy import vrfy
+from vrfy.hashExecutor import hashExecutor
+from vrfy.ioScheduler import ioScheduler
+from vrfy.hashCache import hashCache
+from vrfy.hasher import hasher
+from vrfy.manifest import manifest
+from vrfy.checkpoint import checkpoint
+from vrfy.resultFile import resultFile
+from vrfy.vrfyProfiler import vrfyProfiler
+from vrfy.cli.progressDisplay import progressDisplay
+from vrfy.cli.outputWriter import outputWriter
 import sys
 import os
+import sqlite3
 import argparse
+import cProfile
+import contextlib
+import functools
+import glob
+import json
+import time
 from argparse import RawTextHelpFormatter
 import pathlib
-from inspect import signature
 
 
 class vrfyCli:
+    EXECUTOR_DEVICE = "device"
+    COMPARE_TREE = "tree"
+    PROFILE_FOLDED = "folded"
+    PROFILE_CPROFILE = "cprofile"
+
     def __init__(self):
-        pass
+        self.__skippedBytes = 0
+        self.__checkpointPath = None
+        self.__resume = False
+        self.__progress = None
+        self.__prescan = False
+        self.__shard = None
+        self.__resultsPath = None
+        self.__changedListPath = None
+        self.__separator = "\n"
+        self.__fileList = None
+        self.__detectMoves = False
+        self.__output = None
+        self.__profiler = None
 
     def parseArgumentsAndExecute(self, arguments: list) -> int:
         """
@@ -22,30 +55,116 @@ class vrfyCli:
         Returns:
             int:    0, when all execution steps resulted in PASS, else 1.
         """
+        # subcommand: vrfy merge <<result files>>
+        if len(arguments) > 0 and arguments[0] == "merge":
+            return self.__merge__(arguments[1:])
+
         # decode options from argument list
         parser = argparse.ArgumentParser(
             description="Verify with VRFY: Ensure the integrity of your file copies, hash by hash!",
+            epilog="Combine the result files of sharded runs:\n  vrfy merge FILE [FILE ...]",
             formatter_class=RawTextHelpFormatter)
         parser.add_argument("-ver", "--version", action="store_true", help="Print version string")
         parser.add_argument("-r", "--recursive", action="store_true", help="Recursive operation")
         parser.add_argument("-p", "--print", action="store_true", help="Print mismatched checksums")
+        parser.add_argument("-j", "--jobs", type=int, default=1,
+                            help="Number of files hashed concurrently (not with --executor device)")
+        parser.add_argument("--executor", choices=[hashExecutor.BACKEND_THREAD, hashExecutor.BACKEND_PROCESS,
+                                                   self.EXECUTOR_DEVICE],
+                            default=hashExecutor.BACKEND_THREAD,
+                            help="Executor backend used with --jobs, or \"device\": one queue per storage device,\n"
+                                 "reading files in inode order (see --device-jobs)")
+        parser.add_argument("--device-jobs", type=self.__parseDeviceJobs__, action="append", default=[],
+                            metavar="[PATH=]N",
+                            help="With --executor device: Number of files hashed concurrently per device\n"
+                                 "(default: 1, e.g. for hard disks), or for the device of PATH only\n"
+                                 "(e.g. --device-jobs /mnt/ssd=8). Can be repeated.")
+        parser.add_argument("-a", "--algorithm", choices=hasher.ALGORITHMS, default=hasher.DEFAULT_ALGORITHM,
+                            help="Hash algorithm for new checksums (default: " + hasher.DEFAULT_ALGORITHM + ").\n"
+                                 "sums.csv-files are verified with the algorithm recorded in their header.")
+        parser.add_argument("--block-size", type=self.__parseSize__, default=hasher.DEFAULT_BLOCK_SIZE,
+                            help="Read block size, e.g. 256K or 4M (default: 1M)")
+        parser.add_argument("--mmap", action="store_true", help="Hash large files through a memory map")
+        parser.add_argument("--drop-cache", action="store_true",
+                            help="Drop hashed file contents from the page cache (POSIX only)")
+        parser.add_argument("--progress", action="store_true",
+                            help="Show progress, throughput and ETA on stderr")
+        parser.add_argument("--no-prescan", action="store_true",
+                            help="With --progress: Do not count files in advance (no percentage/ETA)")
+        parser.add_argument("--stats-json", metavar="FILE",
+                            help="Write counters and throughput of the run to FILE as JSON (\"-\": stdout)")
+        parser.add_argument("--output", choices=outputWriter.FORMATS, default=outputWriter.FORMAT_TEXT,
+                            help="Write results to stdout as text (default), or as JSON lines or CSV records (one\n"
+                                 "per directory and reported file, and a summary). Other messages go to stderr.")
+        parser.add_argument("--profile", metavar="FILE",
+                            help="Time directory scans, checksum file parsing, file reads, hashing and output per\n"
+                                 "directory, print the slowest files and directories and write the profile to FILE")
+        parser.add_argument("--profile-format", choices=[self.PROFILE_FOLDED, self.PROFILE_CPROFILE],
+                            default=self.PROFILE_FOLDED,
+                            help="With --profile: Folded stacks per directory and phase, e.g. for flamegraph.pl\n"
+                                 "(default), or cProfile statistics of the main thread, e.g. for pstats")
+        parser.add_argument("--profile-top", type=int, default=vrfyProfiler.DEFAULT_TOP, metavar="N",
+                            help="With --profile: Number of slowest files and directories printed (default: " +
+                                 str(vrfyProfiler.DEFAULT_TOP) + ")")
+        parser.add_argument("--checkpoint", metavar="FILE",
+                            help="Journal finished directories in FILE, so that an interrupted run can be resumed")
+        parser.add_argument("--resume", action="store_true",
+                            help="With --checkpoint: Skip directories that were finished by a previous run")
+        parser.add_argument("--shard", type=self.__parseShard__, metavar="I/N",
+                            help="Only process directories of shard I of N (1 <= I <= N), assigned by their relative\n"
+                                 "path, e.g. to split a run across several nodes")
+        parser.add_argument("--results", metavar="FILE",
+                            help="Write the per-directory results and timing of the run to FILE, e.g. to combine\n"
+                                 "shards with: vrfy merge FILE [FILE ...]")
+        parser.add_argument("--files-from", metavar="FILE",
+                            help="With -v/-m/-b: Only verify the files listed in FILE (\"-\": stdin), given by paths\n"
+                                 "relative to the verified (master) directory")
+        parser.add_argument("-0", "--null", action="store_true",
+                            help="Paths of --files-from and --changed-list are separated by NUL instead of newline\n"
+                                 "characters")
+
+        cacheopts = parser.add_argument_group('Hash cache', 'Reuse checksums of files whose size, mtime and ctime are '
+                                              'unchanged.')
+        cacheopts.add_argument("--cache", nargs="?", const=hashCache.GetDefaultDir(), dest='CACHE_DIR',
+                               help="Enable hash cache stored in CACHE_DIR\n(default: " +
+                                    hashCache.GetDefaultDir() + ")")
+        cacheopts.add_argument("--cache-size", type=int, default=hashCache.DEFAULT_MAX_ENTRIES,
+                               help="Maximum number of cached checksums")
+        cacheopts.add_argument("--paranoid", action="store_true", help="Ignore cached checksums and rehash all files")
 
         filevrfy = parser.add_argument_group('File verification',
-                                             'Verify a single file against an expected')
-        filevrfy.add_argument("-f", "--file", type=argparse.FileType('rb'), help="File to verify")
+                                             'Verify files against an expected checksum or a checksum file.')
+        filevrfy.add_argument("-f", "--file", nargs="+", metavar="FILE",
+                              help="File(s) to verify, glob patterns (e.g. 'dist/*.tar.gz') are expanded")
         filevrfy.add_argument("-cs", "--checksum", type=str,
-                              help="Checksum string or sums.csv/*.sha256-file")
+                              help="Checksum string or sums.csv/*.sha256-file, read once for all files")
 
         csvrfy = parser.add_argument_group('Checksum verification', 'Verify files against stored checksums.'
                                             '\nError indicators:'
                                             '\n\t[+]: Additional files in directory that are missing in checksum list.'
                                             '\n\t[-]: Files that are included in checksum list, but missing in directory.'
-                                            '\n\t[MISMATCH]: Checksums mismatch.')
+                                            '\n\t[MISMATCH]: Checksums mismatch.'
+                                            '\n\t[BAD LINE]: Line of sums.csv that could not be read.')
         mcsvrfy = csvrfy.add_mutually_exclusive_group()  # required=True)
         mcsvrfy.add_argument("-v", "--verify", type=pathlib.Path, dest='VERIFY_PATH',
                                help="Path to files for verification")
         mcsvrfy.add_argument("-c", "--create", type=pathlib.Path, dest='CREATE_PATH',
                                help="Path to files to create checksums for")
+        mcsvrfy.add_argument("--to-manifest", type=pathlib.Path, dest='TO_MANIFEST_PATH',
+                             help="Collect all sums.csv-files of a directory tree into a single manifest")
+        mcsvrfy.add_argument("--from-manifest", type=pathlib.Path, dest='FROM_MANIFEST_PATH',
+                             help="Write sums.csv-files for all directories listed in a manifest")
+        mcsvrfy.add_argument("--find-duplicates", type=pathlib.Path, dest='DUPLICATES_PATH',
+                             help="List files with identical contents in a directory (only files of equal size are\n"
+                                  "hashed)")
+        csvrfy.add_argument("-u", "--update", action="store_true",
+                            help="With -c: Only hash new or changed (size/mtime) files, drop deleted files")
+        csvrfy.add_argument("--tree-digests", action="store_true",
+                            help="With -c: Also store the tree digests of sub-directories in sums.csv (format 4),\n"
+                                 "sub-directories are processed first. Enables -m/-b --compare tree.")
+        csvrfy.add_argument("--manifest", action="store_true",
+                            help="With -c/-v: Store checksums in a single file (" + manifest.FILE_NAME + ") at the "
+                                 "root of the\ndirectory tree instead of a sums.csv-file per directory")
 
         dirvrfy = parser.add_argument_group('Directory verification', 'Verify files against a known good master copy.'
                                             '\nError indicators:'
@@ -55,13 +174,33 @@ class vrfyCli:
         dirvrfy.add_argument("-m", "--master", type=pathlib.Path, dest='MASTER_PATH', help="Path to master directory")
         dirvrfy.add_argument("-b", "--backup", type=pathlib.Path, dest='BACKUP_PATH', 
                              help="Path to backup directory")
-
-        args = parser.parse_args()
+        dirvrfy.add_argument("--sample", type=int, default=0, metavar="N",
+                             help="Compare first, last and N random blocks of equally sized files before hashing them")
+        dirvrfy.add_argument("--full", action="store_true",
+                             help="Always hash files, even if their sizes or sampled blocks already mismatch\n"
+                                  "(implied by -p, so that checksums of mismatched files can be printed)")
+        dirvrfy.add_argument("--compare", choices=[vrfy.COMPARE_HASH, vrfy.COMPARE_BYTES, self.COMPARE_TREE],
+                             default=vrfy.COMPARE_HASH,
+                             help="Compare files by checksums (default) or byte by byte, stopping at the first\n"
+                                  "difference, or compare the sums.csv-files written with -c --tree-digests top-down,\n"
+                                  "skipping sub-trees with equal tree digests (no other files are read)")
+        dirvrfy.add_argument("--metadata-only", action="store_true",
+                             help="Only compare file names, types, sizes and mtimes (whole seconds), without reading\n"
+                                  "any file contents")
+        dirvrfy.add_argument("--changed-list", metavar="FILE",
+                             help="Write the relative paths of mismatched, missing and additional files to FILE,\n"
+                                  "e.g. as input of a later content verification")
+        dirvrfy.add_argument("--detect-moves", action="store_true",
+                             help="Report files that were moved or renamed within the directory tree as [MOVED]\n"
+                                  "instead of missing/additional (only files of equal size are hashed)")
+
+        args = parser.parse_args(arguments)
 
         # mutually exclude directory and file verification mode
         f = (args.file is not None or args.checksum is not None)
         d = (args.MASTER_PATH is not None or args.BACKUP_PATH is not None)
-        vp = (args.VERIFY_PATH is not None)
+        vp = (args.VERIFY_PATH is not None or args.CREATE_PATH is not None or args.TO_MANIFEST_PATH is not None or
+              args.FROM_MANIFEST_PATH is not None or args.DUPLICATES_PATH is not None)
         if (f + d + vp) > 1:
             print("ERROR: Verification modes can NOT be mixed.")
             return 1
@@ -75,7 +214,165 @@ class vrfyCli:
         self.OPTION_RECURSIVE = args.recursive
         self.OPTION_PRINT = args.print
 
-        vf = vrfy()
+        if args.resume and args.checkpoint is None:
+            print("ERROR: Option --resume requires --checkpoint.")
+            return 1
+        if args.checkpoint is not None and (args.manifest or args.TO_MANIFEST_PATH is not None or
+                                            args.FROM_MANIFEST_PATH is not None or args.DUPLICATES_PATH is not None):
+            print("ERROR: Option --checkpoint is not supported for manifests and --find-duplicates.")
+            return 1
+        self.__checkpointPath = args.checkpoint
+        self.__resume = args.resume
+
+        if (args.shard is not None or args.results is not None) and (
+                f or args.manifest or args.TO_MANIFEST_PATH is not None or args.FROM_MANIFEST_PATH is not None or
+                args.DUPLICATES_PATH is not None):
+            print("ERROR: Options --shard and --results are not supported for file verification, manifests and "
+                  "--find-duplicates.")
+            return 1
+        self.__shard = args.shard
+        self.__resultsPath = args.results
+
+        if args.tree_digests and (args.CREATE_PATH is None or args.manifest):
+            print("ERROR: Option --tree-digests requires checksum creation (-c) without --manifest.")
+            return 1
+        if args.compare == self.COMPARE_TREE and (
+                args.checkpoint is not None or args.shard is not None or args.results is not None or
+                args.files_from is not None or args.detect_moves or args.changed_list is not None):
+            print("ERROR: Option --compare tree can NOT be combined with --checkpoint, --shard, --results, "
+                  "--files-from,\n--detect-moves and --changed-list.")
+            return 1
+        if args.metadata_only and args.compare != vrfy.COMPARE_HASH:
+            print("ERROR: Options --metadata-only and --compare can NOT be combined.")
+            return 1
+        if (args.metadata_only or args.changed_list is not None) and not d:
+            print("ERROR: Options --metadata-only and --changed-list require directory verification (-m/-b).")
+            return 1
+        self.__changedListPath = args.changed_list
+        if args.detect_moves and (not d or args.metadata_only):
+            print("ERROR: Option --detect-moves requires directory verification (-m/-b) without --metadata-only.")
+            return 1
+        self.__detectMoves = args.detect_moves
+        if args.output != outputWriter.FORMAT_TEXT and args.DUPLICATES_PATH is not None:
+            print("ERROR: Option --output is not supported for --find-duplicates.")
+            return 1
+        self.__separator = "\0" if args.null else "\n"
+
+        if args.files_from is not None:
+            if not (d or args.VERIFY_PATH is not None):
+                print("ERROR: Option --files-from requires checksum (-v) or directory verification (-m/-b).")
+                return 1
+            rootPath = str(args.VERIFY_PATH if args.VERIFY_PATH is not None else args.MASTER_PATH)
+            try:
+                self.__fileList = self.__readFileList__(args.files_from, self.__separator, rootPath)
+            except (OSError, ValueError) as e:
+                print("ERROR: Unable to read list of files: " + str(e))
+                return 1
+
+        if args.jobs < 1:
+            print("ERROR: Number of jobs must be at least 1.")
+            return 1
+        if args.jobs != 1 and args.executor == self.EXECUTOR_DEVICE:
+            print("ERROR: Option --jobs is not supported for --executor device, use --device-jobs.")
+            return 1
+        if len(args.device_jobs) > 0 and args.executor != self.EXECUTOR_DEVICE:
+            print("ERROR: Option --device-jobs requires --executor device.")
+            return 1
+        if args.profile_top < 0:
+            print("ERROR: Number of slowest files and directories must not be negative.")
+            return 1
+
+        try:
+            hasher.CheckAvailable(args.algorithm)
+        except ValueError as e:
+            print("ERROR: " + str(e))
+            return 1
+
+        executor = args.executor
+        if executor == self.EXECUTOR_DEVICE:
+            deviceJobs = ioScheduler.DEFAULT_DEVICE_JOBS
+            deviceOverrides = dict()
+            for path, jobs in args.device_jobs:
+                if path is None:
+                    deviceJobs = jobs
+                    continue
+                device = ioScheduler.GetDevice(path)
+                if device is None:
+                    print("ERROR: Unvalid argument " + str(path))
+                    return 1
+                deviceOverrides[device] = jobs
+            executor = ioScheduler(deviceJobs, deviceOverrides)
+
+        # opened last: no early return may leave the cache open
+        cache = None
+        if args.CACHE_DIR is not None:
+            try:
+                cache = hashCache(args.CACHE_DIR, args.cache_size)
+            except (OSError, sqlite3.Error):
+                print("ERROR: Unable to open hash cache in " + str(args.CACHE_DIR))
+                return 1
+
+        compare = args.compare
+        if args.metadata_only:
+            compare = vrfy.COMPARE_METADATA
+        elif args.compare == self.COMPARE_TREE:
+            # tree comparison only reads sums.csv-files
+            compare = vrfy.COMPARE_HASH
+        if args.output != outputWriter.FORMAT_TEXT:
+            self.__output = outputWriter(args.output, sys.stdout)
+        if args.profile is not None:
+            self.__profiler = vrfyProfiler(args.profile_top)
+        profile = None
+        if args.profile is not None and args.profile_format == self.PROFILE_CPROFILE:
+            profile = cProfile.Profile()
+        # with --output: stdout is kept free for records, other messages go to stderr
+        with contextlib.redirect_stdout(sys.stderr) if self.__output is not None else contextlib.nullcontext():
+            with vrfy(jobs=args.jobs, executor=executor, cache=cache, paranoid=args.paranoid,
+                      algorithm=args.algorithm, blockSize=args.block_size, useMmap=args.mmap,
+                      dropCache=args.drop_cache, fullHash=args.full or args.print, sampleBlocks=args.sample,
+                      compare=compare, compareDigest=args.print,
+                      keepChecksums=False, hashUnmatched=not args.detect_moves, profiler=self.__profiler) as vf:
+                if args.progress:
+                    self.__progress = progressDisplay()
+                    self.__prescan = not args.no_prescan
+                    vf.AddObserver(self.__progress)
+                if profile is not None:
+                    profile.enable()
+                try:
+                    returnCode = self.__execute__(vf, args, arguments)
+                except ValueError as e:
+                    # e.g. hash algorithm of a checksum file, whose optional dependency is not installed
+                    if self.__progress is not None:
+                        self.__progress.Clear()
+                    print("ERROR: " + str(e))
+                    returnCode = 1
+                if profile is not None:
+                    profile.disable()
+                if self.__output is not None:
+                    self.__output.Finish(returnCode == 0, vf.Stats.ToDict())
+                if self.__progress is not None:
+                    self.__progress.Clear()
+                if args.stats_json is not None and not self.__writeStats__(vf, args.stats_json, arguments, returnCode):
+                    returnCode = 1
+                if self.__profiler is not None and not self.__writeProfile__(self.__profiler, profile, args.profile):
+                    returnCode = 1
+            if cache is not None:
+                print("Cache: " + str(cache.Hits) + " hits, " + str(cache.Misses) + " misses, " + str(cache.Evictions) +
+                      " evictions")
+        return returnCode
+
+    def __execute__(self, vf: vrfy, args, arguments: list) -> int:
+        """
+        Executes the operation selected by the decoded program arguments.
+
+        Parameters:
+            vf (vrfy): vrfy instance used for all operations.
+            args (argparse.Namespace): Decoded program arguments.
+            arguments (List[str]): List of arguments provided by user.
+
+        Returns:
+            int:    0, when all execution steps resulted in PASS, else 1.
+        """
         # execute decoded options
         executionResult = False
 
@@ -90,7 +387,7 @@ class vrfyCli:
             self.OPTION_RECURSIVE = True
             # verify sums
             print("Verifying current working directory against checksums:")
-            executionResult = self.__walker__(os.getcwd(), os.getcwd(), vf.VerifyFilesAgainstChecksums)
+            executionResult = self.__walker__(vf, os.getcwd(), os.getcwd(), vf.VerifyFilesAgainstChecksums)
             self.__printOverallResult__(executionResult)
 
         # cli option: vrfy -m <<directory>> -c <<directory>>
@@ -100,34 +397,75 @@ class vrfyCli:
                 print("Master: " + str(args.MASTER_PATH))
                 print("Backup: " + str(args.BACKUP_PATH))
                 self.OPTION_RECURSIVE = True
-                executionResult = self.__walker__(str(args.MASTER_PATH), str(args.BACKUP_PATH), vf.VerifyFiles)
+                if args.compare == self.COMPARE_TREE:
+                    executionResult = self.__printResults__(vf.CompareTrees(str(args.MASTER_PATH),
+                                                                            str(args.BACKUP_PATH)))
+                    print("Tree digests: " + str(vf.Stats.SkippedTrees) + " matching sub-trees skipped")
+                else:
+                    executionResult = self.__walker__(vf, str(args.MASTER_PATH), str(args.BACKUP_PATH),
+                                                      vf.VerifyFiles)
                 self.__printOverallResult__(executionResult)
+                if self.__skippedBytes > 0:
+                    print("Quick compare: " + str(self.__skippedBytes) + " bytes not read")
             else:
                 print("ERROR: Unvalid argument " + str(args.MASTER_PATH) + " or " + str(args.BACKUP_PATH))
 
         # cli option: vrfy -f <<file>> -cs <<CHECKSUM>> OR vrfy -p -f <<file>> OR vrfy -p -f <<file>> -cs <<CHECKSUM>>
         elif args.file is not None:
-            if os.path.isfile(args.file):
-                if args.checksum is not None:
-                    res = vf.VerifyFile(args.file.name, args.checksum)
+            filePaths = self.__expandFiles__(args.file)
+            if len(filePaths) == 1 and filePaths == args.file and self.__output is None:
+                if os.path.isfile(filePaths[0]):
+                    if args.checksum is not None:
+                        res = vf.VerifyFile(filePaths[0], args.checksum)
+                    else:
+                        res = vf.VerifyFile(filePaths[0], "")
+                    executionResult = res.Result
+                    path, filename = os.path.split(filePaths[0])
+                    calcChecksum = res.MasterChecksums[filename]
+                    if self.OPTION_PRINT:
+                        print(calcChecksum + "  " + str(filename))
+                    else:
+                        self.__printOverallResult__(executionResult)
                 else:
-                    res = vf.VerifyFile(args.file.name, "")
+                    print("ERROR: Unvalid argument " + str(filePaths[0]))
+            # cli option: vrfy -f <<file>> <<file>> ... -cs <<CHECKSUM>> OR vrfy -f '<<pattern>>' -cs <<CHECKSUM>>
+            else:
+                res = vf.VerifyFileList(filePaths, args.checksum if args.checksum is not None else "")
                 executionResult = res.Result
-                path, filename = os.path.split(args.file.name)
-                calcChecksum = res.MasterChecksums[filename]
-                if self.OPTION_PRINT:
-                    print(calcChecksum + "  " + str(filename))
+                if self.__output is not None:
+                    self.__output.Write(res)
+                elif self.OPTION_PRINT and args.checksum is None:
+                    # no expectation given: print checksums in *.sha256sum-format
+                    for filePath in filePaths:
+                        if filePath in res.MasterChecksums:
+                            print(res.MasterChecksums[filePath] + "  " + filePath)
+                        else:
+                            print("ERROR: Unvalid argument " + filePath)
                 else:
+                    print("Verifying " + str(len(filePaths)) + " files: ", end="")
+                    self.__printResult__(res)
                     self.__printOverallResult__(executionResult)
-            else:
-                print("ERROR: Unvalid argument " + str(args.file))
 
         # cli option: vrfy -c <<directory>>
         elif args.CREATE_PATH is not None:
             if os.path.isdir(args.CREATE_PATH):
                 # create sums
-                print("Creating checksums for files:")
-                executionResult = self.__walker__(str(args.CREATE_PATH), str(args.CREATE_PATH), vf.WriteChecksumFile)
+                if args.update:
+                    print("Updating checksums for files:")
+                else:
+                    print("Creating checksums for files:")
+                if args.manifest:
+                    self.__preScan__(vf, str(args.CREATE_PATH), str(args.CREATE_PATH))
+                    executionResult = self.__printResults__(vf.CreateManifest(str(args.CREATE_PATH),
+                                                                              self.OPTION_RECURSIVE, args.update))
+                elif args.update or args.tree_digests:
+                    executionResult = self.__walker__(vf, str(args.CREATE_PATH), str(args.CREATE_PATH),
+                                                      functools.partial(vf.WriteChecksumFile, update=args.update,
+                                                                        treeDigests=args.tree_digests),
+                                                      bottomUp=args.tree_digests)
+                else:
+                    executionResult = self.__walker__(vf, str(args.CREATE_PATH), str(args.CREATE_PATH),
+                                                      vf.WriteChecksumFile)
                 self.__printOverallResult__(executionResult)
             else:
                 print("ERROR: Unvalid argument " + str(args.CREATE_PATH))
@@ -137,12 +475,58 @@ class vrfyCli:
             if os.path.isdir(args.VERIFY_PATH):
                 # verify sums
                 print("Verifying files against checksums:")
-                executionResult = self.__walker__(str(args.VERIFY_PATH), str(args.VERIFY_PATH),
-                                                vf.VerifyFilesAgainstChecksums)
+                if args.manifest:
+                    self.__preScan__(vf, str(args.VERIFY_PATH), str(args.VERIFY_PATH))
+                    executionResult = self.__printResults__(vf.VerifyManifest(str(args.VERIFY_PATH),
+                                                                              self.OPTION_RECURSIVE,
+                                                                              self.__fileList))
+                else:
+                    executionResult = self.__walker__(vf, str(args.VERIFY_PATH), str(args.VERIFY_PATH),
+                                                      vf.VerifyFilesAgainstChecksums)
                 self.__printOverallResult__(executionResult)
             else:
                 print("ERROR: Unvalid argument " + str(args.VERIFY_PATH))
 
+        # cli option: vrfy --to-manifest <<directory>>
+        elif args.TO_MANIFEST_PATH is not None:
+            if os.path.isdir(args.TO_MANIFEST_PATH):
+                print("Converting sums.csv-files to manifest:")
+                executionResult = self.__printResults__(vf.ConvertToManifest(str(args.TO_MANIFEST_PATH),
+                                                                             self.OPTION_RECURSIVE))
+                self.__printOverallResult__(executionResult)
+            else:
+                print("ERROR: Unvalid argument " + str(args.TO_MANIFEST_PATH))
+
+        # cli option: vrfy --from-manifest <<directory>>
+        elif args.FROM_MANIFEST_PATH is not None:
+            if os.path.isdir(args.FROM_MANIFEST_PATH):
+                print("Converting manifest to sums.csv-files:")
+                executionResult = self.__printResults__(vf.ConvertFromManifest(str(args.FROM_MANIFEST_PATH)))
+                self.__printOverallResult__(executionResult)
+            else:
+                print("ERROR: Unvalid argument " + str(args.FROM_MANIFEST_PATH))
+
+        # cli option: vrfy --find-duplicates <<directory>>
+        elif args.DUPLICATES_PATH is not None:
+            if os.path.isdir(args.DUPLICATES_PATH):
+                print("Finding duplicate files:")
+                self.__preScan__(vf, str(args.DUPLICATES_PATH), str(args.DUPLICATES_PATH))
+                duplicates = vf.FindDuplicates(str(args.DUPLICATES_PATH), self.OPTION_RECURSIVE)
+                if self.__progress is not None:
+                    self.__progress.Clear()
+                redundantBytes = 0
+                for digest, size, files in duplicates:
+                    print("[DUPLICATE] " + str(len(files)) + " files of " + str(size) + " bytes")
+                    if self.OPTION_PRINT:
+                        print("- cs: " + digest)
+                    for file in files:
+                        print("- " + file)
+                    redundantBytes += (len(files) - 1) * size
+                print("Duplicates: " + str(len(duplicates)) + " sets, " + str(redundantBytes) + " bytes redundant")
+                executionResult = True
+            else:
+                print("ERROR: Unvalid argument " + str(args.DUPLICATES_PATH))
+
         else:
             print("No valid argument setting found!")
             return 1
@@ -151,83 +535,385 @@ class vrfyCli:
         else:
             return 1
 
-    def __walker__(self, pathMaster: str, pathBackup: str, func) -> bool:
+    def __walker__(self, vf: vrfy, pathMaster: str, pathBackup: str, func, bottomUp: bool = False) -> bool:
         """
-        Verifies the contents of directory "pathMaster" against the included checksums in sums.csv.
+        Executes >>func<< on "pathMaster"/"pathBackup" (and its sub-directories, if recursive operation is requested)
+        and prints the results.
 
         Parameters:
+            vf (vrfy): vrfy instance used for directory traversal.
             pathMaster (str): Path to the master directory whose contents are considered valid and unchanged, serving as
                                 a baseline for comparison. .
             pathBackup (str): Path to backup directory whose files shall get verified against the master copy.
             func (callable) -- Function that gets executed on the respective folder.
+            bottomUp (bool): Process sub-directories before their parent directory, see vrfy.Walk().
 
         Returns:
             bool:   True, when all executions of >>func<< returned PASS, else False.
         """
-        # check if received strings are valid paths
-        # create lists of files and directories that are included in current path
-        filesM = filesC = dictsM = dictsC = []
-        if os.path.isdir(pathMaster):
-            filesM = [entryA for entryA in os.listdir(pathMaster) if
-                      not os.path.isdir(os.path.join(pathMaster, entryA))]
-            dictsM = [entryDir for entryDir in os.listdir(pathMaster) if
-                      os.path.isdir(os.path.join(pathMaster, entryDir))]
-        if os.path.isdir(pathBackup):
-            filesC = [entryB for entryB in os.listdir(pathBackup) if not os.path.isdir(os.path.join(pathBackup, entryB))]
-            dictsC = [entryDir for entryDir in os.listdir(pathBackup) if
-                      os.path.isdir(os.path.join(pathBackup, entryDir))]
-
-        combinedDicts = list(set(dictsM + dictsC))
-
-        if os.path.isdir(pathMaster) and os.path.isdir(pathBackup):
-            print(pathMaster, end=" : ", flush=True)
-            # execute requested operation
-            numParam = len(signature(func).parameters)
-            if numParam == 2:
-                resultObject = func(pathMaster, pathBackup)
-            elif numParam == 1:
-                resultObject = func(pathBackup)
-            else:
+        self.__preScan__(vf, pathMaster, pathBackup)
+        # operation is identified by function, paths, recursion and list of files
+        operation = ";".join([getattr(func, "func", func).__name__, os.path.abspath(pathMaster),
+                              os.path.abspath(pathBackup), str(self.OPTION_RECURSIVE)])
+        if self.__fileList is not None:
+            operation += ";files-from"
+        if bottomUp:
+            operation += ";bottom-up"
+        journal = None
+        if self.__checkpointPath is not None:
+            # a journal only belongs to a single shard
+            shardSuffix = "" if self.__shard is None else ";" + str(self.__shard[0]) + "/" + str(self.__shard[1])
+            try:
+                journal = checkpoint(self.__checkpointPath, operation + shardSuffix, resume=self.__resume)
+            except (OSError, ValueError) as e:
+                print("ERROR: Unable to open checkpoint journal: " + str(e))
                 return False
-        else:
-            if os.path.isdir(pathMaster):
-                print("[-] " + pathMaster, end=" : ", flush=True)
-                #resultObject = vrfy.Result(False, pathMaster, additionalMaster=filesM, missingMaster=filesC)
-                resultObject = func(pathMaster, pathBackup)
-            if os.path.isdir(pathBackup):
-                print("[+] " + pathBackup, end=" : ", flush=True)
-                #resultObject = vrfy.Result(False, pathBackup, additionalMaster=filesM, missingMaster=filesC)
-                resultObject = func(pathMaster, pathBackup)
-        resultVerify = resultObject.Result
-        # ResultList.append(resultObject)
-        self.__printResult__(resultObject)
-
-        # jump into child directories, if recursive operation is requested
-        if self.OPTION_RECURSIVE:
-            for nextFolder in combinedDicts:
-                resultVerify = self.__walker__(os.path.join(pathMaster, nextFolder),
-                                               os.path.join(pathBackup, nextFolder), func) & resultVerify
+            func = journal.Wrap(func)
+        output = None
+        if self.__resultsPath is not None:
+            try:
+                output = resultFile(self.__resultsPath, operation, self.__shard)
+            except OSError as e:
+                print("ERROR: Unable to write results: " + str(e))
+                if journal is not None:
+                    journal.Close()
+                return False
+        changedList = None
+        if self.__changedListPath is not None:
+            try:
+                changedList = open(self.__changedListPath, "w", newline="", errors="surrogateescape")
+            except OSError as e:
+                print("ERROR: Unable to write list of changed files: " + str(e))
+                for openFile in (journal, output):
+                    if openFile is not None:
+                        openFile.Close()
+                return False
+        try:
+            if self.__fileList is not None:
+                results = vf.WalkFiles(pathMaster, pathBackup, func, self.__fileList, shard=self.__shard)
+            else:
+                results = vf.Walk(pathMaster, pathBackup, func, recursive=self.OPTION_RECURSIVE, shard=self.__shard,
+                                  bottomUp=bottomUp)
+            if self.__detectMoves:
+                results = vf.DetectMoves(results, pathMaster, pathBackup, hashUnmatched=self.OPTION_PRINT)
+            if output is not None:
+                results = self.__recordResults__(results, output)
+            if changedList is not None:
+                results = self.__listChangedFiles__(results, changedList, pathMaster, self.__separator)
+            resultVerify = self.__printResults__(results)
+            if output is not None:
+                output.Finish(resultVerify, vf.Stats.ToDict())
+        finally:
+            if journal is not None:
+                journal.Close()
+            if output is not None:
+                output.Close()
+            if changedList is not None:
+                changedList.close()
+        if journal is not None and journal.Resumed > 0:
+            print("Checkpoint: " + str(journal.Resumed) + " directories taken from " + str(self.__checkpointPath))
+        return resultVerify
+
+    @staticmethod
+    def __recordResults__(results, output: resultFile):
+        """
+        Writes each result of >>results<< to >>output<< and passes it on.
+        """
+        for resultObject in results:
+            output.Record(resultObject)
+            yield resultObject
+
+    @staticmethod
+    def __listChangedFiles__(results, f, pathMaster: str, separator: str):
+        """
+        Writes the paths (relative to >>pathMaster<<) of all mismatched, missing and additional files of >>results<<
+        to text file >>f<<, and passes each result on.
+        """
+        for resultObject in results:
+            for fileName in resultObject.ChecksumMismatch + resultObject.MissingFiles + resultObject.AdditionalFiles:
+                f.write(os.path.relpath(os.path.join(resultObject.Path, str(fileName)), pathMaster) + separator)
+            yield resultObject
+
+    def __merge__(self, arguments: list) -> int:
+        """
+        Subcommand "merge": Combines the result files of all shards of a run into one report.
 
+        Parameters:
+            arguments (List[str]): List of arguments following "merge".
+
+        Returns:
+            int:    0, when all shards are complete and all results are PASS, else 1.
+        """
+        parser = argparse.ArgumentParser(prog="vrfy merge",
+                                         description="Combine the result files of sharded runs (--shard, --results)"
+                                                     " into one report.")
+        parser.add_argument("FILES", nargs="+", help="Result files written with --results")
+        parser.add_argument("-p", "--print", action="store_true", help="Print mismatched checksums")
+        args = parser.parse_args(arguments)
+        self.OPTION_PRINT = args.print
+
+        try:
+            result, results, errors, summaries = resultFile.Merge(args.FILES)
+        except (OSError, ValueError) as e:
+            print("ERROR: Unable to read results: " + str(e))
+            return 1
+        print("Merging results:")
+        for filePath, (header, summary) in zip(args.FILES, summaries):
+            line = str(filePath) + ": "
+            if header.get("shard") is not None:
+                line += "shard " + str(header["shard"][0]) + "/" + str(header["shard"][1]) + ", "
+            if summary is None:
+                line += "incomplete"
+            else:
+                stats = summary.get("stats", dict())
+                line += ("PASS" if summary.get("result") else "FAIL") + ", " + str(stats.get("Directories", 0)) + \
+                    " directories, " + progressDisplay.FormatBytes(stats.get("HashedBytes", 0)) + " hashed in " + \
+                    progressDisplay.FormatDuration(stats.get("Elapsed", 0))
+            print(line)
+        self.__printResults__(results)
+        for error in errors:
+            print("ERROR: " + error)
+        self.__printOverallResult__(result)
+        return 0 if result else 1
+
+    def __printResults__(self, results) -> bool:
+        """
+        Prints the per-directory results of an operation.
+
+        Parameters:
+            results (iterable): vrfy.Result objects, e.g. yielded by vrfy.Walk().
+
+        Returns:
+            bool:   True, when all results are PASS, else False.
+        """
+        resultVerify = True
+        self.__skippedBytes = 0
+        for resultObject in results:
+            if self.__profiler is not None:
+                start = time.perf_counter()
+            if self.__output is not None:
+                self.__output.Write(resultObject)
+            else:
+                if self.__progress is not None:
+                    self.__progress.Clear()
+                if resultObject.DirStatus == vrfy.DIR_MISSING:
+                    print(vrfy.DIR_MISSING + " " + resultObject.Path, end=" : ")
+                elif resultObject.DirStatus == vrfy.DIR_ADDITIONAL:
+                    print(vrfy.DIR_ADDITIONAL + " " + resultObject.PathBackup, end=" : ")
+                else:
+                    print(resultObject.Path, end=" : ")
+                self.__printResult__(resultObject)
+            if self.__profiler is not None:
+                self.__profiler.Add(vrfyProfiler.PHASE_OUTPUT, resultObject.Path, time.perf_counter() - start)
+            resultVerify = resultObject.Result and resultVerify
+            self.__skippedBytes += resultObject.SkippedBytes
         return resultVerify
 
+    def __preScan__(self, vf: vrfy, pathMaster: str, pathBackup: str) -> None:
+        """
+        Counts the files to process for progress and ETA, if requested.
+        """
+        # listed files are not counted in advance
+        if self.__prescan and self.__fileList is None:
+            vf.PreScan(pathMaster, pathBackup, recursive=self.OPTION_RECURSIVE, shard=self.__shard)
+
+    @staticmethod
+    def __writeStats__(vf: vrfy, filePath: str, arguments: list, returnCode: int) -> bool:
+        """
+        Writes the counters of >>vf<< as JSON report to >>filePath<< ("-": stdout).
+
+        Returns:
+            bool:   True, when the report was written.
+        """
+        report = {"version": vf.GetVersion(), "arguments": arguments, "result": returnCode == 0,
+                  "stats": vf.Stats.ToDict()}
+        try:
+            if filePath == "-":
+                print(json.dumps(report, indent=2))
+            else:
+                with open(filePath, "w") as f:
+                    json.dump(report, f, indent=2)
+                    f.write("\n")
+        except OSError:
+            print("ERROR: Unable to write statistics to " + str(filePath))
+            return False
+        return True
+
+    @staticmethod
+    def __writeProfile__(profiler: vrfyProfiler, profile: cProfile.Profile, filePath: str) -> bool:
+        """
+        Prints the time per phase and the slowest directories and files, and writes the profile to >>filePath<<:
+        cProfile statistics of >>profile<<, if given, else folded stacks of >>profiler<<.
+
+        Returns:
+            bool:   True, when the profile was written.
+        """
+        totals = profiler.Totals()
+        print("Profile: " + ", ".join(phase + " " + "{:.3f}".format(totals[phase]) + "s"
+                                      for phase in vrfyProfiler.PHASES) + " (read/hash summed over all jobs)")
+        for seconds, path in profiler.SlowestDirectories():
+            print("[SLOW DIR] " + "{:.3f}".format(seconds) + "s " + str(path))
+        for seconds, path in profiler.SlowestFiles():
+            print("[SLOW FILE] " + "{:.3f}".format(seconds) + "s " + str(path))
+        try:
+            if profile is not None:
+                profile.dump_stats(filePath)
+            else:
+                profiler.WriteFolded(filePath)
+        except OSError:
+            print("ERROR: Unable to write profile to " + str(filePath))
+            return False
+        print("Profile written to " + str(filePath))
+        return True
+
+    @staticmethod
+    def __parseDeviceJobs__(value: str) -> tuple:
+        """
+        Decodes a per-device concurrency argument "N" or "PATH=N".
+
+        Parameters:
+            value (str): Concurrency argument.
+
+        Returns:
+            path, jobs (str | None, int): Tuple. Path on the device (None for all devices) and number of jobs.
+        """
+        path, separator, jobs = value.rpartition("=")
+        try:
+            numJobs = int(jobs)
+        except ValueError:
+            raise argparse.ArgumentTypeError("invalid number of jobs: " + str(value))
+        if numJobs < 1:
+            raise argparse.ArgumentTypeError("number of jobs must be at least 1: " + str(value))
+        return (path if separator else None), numJobs
+
+    @staticmethod
+    def __readFileList__(source: str, separator: str, rootPath: str) -> list:
+        """
+        Reads a list of file paths for --files-from.
+
+        Parameters:
+            source (str): Path + name of the list, or "-" for stdin.
+            separator (str): Separator of the paths, "\\n" or "\\0".
+            rootPath (str): Directory the paths are relative to. Absolute paths below >>rootPath<< are accepted.
+
+        Returns:
+            List[str]: Paths relative to >>rootPath<<.
+
+        Raises:
+            OSError: List can not be read.
+            ValueError: A path is outside of >>rootPath<<.
+        """
+        if source == "-":
+            data = sys.stdin.buffer.read() if hasattr(sys.stdin, "buffer") else os.fsencode(sys.stdin.read())
+        else:
+            with open(source, "rb") as f:
+                data = f.read()
+        relativePaths = []
+        for entry in data.split(os.fsencode(separator)):
+            path = os.fsdecode(entry)
+            if separator == "\n":
+                path = path.rstrip("\r")
+            if path == "":
+                continue
+            if os.path.isabs(path):
+                path = os.path.relpath(path, os.path.abspath(rootPath))
+            normPath = os.path.normpath(path)
+            if normPath == os.pardir or normPath.startswith(os.pardir + os.sep):
+                raise ValueError("Path outside of " + str(rootPath) + ": " + path)
+            relativePaths.append(path)
+        return relativePaths
+
+    @staticmethod
+    def __expandFiles__(patterns: list) -> list:
+        """
+        Expands glob patterns of -f. Existing files and patterns without match are kept as they are.
+
+        Returns:
+            List[str]: Paths of all files, in order of >>patterns<< and sorted per pattern.
+        """
+        filePaths = []
+        for pattern in patterns:
+            if os.path.exists(pattern) or not any(character in pattern for character in "*?["):
+                filePaths.append(pattern)
+                continue
+            matches = sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+            filePaths.extend(matches if len(matches) > 0 else [pattern])
+        return filePaths
+
+    @staticmethod
+    def __parseShard__(value: str) -> tuple:
+        """
+        Decodes a shard argument "I/N".
+
+        Parameters:
+            value (str): Shard argument, e.g. "2/4".
+
+        Returns:
+            index, count (int, int): Tuple. Shard index (1 to count) and number of shards.
+        """
+        index, separator, count = value.partition("/")
+        try:
+            index = int(index)
+            count = int(count)
+        except ValueError:
+            raise argparse.ArgumentTypeError("invalid shard: " + str(value))
+        if separator == "" or count < 1 or not 1 <= index <= count:
+            raise argparse.ArgumentTypeError("shard must be I/N with 1 <= I <= N: " + str(value))
+        return index, count
+
+    @staticmethod
+    def __parseSize__(value: str) -> int:
+        """
+        Decodes a size argument with optional K/M/G suffix (powers of 1024).
+
+        Parameters:
+            value (str): Size argument, e.g. "4096", "256K" or "1M".
+
+        Returns:
+            int:    Size in bytes.
+        """
+        units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+        value = value.strip().upper().rstrip("B")
+        factor = 1
+        if len(value) > 0 and value[-1] in units:
+            factor = units[value[-1]]
+            value = value[:-1]
+        try:
+            size = int(value) * factor
+        except ValueError:
+            raise argparse.ArgumentTypeError("invalid size: " + str(value))
+        if size < 1:
+            raise argparse.ArgumentTypeError("size must be positive: " + str(value))
+        return size
+
     def __printResult__(self, result) -> None:
         if result.Result:
             print("PASS")
         else:
             print("FAILED!!!")
+        for badLine in result.BadLines:
+            print("[BAD LINE] " + str(badLine))
         for file in result.ChecksumMismatch:
             print("[MISMATCH] " + str(file))
+            if file in result.MismatchOffsets:
+                print("- First difference at byte: " + str(result.MismatchOffsets[file]))
+            if file in result.ChangedAttributes:
+                print("- Changed: " + ", ".join(result.ChangedAttributes[file]))
             if self.OPTION_PRINT:
                 print("- Master: " + result.MasterChecksums[file])
                 print("- Backup: " + result.BackupChecksums[file])
+        for file, movedTo in result.MovedFiles.items():
+            print("[MOVED] " + str(file) + " -> " + str(movedTo))
+        # directory verification: additional files are hashed in backup, missing files in master
+        # checksum verification: additional files are hashed in directory (master), missing files are known from sums
         for file in result.AdditionalFiles:
             print("[+] " + str(file))
             if self.OPTION_PRINT:
-                print("- cs: " + result.BackupChecksums[file])
+                print("- cs: " + result.BackupChecksums.get(file, result.MasterChecksums.get(file, "")))
         for file in result.MissingFiles:
             print("[-] " + str(file))
             if self.OPTION_PRINT:
-                print("- cs: " + result.MasterChecksums[file])
+                print("- cs: " + result.MasterChecksums.get(file, result.BackupChecksums.get(file, "")))
 
     def __printOverallResult__(self, res: bool):
         if res:
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+
+class digestIndex:
+    """
+    Index of files by size and hash digest across a whole directory tree, e.g. to find moved or duplicate files.
+
+    Files are bucketed by size first. Only files that share their size with another file (of another group, if groups
+    are given) are hashed, all other files can not have an identical copy. Empty files are not indexed.
+    """
+    def __init__(self):
+        # dict[size] = list of entries [group, name, filePath, stat, digest]
+        self.__sizes = dict()
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self.__sizes.values())
+
+    def Add(self, group, name: str, filePath: str, stat, digest: str = None) -> None:
+        """
+        Adds a file to the index.
+
+        Parameters:
+            group: Group of the file, e.g. "master"/"backup". Files are only compared to files of other groups,
+                    unless Resolve() is called with >>acrossGroups<< = False.
+            name (str): Name of the file reported by Match()/Groups(), e.g. its relative path.
+            filePath (str): Path + name of the file, used to hash it.
+            stat (os.stat_result): Stat result of the file.
+            digest (str): Optional, already known hash digest of the file.
+        """
+        if stat.st_size == 0:
+            return
+        self.__sizes.setdefault(stat.st_size, []).append([group, name, filePath, stat, digest])
+
+    def Resolve(self, calcChecksums, acrossGroups: bool = True, invalidDigests: tuple = ()) -> int:
+        """
+        Hashes all files without known digest that share their size with another file.
+
+        Parameters:
+            calcChecksums (callable): Function (filePaths, fileStats) -> list of hash digests.
+            acrossGroups (bool): Only hash files whose size also occurs in another group.
+            invalidDigests (tuple): Digests that mark unreadable files (e.g. vrfy.HASH_ERROR), they never match.
+
+        Returns:
+            int: Number of hashed files.
+        """
+        pending = []
+        for entries in self.__sizes.values():
+            if len(entries) < 2 or (acrossGroups and len(set(entry[0] for entry in entries)) < 2):
+                continue
+            pending.extend(entry for entry in entries if entry[4] is None or entry[4] in invalidDigests)
+        if len(pending) > 0:
+            digests = calcChecksums([entry[2] for entry in pending], [entry[3] for entry in pending])
+            for entry, digest in zip(pending, digests):
+                entry[4] = digest
+        for entries in self.__sizes.values():
+            for entry in entries:
+                if entry[4] in invalidDigests:
+                    entry[4] = None
+        return len(pending)
+
+    def Groups(self) -> list:
+        """
+        Returns all sets of files with identical contents (size and digest), after Resolve().
+
+        Returns:
+            List[tuple]: (digest, size, list of (group, name) sorted by name) per set of at least two files, sorted by
+                            the first name.
+        """
+        groups = []
+        for size, entries in self.__sizes.items():
+            digests = dict()
+            for group, name, filePath, stat, digest in entries:
+                if digest is not None:
+                    digests.setdefault(digest, []).append((group, name))
+            for digest, files in digests.items():
+                if len(files) > 1:
+                    groups.append((digest, size, sorted(files, key=lambda file: file[1])))
+        groups.sort(key=lambda group: group[2][0][1])
+        return groups
+
+    def Match(self, groupFrom, groupTo) -> list:
+        """
+        Pairs each file of >>groupFrom<< with a file of identical contents of >>groupTo<<, after Resolve(). Each file is
+        paired at most once, files with the same file name (i.e. moved, not renamed) are preferred.
+
+        Returns:
+            List[tuple]: (name in >>groupFrom<<, name in >>groupTo<<) pairs, sorted by the first name.
+        """
+        pairs = []
+        for digest, size, files in self.Groups():
+            namesFrom = [name for group, name in files if group == groupFrom]
+            namesTo = [name for group, name in files if group == groupTo]
+            for name in list(namesFrom):
+                baseName = name.rsplit("/", 1)[-1]
+                for candidate in namesTo:
+                    if candidate.rsplit("/", 1)[-1] == baseName:
+                        pairs.append((name, candidate))
+                        namesFrom.remove(name)
+                        namesTo.remove(candidate)
+                        break
+            pairs.extend(zip(namesFrom, namesTo))
+        pairs.sort()
+        return pairs
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+import os
+
+
+class dirSnapshot:
+    """
+    Contents of a single directory, read with one os.scandir() pass.
+
+    Entry types are taken from the directory listing, and stat results are fetched at most once per entry and kept
+    for later use (e.g. by the hash cache).
+    """
+    TYPE_FILE = "file"
+    TYPE_SYMLINK = "symlink"
+    TYPE_OTHER = "other"
+
+    def __init__(self, path: str, exists: bool, fileEntries: dict, dirs: list):
+        """
+        Parameters:
+            path (str): Path of the directory.
+            exists (bool): True, when >>path<< is a readable directory.
+            fileEntries (dict): dict[filename] = os.DirEntry, for all non-directory entries.
+            dirs (list): Names of all sub-directories.
+        """
+        self.Path = path
+        self.Exists = exists
+        self.Files = list(fileEntries.keys())
+        self.Dirs = dirs
+        # names of selected files, if the snapshot was restricted by Select()
+        self.Selection = None
+        self.__fileEntries = fileEntries
+
+    @classmethod
+    def Scan(cls, path: str, exclude=None):
+        """
+        Reads the directory >>path<< once and returns its snapshot.
+
+        Parameters:
+            path (str): Path of the directory.
+            exclude (callable): Optional, function (filename) -> bool. Files for which it returns True are left out.
+
+        Returns:
+            dirSnapshot: Snapshot of >>path<<. Attribute "Exists" is False, if >>path<< is no readable directory.
+        """
+        fileEntries = dict()
+        dirs = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    # follow symlinks, same as os.path.isdir()
+                    try:
+                        isDir = entry.is_dir()
+                    except OSError:
+                        isDir = False
+                    if isDir:
+                        dirs.append(entry.name)
+                    elif exclude is None or not exclude(entry.name):
+                        fileEntries[entry.name] = entry
+        except OSError:
+            return cls(path, False, dict(), [])
+        return cls(path, True, fileEntries, dirs)
+
+    def Select(self, fileNames):
+        """
+        Returns a snapshot of the same directory restricted to the files >>fileNames<<, without sub-directories.
+        Names of files that do not exist are kept in >>Selection<< of the returned snapshot.
+
+        Parameters:
+            fileNames (iterable): Names of files within the directory.
+
+        Returns:
+            dirSnapshot: Restricted snapshot.
+        """
+        selection = set(fileNames)
+        snapshot = dirSnapshot(self.Path, self.Exists, {fileName: entry for fileName, entry
+                                                        in self.__fileEntries.items() if fileName in selection}, [])
+        snapshot.Selection = selection
+        return snapshot
+
+    def FilePath(self, fileName: str) -> str:
+        """
+        Returns path + name of file >>fileName<<.
+        """
+        return os.path.join(self.Path, fileName)
+
+    def Stat(self, fileName: str):
+        """
+        Returns the (cached) stat result of file >>fileName<<.
+
+        Parameters:
+            fileName (str): Name of a file within the snapshot.
+
+        Returns:
+            os.stat_result | None: Stat result, or None if the file is unknown or can not be accessed.
+        """
+        entry = self.__fileEntries.get(fileName)
+        if entry is None:
+            return None
+        try:
+            return entry.stat()
+        except OSError:
+            return None
+
+    def FileType(self, fileName: str):
+        """
+        Returns the type of file >>fileName<< without following symbolic links.
+
+        Parameters:
+            fileName (str): Name of a file within the snapshot.
+
+        Returns:
+            str | None: "symlink", "file" (regular file) or "other" (e.g. FIFO or socket), or None if the file is
+                        unknown or can not be accessed.
+        """
+        entry = self.__fileEntries.get(fileName)
+        if entry is None:
+            return None
+        try:
+            if entry.is_symlink():
+                return self.TYPE_SYMLINK
+            if entry.is_file(follow_symlinks=False):
+                return self.TYPE_FILE
+        except OSError:
+            return None
+        return self.TYPE_OTHER
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+import os
+import sqlite3
+import threading
+import time
+
+
+class hashCache:
+    """
+    Persistent hash digest cache stored in a SQLite database.
+
+    Entries are keyed on (device, inode, algorithm) and are only considered valid while size, mtime_ns and ctime_ns of
+    the file still match the stored values. Least recently used entries are evicted when the cache exceeds
+    >>maxEntries<<.
+    """
+    FILE_NAME = "hashcache.sqlite"
+    SCHEMA_VERSION = 2
+    DEFAULT_MAX_ENTRIES = 1000000
+
+    def __init__(self, cacheDir: str, maxEntries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Parameters:
+            cacheDir (str): Directory the cache database is stored in. Gets created if it does not exist.
+            maxEntries (int): Maximum number of cache entries kept after eviction.
+        """
+        os.makedirs(cacheDir, exist_ok=True)
+        self.Path = os.path.join(cacheDir, self.FILE_NAME)
+        self.MaxEntries = max(0, int(maxEntries))
+        self.Hits = 0
+        self.Misses = 0
+        self.Evictions = 0
+        self.__lock = threading.Lock()
+        self.__usedKeys = []
+        self.__db = sqlite3.connect(self.Path, check_same_thread=False)
+        self.__initSchema__()
+
+    @staticmethod
+    def GetDefaultDir() -> str:
+        """
+        Returns the default cache directory ($XDG_CACHE_HOME/vrfy or ~/.cache/vrfy).
+
+        Returns:
+            str: Path of default cache directory.
+        """
+        baseDir = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        return os.path.join(baseDir, "vrfy")
+
+    def Lookup(self, fileStat: os.stat_result, algorithm: str):
+        """
+        Returns the cached hash digest for a file, if its stat still matches the cached entry.
+
+        Parameters:
+            fileStat (os.stat_result): Stat result of the file.
+            algorithm (str): Hash algorithm of the requested digest.
+
+        Returns:
+            str | None: Cached hash digest, or None on cache miss.
+        """
+        with self.__lock:
+            key = self.__key__(fileStat) + (algorithm,)
+            row = self.__db.execute("SELECT size, mtime_ns, ctime_ns, digest FROM checksums "
+                                    "WHERE dev = ? AND ino = ? AND algorithm = ?", key).fetchone()
+            if row is not None and row[:3] == (fileStat.st_size, fileStat.st_mtime_ns, fileStat.st_ctime_ns):
+                self.Hits += 1
+                self.__usedKeys.append(key)
+                return row[3]
+            self.Misses += 1
+            return None
+
+    def Store(self, fileStat: os.stat_result, algorithm: str, digest: str) -> None:
+        """
+        Adds or replaces the cache entry of a file.
+
+        Parameters:
+            fileStat (os.stat_result): Stat result of the file taken before hashing.
+            algorithm (str): Hash algorithm of >>digest<<.
+            digest (str): Hash digest of the file.
+        """
+        with self.__lock:
+            self.__db.execute("INSERT OR REPLACE INTO checksums (dev, ino, algorithm, size, mtime_ns, ctime_ns, "
+                              "digest, last_used) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                              self.__key__(fileStat) + (algorithm, fileStat.st_size, fileStat.st_mtime_ns,
+                                                        fileStat.st_ctime_ns, digest, time.time()))
+
+    def Commit(self) -> None:
+        """
+        Writes pending cache entries and access times to disk.
+        """
+        with self.__lock:
+            if len(self.__usedKeys) > 0:
+                now = time.time()
+                self.__db.executemany("UPDATE checksums SET last_used = ? WHERE dev = ? AND ino = ? AND algorithm = ?",
+                                      [(now,) + key for key in self.__usedKeys])
+                self.__usedKeys = []
+            self.__db.commit()
+
+    def Evict(self) -> None:
+        """
+        Removes least recently used entries until at most >>MaxEntries<< entries are left.
+        """
+        self.Commit()
+        with self.__lock:
+            count = self.__db.execute("SELECT COUNT(*) FROM checksums").fetchone()[0]
+            if count > self.MaxEntries:
+                self.__db.execute("DELETE FROM checksums WHERE rowid IN "
+                                  "(SELECT rowid FROM checksums ORDER BY last_used ASC LIMIT ?)",
+                                  (count - self.MaxEntries,))
+                self.__db.commit()
+                self.Evictions += count - self.MaxEntries
+
+    def Close(self) -> None:
+        """
+        Commits pending changes, evicts surplus entries and closes the database.
+        """
+        if self.__db is not None:
+            self.Evict()
+            self.__db.close()
+            self.__db = None
+
+    @staticmethod
+    def __key__(fileStat: os.stat_result) -> tuple:
+        """
+        Returns the (device, inode) key of a file, mapped into the signed 64 bit integer range of SQLite.
+        """
+        return tuple(value - (1 << 64) if value >= (1 << 63) else value
+                     for value in (fileStat.st_dev, fileStat.st_ino))
+
+    def __initSchema__(self) -> None:
+        """
+        Creates the cache table, and drops caches written with a different schema version.
+        """
+        version = self.__db.execute("PRAGMA user_version").fetchone()[0]
+        if version != self.SCHEMA_VERSION:
+            self.__db.execute("DROP TABLE IF EXISTS checksums")
+            self.__db.execute("PRAGMA user_version = " + str(int(self.SCHEMA_VERSION)))
+        self.__db.execute("CREATE TABLE IF NOT EXISTS checksums (dev INTEGER NOT NULL, ino INTEGER NOT NULL, "
+                          "algorithm TEXT NOT NULL, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, "
+                          "ctime_ns INTEGER NOT NULL, digest TEXT NOT NULL, last_used REAL NOT NULL, "
+                          "PRIMARY KEY (dev, ino, algorithm))")
+        self.__db.execute("CREATE INDEX IF NOT EXISTS checksums_last_used ON checksums (last_used)")
+        self.__db.commit()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+import concurrent.futures
+
+
+class hashExecutor:
+    """
+    Executes hashing jobs either serially, on a thread pool or on a process pool.
+    Results are always returned in the order of the submitted items.
+    """
+    BACKEND_SERIAL = "serial"
+    BACKEND_THREAD = "thread"
+    BACKEND_PROCESS = "process"
+    BACKENDS = (BACKEND_SERIAL, BACKEND_THREAD, BACKEND_PROCESS)
+
+    def __init__(self, jobs: int = 1, backend: str = BACKEND_THREAD):
+        """
+        Parameters:
+            jobs (int): Number of concurrent hashing jobs. Values below 2 select serial execution.
+            backend (str): One of "serial", "thread" or "process".
+        """
+        if backend not in self.BACKENDS:
+            raise ValueError("Unknown executor backend: " + str(backend))
+        self.Jobs = max(1, int(jobs))
+        self.Backend = backend if self.Jobs > 1 else self.BACKEND_SERIAL
+        self.__pool = None
+
+    def Map(self, func, items: list, fileStats: list = None) -> list:
+        """
+        Applies >>func<< to all >>items<< and returns the results in the order of >>items<<.
+
+        Parameters:
+            func (callable): Function taking a single item. Must be picklable for the process backend.
+            items (list): Items to process.
+            fileStats (list): Optional, stat results of the items' files. Not used by this executor.
+
+        Returns:
+            list: Results of >>func<< in the order of >>items<<.
+        """
+        items = list(items)
+        if self.Backend == self.BACKEND_SERIAL or len(items) < 2:
+            return [func(item) for item in items]
+        pool = self.__getPool__()
+        if self.Backend == self.BACKEND_PROCESS:
+            # reduce inter process communication for directories with many small files
+            chunksize = max(1, len(items) // (self.Jobs * 4))
+            return list(pool.map(func, items, chunksize=chunksize))
+        return list(pool.map(func, items))
+
+    def Close(self) -> None:
+        """
+        Shuts down the worker pool, if one was started.
+        """
+        if self.__pool is not None:
+            self.__pool.shutdown(wait=True)
+            self.__pool = None
+
+    def __getPool__(self):
+        """
+        Returns the worker pool and starts it on first use.
+        """
+        if self.__pool is None:
+            if self.Backend == self.BACKEND_PROCESS:
+                self.__pool = concurrent.futures.ProcessPoolExecutor(max_workers=self.Jobs)
+            else:
+                self.__pool = concurrent.futures.ThreadPoolExecutor(max_workers=self.Jobs)
+        return self.__pool
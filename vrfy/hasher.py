@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+import hashlib
+import mmap
+import os
+import random
+import stat
+import threading
+import time
+
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+
+class hasher:
+    """
+    Calculates file hash digests.
+
+    Instances only hold plain configuration values, so that bound methods can be pickled and handed over to the
+    worker processes of a process pool.
+    """
+    HASH_ERROR = "ERROR"
+
+    ALGORITHM_SHA256 = "sha256"
+    ALGORITHM_BLAKE2B = "blake2b"
+    ALGORITHM_BLAKE3 = "blake3"
+    ALGORITHM_XXH3 = "xxh3"
+    ALGORITHM_XXH128 = "xxh128"
+    ALGORITHMS = (ALGORITHM_SHA256, ALGORITHM_BLAKE2B, ALGORITHM_BLAKE3, ALGORITHM_XXH3, ALGORITHM_XXH128)
+    DEFAULT_ALGORITHM = ALGORITHM_SHA256
+    # optional dependencies (pip extras) of the non-hashlib algorithms
+    DEPENDENCIES = {ALGORITHM_BLAKE3: "blake3", ALGORITHM_XXH3: "xxhash", ALGORITHM_XXH128: "xxhash"}
+    # digest size in bytes, hex digests are twice as long
+    DIGEST_SIZES = {ALGORITHM_SHA256: 32, ALGORITHM_BLAKE2B: 64, ALGORITHM_BLAKE3: 32, ALGORITHM_XXH3: 8,
+                    ALGORITHM_XXH128: 16}
+
+    DEFAULT_BLOCK_SIZE = 1024 * 1024
+    # files below this size are always read with readinto(), mapping them costs more than copying
+    MMAP_THRESHOLD = 16 * 1024 * 1024
+    # maximum size of a block compared by CompareSamples()
+    SAMPLE_SIZE = 64 * 1024
+
+    def __init__(self, algorithm: str = DEFAULT_ALGORITHM, blockSize: int = DEFAULT_BLOCK_SIZE, useMmap: bool = False,
+                 dropCache: bool = False):
+        """
+        Parameters:
+            algorithm (str): Hash algorithm, one of hasher.ALGORITHMS.
+            blockSize (int): Number of bytes read and hashed per step.
+            useMmap (bool): Hash large regular files through a memory map instead of reading them into a buffer.
+                            Note: Truncating a file while it is mapped terminates the process with SIGBUS.
+            dropCache (bool): Advise the kernel to drop hashed file contents from the page cache (POSIX only).
+        """
+        if algorithm not in self.ALGORITHMS:
+            raise ValueError("Unknown hash algorithm: " + str(algorithm))
+        if blockSize < 1:
+            raise ValueError("Block size must be positive: " + str(blockSize))
+        self.Algorithm = algorithm
+        self.BlockSize = int(blockSize)
+        self.UseMmap = useMmap
+        self.DropCache = dropCache
+        self.__local = threading.local()
+
+    def __getstate__(self) -> dict:
+        # read buffers are per thread and not pickled, they get recreated in worker processes
+        state = self.__dict__.copy()
+        del state["_hasher__local"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.__local = threading.local()
+
+    @classmethod
+    def IsAvailable(cls, algorithm: str) -> bool:
+        """
+        Returns True, if >>algorithm<< is known and its (optional) dependency is installed.
+        """
+        if cls.DEPENDENCIES.get(algorithm) == "blake3":
+            return blake3 is not None
+        if cls.DEPENDENCIES.get(algorithm) == "xxhash":
+            return xxhash is not None
+        return algorithm in cls.ALGORITHMS
+
+    @classmethod
+    def CheckAvailable(cls, algorithm: str) -> None:
+        """
+        Checks that the optional dependency of hash algorithm >>algorithm<< is installed.
+
+        Raises:
+            ValueError: Dependency of >>algorithm<< is not installed.
+        """
+        if algorithm in cls.DEPENDENCIES and not cls.IsAvailable(algorithm):
+            raise ValueError("Hash algorithm " + algorithm + " requires package '" + cls.DEPENDENCIES[algorithm] +
+                             "', install with: pip install vrfy[" + cls.DEPENDENCIES[algorithm] + "]")
+
+    def NewHash(self):
+        """
+        Returns a new hash object of the configured algorithm, providing update() and hexdigest().
+        """
+        if self.Algorithm == self.ALGORITHM_SHA256:
+            return hashlib.sha256()
+        if self.Algorithm == self.ALGORITHM_BLAKE2B:
+            return hashlib.blake2b()
+        self.CheckAvailable(self.Algorithm)
+        if self.Algorithm == self.ALGORITHM_BLAKE3:
+            return blake3.blake3()
+        if self.Algorithm == self.ALGORITHM_XXH3:
+            return xxhash.xxh3_64()
+        return xxhash.xxh3_128()
+
+    def CalcChecksum(self, filePath: str) -> str:
+        """
+        Calculates and returns file hash for >>filePath<<.
+
+        Parameters:
+            filePath (str): Path and name of the file that shall get hashed.
+
+        Returns:
+            str: Hash digest, or HASH_ERROR if the file could not be read or the algorithm is not available.
+        """
+        return self.__calcChecksum__(filePath, None)
+
+    def CalcChecksumStats(self, filePath: str) -> tuple:
+        """
+        Calculates the file hash for >>filePath<< and measures the time spent reading and hashing.
+
+        Parameters:
+            filePath (str): Path and name of the file that shall get hashed.
+
+        Returns:
+            digest, numBytes, readTime, hashTime (str, int, float, float): Tuple. Hash digest (see CalcChecksum()),
+                                                                            number of bytes hashed, and seconds spent
+                                                                            waiting for reads and hashing. Memory
+                                                                            mapped files count as hashing only.
+        """
+        timing = [0, 0.0, 0.0]
+        digest = self.__calcChecksum__(filePath, timing)
+        return digest, timing[0], timing[1], timing[2]
+
+    def __calcChecksum__(self, filePath: str, timing) -> str:
+        """
+        Calculates and returns file hash for >>filePath<<, see CalcChecksum(). Adds number of bytes, read time and hash
+        time to list >>timing<<, if not None.
+        """
+        try:
+            fileHash = self.NewHash()
+        except ValueError:
+            return self.HASH_ERROR
+        try:
+            # unbuffered file object, readinto() reads straight into the preallocated buffer
+            with open(filePath, 'rb', buffering=0) as f:
+                fd = f.fileno()
+                self.__advise__(fd, "POSIX_FADV_SEQUENTIAL")
+                fileStat = os.fstat(fd) if self.UseMmap else None
+                if fileStat is not None and stat.S_ISREG(fileStat.st_mode) and fileStat.st_size >= self.MMAP_THRESHOLD:
+                    self.__hashMmap__(fd, fileHash, timing)
+                else:
+                    self.__hashReadinto__(f, fileHash, timing)
+                if self.DropCache:
+                    self.__advise__(fd, "POSIX_FADV_DONTNEED")
+        except (OSError, ValueError):
+            return self.HASH_ERROR
+        return str(fileHash.hexdigest())
+
+    def CompareSamples(self, filePair: tuple) -> tuple:
+        """
+        Compares sampled blocks of two equally sized files: The first and last block, and >>numRandom<< blocks at
+        pseudo random offsets (seeded with the file size, i.e. reproducible). Files too small to benefit from
+        sampling are reported as equal.
+
+        Parameters:
+            filePair (tuple): (pathA, pathB, size, numRandom).
+
+        Returns:
+            equal, bytesRead (bool, int): Tuple. False, if any sampled block differs or a file is unreadable.
+        """
+        pathA, pathB, size, numRandom = filePair
+        sampleSize = min(self.BlockSize, self.SAMPLE_SIZE)
+        if size <= sampleSize * (numRandom + 2):
+            return True, 0
+        rand = random.Random(size)
+        offsets = [0] + sorted(rand.randrange(sampleSize, size - sampleSize) for _ in range(numRandom))
+        offsets.append(size - sampleSize)
+        bytesRead = 0
+        try:
+            with open(pathA, 'rb', buffering=0) as fA, open(pathB, 'rb', buffering=0) as fB:
+                for offset in offsets:
+                    fA.seek(offset)
+                    fB.seek(offset)
+                    blockA = fA.read(sampleSize)
+                    blockB = fB.read(sampleSize)
+                    bytesRead += len(blockA) + len(blockB)
+                    if blockA != blockB:
+                        return False, bytesRead
+        except OSError:
+            # leave error handling to full hashing
+            return True, bytesRead
+        return True, bytesRead
+
+    def CompareFiles(self, filePair: tuple) -> tuple:
+        """
+        Compares two files byte by byte, reading both in lockstep, and stops at the first differing block. Optionally
+        hashes file A in the same pass; if the files differ, the remainder of file A is read for its digest.
+
+        Parameters:
+            filePair (tuple): (pathA, pathB, computeDigest).
+
+        Returns:
+            equal, offset, digest (bool, int | None, str | None): Tuple. Comparison result, offset of first differing
+                                                                  byte (None if equal or unreadable), and hash digest
+                                                                  of file A (None if not requested, HASH_ERROR on
+                                                                  read errors).
+        """
+        pathA, pathB, computeDigest = filePair
+        try:
+            fileHash = self.NewHash() if computeDigest else None
+        except ValueError:
+            fileHash = None
+            computeDigest = False
+        bufferA = self.__getBuffer__(0)
+        bufferB = self.__getBuffer__(1)
+        viewA = memoryview(bufferA)
+        viewB = memoryview(bufferB)
+        offset = 0
+        try:
+            with open(pathA, 'rb', buffering=0) as fA, open(pathB, 'rb', buffering=0) as fB:
+                self.__advise__(fA.fileno(), "POSIX_FADV_SEQUENTIAL")
+                self.__advise__(fB.fileno(), "POSIX_FADV_SEQUENTIAL")
+                while True:
+                    numA = self.__readFull__(fA, viewA)
+                    numB = self.__readFull__(fB, viewB)
+                    if fileHash is not None:
+                        fileHash.update(viewA[:numA])
+                    if numA == numB == self.BlockSize:
+                        # bytearray comparison runs as a single memcmp()
+                        equal = bufferA == bufferB
+                    else:
+                        equal = viewA[:numA].tobytes() == viewB[:numB].tobytes()
+                    if not equal:
+                        offset += self.__firstDifference__(viewA[:numA], viewB[:numB])
+                        if fileHash is not None:
+                            self.__hashReadinto__(fA, fileHash)
+                        return False, offset, fileHash.hexdigest() if fileHash is not None else None
+                    if numA == 0:
+                        break
+                    offset += numA
+                if self.DropCache:
+                    self.__advise__(fA.fileno(), "POSIX_FADV_DONTNEED")
+                    self.__advise__(fB.fileno(), "POSIX_FADV_DONTNEED")
+        except OSError:
+            return False, None, self.HASH_ERROR if computeDigest else None
+        return True, None, fileHash.hexdigest() if fileHash is not None else None
+
+    @staticmethod
+    def __readFull__(f, view: memoryview) -> int:
+        """
+        Fills >>view<< from file object >>f<< and returns the number of bytes read; less than len(view) only at EOF.
+        """
+        total = 0
+        while total < len(view):
+            numBytes = f.readinto(view[total:])
+            if not numBytes:
+                break
+            total += numBytes
+        return total
+
+    @staticmethod
+    def __firstDifference__(viewA: memoryview, viewB: memoryview) -> int:
+        """
+        Returns the index of the first differing byte of two blocks (or the length of the shorter block).
+        """
+        length = min(len(viewA), len(viewB))
+        chunk = 4096
+        start = 0
+        # narrow down in chunks first, then find the byte within the chunk
+        while start < length and viewA[start:start + chunk].tobytes() == viewB[start:start + chunk].tobytes():
+            start += chunk
+        for index in range(start, min(start + chunk, length)):
+            if viewA[index] != viewB[index]:
+                return index
+        return length
+
+    def __hashReadinto__(self, f, fileHash, timing=None) -> None:
+        """
+        Feeds the contents of file object >>f<< into >>fileHash<< using a reusable per thread buffer.
+        Number of bytes, read time and hash time are added to list >>timing<<, if not None.
+        """
+        buffer = self.__getBuffer__()
+        view = memoryview(buffer)
+        if timing is None:
+            while True:
+                numBytes = f.readinto(buffer)
+                if not numBytes:
+                    break
+                fileHash.update(view[:numBytes])
+            return
+        while True:
+            start = time.perf_counter()
+            numBytes = f.readinto(buffer)
+            read = time.perf_counter()
+            timing[1] += read - start
+            if not numBytes:
+                break
+            fileHash.update(view[:numBytes])
+            timing[2] += time.perf_counter() - read
+            timing[0] += numBytes
+
+    def __hashMmap__(self, fd: int, fileHash, timing=None) -> None:
+        """
+        Feeds the contents of file descriptor >>fd<< into >>fileHash<< through a read-only memory map.
+        Number of bytes and hash time (including page faults) are added to list >>timing<<, if not None.
+        """
+        start = time.perf_counter()
+        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mapped:
+            if hasattr(mapped, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            view = memoryview(mapped)
+            try:
+                for offset in range(0, len(mapped), self.BlockSize):
+                    fileHash.update(view[offset:offset + self.BlockSize])
+            finally:
+                view.release()
+            if timing is not None:
+                timing[0] += len(mapped)
+                timing[2] += time.perf_counter() - start
+
+    def __getBuffer__(self, index: int = 0) -> bytearray:
+        """
+        Returns read buffer >>index<< of the calling thread, and allocates it on first use.
+        """
+        buffers = getattr(self.__local, "buffers", None)
+        if buffers is None:
+            buffers = self.__local.buffers = dict()
+        if index not in buffers or len(buffers[index]) != self.BlockSize:
+            buffers[index] = bytearray(self.BlockSize)
+        return buffers[index]
+
+    @staticmethod
+    def __advise__(fd: int, advice: str) -> None:
+        """
+        Passes posix_fadvise() >>advice<< for the whole file, if supported by the platform.
+        """
+        if hasattr(os, "posix_fadvise") and hasattr(os, advice):
+            try:
+                os.posix_fadvise(fd, 0, 0, getattr(os, advice))
+            except OSError:
+                pass
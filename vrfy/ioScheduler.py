@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+import concurrent.futures
+import os
+import threading
+
+
+class ioScheduler:
+    """
+    Executes hashing jobs with one worker queue per storage device (st_dev), so that files on different devices are
+    read at the same time, while the number of concurrent reads per device stays bounded (e.g. 1 for hard disks to
+    avoid seeking). Jobs of a device are executed in inode order, which approximates the on-disk order on most file
+    systems. Results are always returned in the order of the submitted items.
+
+    Jobs reading several files at once (e.g. master/backup pairs compared in lockstep) get a queue of their own, but
+    count against the concurrency of each of their devices.
+    """
+    DEFAULT_DEVICE_JOBS = 1
+
+    def __init__(self, deviceJobs: int = DEFAULT_DEVICE_JOBS, deviceOverrides: dict = None):
+        """
+        Parameters:
+            deviceJobs (int): Number of concurrent jobs per device.
+            deviceOverrides (dict): Optional, dict[st_dev] = number of concurrent jobs for individual devices, e.g.
+                                    more jobs for SSDs/NVMe.
+        """
+        self.DeviceJobs = max(1, int(deviceJobs))
+        self.DeviceOverrides = {device: max(1, int(jobs)) for device, jobs in (deviceOverrides or dict()).items()}
+        self.__pools = dict()
+        # dict[st_dev] = semaphore bounding the concurrent jobs of a device across all queues
+        self.__limits = dict()
+        self.__lock = threading.Lock()
+
+    def Map(self, func, items: list, fileStats: list = None) -> list:
+        """
+        Applies >>func<< to all >>items<< and returns the results in the order of >>items<<.
+
+        Parameters:
+            func (callable): Function taking a single item.
+            items (list): Items to process: file paths, or tuples starting with file paths (e.g. file pairs).
+            fileStats (list): Optional, known stat results of the items' (first) file paths (None for unknown
+                                entries). Missing stat results are read by the scheduler.
+
+        Returns:
+            list: Results of >>func<< in the order of >>items<<.
+        """
+        items = list(items)
+        # group items by device(s) and order them by inode within each group
+        queues = dict()
+        for index, item in enumerate(items):
+            fileStat = fileStats[index] if fileStats is not None else None
+            device, inode = self.__locate__(item, fileStat)
+            queues.setdefault(device, []).append((inode, index))
+        for queue in queues.values():
+            queue.sort()
+
+        if len(queues) == 1 and self.__getJobs__(next(iter(queues))) == 1:
+            # a single sequential queue needs no worker thread
+            results = [None] * len(items)
+            for inode, index in next(iter(queues.values())):
+                results[index] = func(items[index])
+            return results
+
+        futures = [None] * len(items)
+        for device, queue in queues.items():
+            pool = self.__getPool__(device)
+            limits = self.__getLimits__(device)
+            # a pool executes its jobs in submission order
+            for inode, index in queue:
+                futures[index] = pool.submit(self.__run__, func, items[index], limits)
+        return [future.result() for future in futures]
+
+    def Close(self) -> None:
+        """
+        Shuts down all device worker pools.
+        """
+        with self.__lock:
+            pools = list(self.__pools.values())
+            self.__pools = dict()
+            self.__limits = dict()
+        for pool in pools:
+            pool.shutdown(wait=True)
+
+    @staticmethod
+    def GetDevice(path: str):
+        """
+        Returns the device (st_dev) of >>path<<, or None if it can not be accessed.
+        """
+        try:
+            return os.stat(path).st_dev
+        except OSError:
+            return None
+
+    def __getJobs__(self, device) -> int:
+        """
+        Returns the number of concurrent jobs of a device (group).
+        """
+        if isinstance(device, tuple):
+            # jobs reading from several devices are limited by the slowest one
+            return min(self.__getJobs__(member) for member in device)
+        return self.DeviceOverrides.get(device, self.DeviceJobs)
+
+    def __getPool__(self, device) -> concurrent.futures.ThreadPoolExecutor:
+        """
+        Returns the worker pool of a device (group) and starts it on first use.
+        """
+        with self.__lock:
+            if device not in self.__pools:
+                self.__pools[device] = concurrent.futures.ThreadPoolExecutor(max_workers=self.__getJobs__(device))
+            return self.__pools[device]
+
+    def __getLimits__(self, device) -> list:
+        """
+        Returns the semaphores of all devices of a device (group), in a fixed order so that jobs of different groups
+        can not deadlock.
+        """
+        devices = sorted(set(device), key=repr) if isinstance(device, tuple) else [device]
+        with self.__lock:
+            for member in devices:
+                if member not in self.__limits:
+                    self.__limits[member] = threading.Semaphore(self.__getJobs__(member))
+            return [self.__limits[member] for member in devices]
+
+    @staticmethod
+    def __run__(func, item, limits: list):
+        """
+        Executes >>func<< on >>item<< once a job slot of each of its devices is free.
+        """
+        for limit in limits:
+            limit.acquire()
+        try:
+            return func(item)
+        finally:
+            for limit in reversed(limits):
+                limit.release()
+
+    @staticmethod
+    def __locate__(item, fileStat) -> tuple:
+        """
+        Returns the device and inode of an item. Items with several files (e.g. master/backup pairs read in lockstep)
+        are assigned to the group of all their devices, ordered by the inode of their first file.
+        """
+        paths = [item] if isinstance(item, str) else [value for value in item if isinstance(value, str)]
+        devices = []
+        inode = 0
+        for position, path in enumerate(paths):
+            pathStat = fileStat if position == 0 else None
+            if pathStat is None:
+                try:
+                    pathStat = os.stat(path)
+                except OSError:
+                    pathStat = None
+            if position == 0 and pathStat is not None:
+                inode = pathStat.st_ino
+            devices.append(pathStat.st_dev if pathStat is not None else None)
+        if len(set(devices)) <= 1:
+            return (devices[0] if len(devices) > 0 else None), inode
+        return tuple(devices), inode
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+import bisect
+import os
+from vrfy.hasher import hasher
+from vrfy.checksumFormat import checksumFormat
+
+
+class manifest:
+    """
+    Checksums of a whole directory tree, stored in a single file at the tree root instead of one sums.csv per
+    directory.
+
+    Entries are kept sorted by (directory components, filename), which is the order vrfy.Walk() visits directories in,
+    so the entries of a directory are found with a binary search.
+
+    File format: header "#vrfy-manifest;<format version>;<hash algorithm>", followed by one line per file:
+    "<relative path>;<hash digest>;<size>;<mtime_ns>". Relative paths use "/" as separator and are quoted like file
+    names of sums.csv-files, size and mtime_ns may be empty if unknown. Unreadable lines are reported in >>BadLines<<.
+    """
+    FILE_NAME = "vrfy.manifest"
+    HEADER = "#vrfy-manifest"
+    VERSION = 1
+
+    def __init__(self, rootPath: str, algorithm: str):
+        """
+        Parameters:
+            rootPath (str): Path of the directory tree root, relative paths are resolved against it.
+            algorithm (str): Hash algorithm of all digests in the manifest.
+        """
+        self.Path = rootPath
+        self.Algorithm = algorithm
+        # sorted lists of (directory components, filename) and (hash digest, size, mtime_ns)
+        self.__keys = []
+        self.__entries = []
+        self.__sorted = True
+        # unreadable lines of the manifest file: list of (line number, reason)
+        self.BadLines = []
+
+    @classmethod
+    def Read(cls, rootPath: str, filePath: str = None):
+        """
+        Reads the manifest of the directory tree at >>rootPath<<.
+
+        Parameters:
+            rootPath (str): Path of the directory tree root.
+            filePath (str): Path + name of the manifest file (default: >>rootPath<</vrfy.manifest).
+
+        Returns:
+            manifest: Manifest read from file.
+
+        Raises:
+            OSError: Manifest file can not be read.
+            ValueError: Manifest file has no valid header.
+        """
+        if filePath is None:
+            filePath = os.path.join(rootPath, cls.FILE_NAME)
+        with open(filePath, "r", newline="\n") as f:
+            header = checksumFormat.StripLineEnd(f.readline()).split(";")
+            if len(header) != 3 or header[0] != cls.HEADER or not header[1].isdigit():
+                raise ValueError("Invalid manifest header: " + str(filePath))
+            result = cls(rootPath, header[2])
+            digestLength = 2 * hasher.DIGEST_SIZES.get(result.Algorithm, 0)
+            for lineNumber, line in enumerate(f, 2):
+                line = checksumFormat.StripLineEnd(line)
+                if line == "":
+                    continue
+                # paths may include ";", digest, size and mtime are the last fields
+                entry = line.rsplit(";", 3)
+                if len(entry) != 4 or entry[0] == "":
+                    result.BadLines.append((lineNumber, "invalid line format"))
+                    continue
+                if len(entry[1]) != digestLength:
+                    result.BadLines.append((lineNumber, "invalid hash digest length"))
+                    continue
+                if not checksumFormat.IsHexDigest(entry[1]):
+                    result.BadLines.append((lineNumber, "invalid hash digest"))
+                    continue
+                try:
+                    relativePath = checksumFormat.UnquoteFileName(entry[0])
+                except ValueError:
+                    result.BadLines.append((lineNumber, "invalid quoted file name"))
+                    continue
+                parts = relativePath.split("/")
+                result.Add(tuple(parts[:-1]), parts[-1], entry[1].lower(),
+                           int(entry[2]) if entry[2].isdigit() else None,
+                           int(entry[3]) if entry[3].isdigit() else None)
+        return result
+
+    def Write(self, f) -> None:
+        """
+        Writes header and all entries in sorted order to text file object >>f<<.
+        """
+        self.__sort__()
+        f.write(self.HEADER + ";" + str(self.VERSION) + ";" + self.Algorithm + "\n")
+        for (dirParts, fileName), (digest, size, mtime) in zip(self.__keys, self.__entries):
+            f.write(checksumFormat.QuoteFileName("/".join(dirParts + (fileName,))) + ";" + digest + ";" +
+                    ("" if size is None else str(size)) + ";" + ("" if mtime is None else str(mtime)) + "\n")
+
+    def RelativeDir(self, path: str) -> tuple:
+        """
+        Returns the components of directory >>path<< relative to the manifest root, e.g. ("a", "b") or () for the
+        root itself.
+        """
+        relPath = os.path.relpath(path, self.Path)
+        if relPath == os.curdir:
+            return ()
+        return tuple(relPath.split(os.sep))
+
+    def Add(self, dirParts: tuple, fileName: str, digest: str, size: int = None, mtime: int = None) -> None:
+        """
+        Adds an entry for file >>fileName<< in directory >>dirParts<< (see RelativeDir()).
+        """
+        key = (tuple(dirParts), fileName)
+        if self.__sorted and len(self.__keys) > 0 and key < self.__keys[-1]:
+            self.__sorted = False
+        self.__keys.append(key)
+        self.__entries.append((digest, size, mtime))
+
+    def Lookup(self, dirParts: tuple) -> list:
+        """
+        Returns all entries of directory >>dirParts<< (see RelativeDir()).
+
+        Returns:
+            list: List of (filename, hash digest, size, mtime_ns) tuples, sorted by filename.
+        """
+        self.__sort__()
+        dirParts = tuple(dirParts)
+        index = bisect.bisect_left(self.__keys, (dirParts, ""))
+        entries = []
+        while index < len(self.__keys) and self.__keys[index][0] == dirParts:
+            entries.append((self.__keys[index][1],) + self.__entries[index])
+            index += 1
+        return entries
+
+    def Directories(self) -> list:
+        """
+        Returns the components of all directories with entries, in sorted order.
+        """
+        self.__sort__()
+        dirs = []
+        for dirParts, fileName in self.__keys:
+            if len(dirs) == 0 or dirs[-1] != dirParts:
+                dirs.append(dirParts)
+        return dirs
+
+    def __len__(self) -> int:
+        return len(self.__keys)
+
+    def __sort__(self) -> None:
+        """
+        Restores the sort order after entries were added out of order.
+        """
+        if not self.__sorted:
+            order = sorted(range(len(self.__keys)), key=self.__keys.__getitem__)
+            self.__keys = [self.__keys[index] for index in order]
+            self.__entries = [self.__entries[index] for index in order]
+            self.__sorted = True
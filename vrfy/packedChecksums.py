@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+import collections.abc
+
+
+class packedChecksums(collections.abc.MutableMapping):
+    """
+    Dictionary dict[filename] = hash digest, which stores hex digests as raw bytes in a single packed bytearray and
+    converts them back to hex strings on access. Values that are no lowercase hex digest of the common length (e.g.
+    HASH_ERROR) are stored as they are.
+    """
+    def __init__(self, *args, **kwargs):
+        self.__index = dict()
+        self.__digests = bytearray()
+        self.__width = None
+        # dict[index] = value, for values that can not be packed
+        self.__special = dict()
+        self.update(*args, **kwargs)
+
+    def __getitem__(self, fileName: str) -> str:
+        index = self.__index[fileName]
+        if index in self.__special:
+            return self.__special[index]
+        return self.__digests[index * self.__width:(index + 1) * self.__width].hex()
+
+    def __setitem__(self, fileName: str, digest: str) -> None:
+        raw = self.__pack__(digest)
+        index = self.__index.get(fileName)
+        if index is None:
+            index = len(self.__index)
+            self.__index[fileName] = index
+            if self.__width is not None:
+                # common case: append the next digest
+                self.__digests += raw if raw is not None else bytes(self.__width)
+                if raw is None:
+                    self.__special[index] = digest
+                return
+        if raw is None:
+            self.__special[index] = digest
+            return
+        if self.__width is None:
+            # first packed digest determines the width
+            self.__width = len(raw)
+            self.__digests = bytearray(self.__width * len(self.__index))
+        self.__special.pop(index, None)
+        self.__digests[index * self.__width:(index + 1) * self.__width] = raw
+
+    def __delitem__(self, fileName: str) -> None:
+        items = [(name, self[name]) for name in self.__index if name != fileName]
+        if len(items) == len(self.__index):
+            raise KeyError(fileName)
+        self.clear()
+        for name, digest in items:
+            self[name] = digest
+
+    def __iter__(self):
+        return iter(self.__index)
+
+    def __len__(self) -> int:
+        return len(self.__index)
+
+    def __contains__(self, fileName) -> bool:
+        return fileName in self.__index
+
+    def __repr__(self) -> str:
+        return type(self).__name__ + "(" + repr(dict(self.items())) + ")"
+
+    def Extend(self, fileNames: list, digests: list) -> None:
+        """
+        Adds all >>fileNames<< with their >>digests<<, like update(zip(fileNames, digests)). Lowercase hex digests of
+        the same length are converted and appended at once.
+        """
+        width = self.__width if self.__width is not None else (len(digests[0]) // 2 if len(digests) > 0 else 0)
+        if width > 0 and all(len(digest) == 2 * width for digest in digests) and \
+                len(set(fileNames)) == len(fileNames) and self.__index.keys().isdisjoint(fileNames):
+            joined = "".join(digests)
+            try:
+                raw = bytes.fromhex(joined)
+            except (TypeError, ValueError):
+                raw = None
+            if raw is not None and raw.hex() == joined:
+                if self.__width is None:
+                    self.__width = width
+                    self.__digests = bytearray(width * len(self.__index))
+                for fileName in fileNames:
+                    self.__index[fileName] = len(self.__index)
+                self.__digests += raw
+                return
+        for fileName, digest in zip(fileNames, digests):
+            self[fileName] = digest
+
+    def clear(self) -> None:
+        self.__index = dict()
+        self.__digests = bytearray()
+        self.__width = None
+        self.__special = dict()
+
+    def __pack__(self, digest):
+        """
+        Returns >>digest<< as raw bytes, or None if it can not be restored exactly from the packed representation.
+        """
+        try:
+            raw = bytes.fromhex(digest)
+        except (TypeError, ValueError):
+            return None
+        # bytes.fromhex() also accepts uppercase digits and whitespace
+        if len(raw) == 0 or (self.__width is not None and len(raw) != self.__width) or raw.hex() != digest:
+            return None
+        return raw
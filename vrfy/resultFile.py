@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+import json
+import os
+from vrfy.vrfy import vrfy
+
+
+class resultFile:
+    """
+    Portable file with the per-directory results of a (sharded) run, e.g. to be combined with the results of the other
+    shards by Merge().
+
+    The file is a JSON lines file: A header with version, operation and shard, followed by one line per directory
+    holding its vrfy.Result, and a summary line with the overall result and the counters of the run (vrfyStats). A file
+    without summary line belongs to a run that did not finish.
+    """
+    VERSION = 1
+
+    def __init__(self, filePath: str, operation: str, shard: tuple = None):
+        """
+        Parameters:
+            filePath (str): Path + name of the result file, an existing file is overwritten.
+            operation (str): Identifier of the operation, e.g. function name and paths. Only results of the same
+                                operation can be merged.
+            shard (tuple): Optional (index, count) of the shard the results belong to.
+
+        Raises:
+            OSError: Result file can not be written.
+        """
+        self.Path = filePath
+        self.Operation = operation
+        self.Shard = tuple(shard) if shard is not None else None
+        self.__file = open(filePath, "w")
+        self.__file.write(json.dumps({"results": self.VERSION, "version": vrfy.VERSION_STR, "operation": operation,
+                                      "shard": list(self.Shard) if self.Shard is not None else None}) + "\n")
+        self.__file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.Close()
+
+    def Record(self, resultObject) -> None:
+        """
+        Appends the result of a finished directory.
+        """
+        self.__file.write(json.dumps({"result": resultObject.ToDict()}) + "\n")
+        self.__file.flush()
+
+    def Finish(self, result: bool, stats: dict) -> None:
+        """
+        Appends the summary line, which marks the run as complete.
+
+        Parameters:
+            result (bool): Overall result of the run.
+            stats (dict): Counters and timing of the run, e.g. vrfyStats.ToDict().
+        """
+        self.__file.write(json.dumps({"summary": {"result": result, "stats": stats}}) + "\n")
+        self.__file.flush()
+        os.fsync(self.__file.fileno())
+
+    def Close(self) -> None:
+        """
+        Closes the result file.
+        """
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+    @classmethod
+    def Read(cls, filePath: str) -> tuple:
+        """
+        Reads a result file.
+
+        Parameters:
+            filePath (str): Path + name of the result file.
+
+        Returns:
+            header, results, summary (dict, list, dict | None): Tuple. Header with "operation" and "shard", results of
+                                                                type vrfy.Result, and summary with "result" and
+                                                                "stats" (None, if the run did not finish).
+
+        Raises:
+            OSError: Result file can not be read.
+            ValueError: File is no valid result file.
+        """
+        header = None
+        results = []
+        summary = None
+        with open(filePath, "r") as f:
+            for lineNumber, line in enumerate(f, 1):
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    if not line.endswith("\n"):
+                        # partially written last line of an interrupted run
+                        break
+                    raise ValueError(str(filePath) + ":" + str(lineNumber) + ": invalid line")
+                if not isinstance(entry, dict):
+                    raise ValueError(str(filePath) + ":" + str(lineNumber) + ": invalid line")
+                if header is None:
+                    if entry.get("results") != cls.VERSION:
+                        raise ValueError("No valid result file: " + str(filePath))
+                    header = entry
+                elif "result" in entry:
+                    results.append(vrfy.Result.FromDict(entry["result"]))
+                elif "summary" in entry:
+                    summary = entry["summary"]
+        if header is None:
+            raise ValueError("No valid result file: " + str(filePath))
+        return header, results, summary
+
+    @classmethod
+    def Merge(cls, filePaths: list) -> tuple:
+        """
+        Combines the result files of all shards of a run.
+
+        Parameters:
+            filePaths (list): Paths + names of the result files.
+
+        Returns:
+            result, results, errors, summaries (bool, list, list, list): Tuple. Overall result (True, if all shards are
+                    complete and all results passed), results of all shards in path order, descriptions of missing,
+                    duplicate, incomplete or mismatching shards, and (header, summary) of each file.
+
+        Raises:
+            OSError: A result file can not be read.
+            ValueError: A file is no valid result file.
+        """
+        results = []
+        errors = []
+        summaries = []
+        operation = None
+        shardCount = None
+        shardsSeen = set()
+        for filePath in filePaths:
+            header, fileResults, summary = cls.Read(filePath)
+            summaries.append((header, summary))
+            if operation is None:
+                operation = header.get("operation")
+            elif header.get("operation") != operation:
+                errors.append(str(filePath) + ": results of a different operation: " + str(header.get("operation")))
+                continue
+            if summary is None:
+                errors.append(str(filePath) + ": run did not finish")
+            shard = header.get("shard")
+            if shard is not None:
+                index, count = shard
+                if shardCount is None:
+                    shardCount = count
+                if count != shardCount:
+                    errors.append(str(filePath) + ": shard " + str(index) + "/" + str(count) + " of a different "
+                                  "number of shards")
+                    continue
+                if index in shardsSeen:
+                    errors.append(str(filePath) + ": duplicate shard " + str(index) + "/" + str(count))
+                    continue
+                shardsSeen.add(index)
+            results.extend(fileResults)
+        if shardCount is not None:
+            for index in range(1, shardCount + 1):
+                if index not in shardsSeen:
+                    errors.append("missing shard " + str(index) + "/" + str(shardCount))
+        # order of a single (unsharded) vrfy.Walk(): depth-first, sorted
+        results.sort(key=lambda resultObject: os.path.normpath(resultObject.Path).split(os.sep))
+        result = len(errors) == 0 and all(resultObject.Result for resultObject in results)
+        return result, results, errors, summaries
@@ -1,27 +1,264 @@
 #!/usr/bin/env python3
 import os
+import contextlib
+import functools
 import hashlib
+import time
+import zlib
+from inspect import signature
+from vrfy.hasher import hasher
+from vrfy.hashExecutor import hashExecutor
+from vrfy.ioScheduler import ioScheduler
+from vrfy.hashCache import hashCache
+from vrfy.dirSnapshot import dirSnapshot
+from vrfy.manifest import manifest
+from vrfy.checksumFormat import checksumFormat
+from vrfy.packedChecksums import packedChecksums
+from vrfy.digestIndex import digestIndex
+from vrfy.vrfyStats import vrfyStats, statsRecorder
+from vrfy.vrfyProfiler import vrfyProfiler
 
 
 class vrfy:
     class Result:
-        def __init__(self, result, path, pathError = False, missingFiles=[], additionalFiles=[], ChecksumMismatch=[],
-                     masterChecksums=dict(), backupChecksums=dict()):
+        __slots__ = ("Result", "Path", "PathError", "MissingFiles", "AdditionalFiles", "ChecksumMismatch",
+                     "MasterChecksums", "BackupChecksums", "SkippedBytes", "MismatchOffsets", "BadLines",
+                     "ChangedAttributes", "MovedFiles", "PathBackup", "DirStatus")
+
+        def __init__(self, result, path, pathError=False, missingFiles=None, additionalFiles=None,
+                     ChecksumMismatch=None, masterChecksums=None, backupChecksums=None, skippedBytes=0,
+                     mismatchOffsets=None, badLines=None, changedAttributes=None, movedFiles=None):
             self.Result = result
             self.Path = path
             self.PathError = pathError
-            self.MissingFiles = missingFiles
-            self.AdditionalFiles = additionalFiles
-            self.ChecksumMismatch = ChecksumMismatch
-            self.MasterChecksums = masterChecksums
-            self.BackupChecksums = backupChecksums
+            self.MissingFiles = missingFiles if missingFiles is not None else []
+            self.AdditionalFiles = additionalFiles if additionalFiles is not None else []
+            self.ChecksumMismatch = ChecksumMismatch if ChecksumMismatch is not None else []
+            # dict[filename] = hash digest, usually packedChecksums
+            self.MasterChecksums = masterChecksums if masterChecksums is not None else packedChecksums()
+            self.BackupChecksums = backupChecksums if backupChecksums is not None else packedChecksums()
+            # number of bytes that did not need to be read due to quick compare
+            self.SkippedBytes = skippedBytes
+            # byte compare: dict[filename] = offset of first differing byte
+            self.MismatchOffsets = mismatchOffsets if mismatchOffsets is not None else dict()
+            # invalid lines of the checksum file, e.g. "sums.csv:12: invalid hash digest"
+            self.BadLines = badLines if badLines is not None else []
+            # metadata compare: dict[filename] = list of differing attributes, e.g. ["size", "mtime"]
+            self.ChangedAttributes = changedAttributes if changedAttributes is not None else dict()
+            # set by vrfy.DetectMoves(): dict[filename] = relative path of the file in the backup tree
+            self.MovedFiles = movedFiles if movedFiles is not None else dict()
+            # set by vrfy.Walk(): backup path and whether the directory exists in master and backup
+            self.PathBackup = path
+            self.DirStatus = vrfy.DIR_BOTH
+
+        def DropPassedChecksums(self) -> None:
+            """
+            Removes the checksums of all files that passed verification from >>MasterChecksums<< and
+            >>BackupChecksums<<. Checksums of missing, additional and mismatched files are kept.
+            """
+            failedFiles = set(self.MissingFiles).union(self.AdditionalFiles, self.ChecksumMismatch)
+            self.MasterChecksums = packedChecksums((fileName, hashDigest) for fileName, hashDigest
+                                                   in self.MasterChecksums.items() if fileName in failedFiles)
+            self.BackupChecksums = packedChecksums((fileName, hashDigest) for fileName, hashDigest
+                                                   in self.BackupChecksums.items() if fileName in failedFiles)
+
+        def ToDict(self) -> dict:
+            """
+            Returns all attributes as a JSON serializable dictionary.
+            """
+            return {"Result": self.Result, "Path": self.Path, "PathError": self.PathError,
+                    "MissingFiles": list(self.MissingFiles), "AdditionalFiles": list(self.AdditionalFiles),
+                    "ChecksumMismatch": list(self.ChecksumMismatch), "MasterChecksums": dict(self.MasterChecksums),
+                    "BackupChecksums": dict(self.BackupChecksums), "SkippedBytes": self.SkippedBytes,
+                    "MismatchOffsets": dict(self.MismatchOffsets), "BadLines": list(self.BadLines),
+                    "ChangedAttributes": dict(self.ChangedAttributes), "MovedFiles": dict(self.MovedFiles),
+                    "PathBackup": self.PathBackup,
+                    "DirStatus": self.DirStatus}
 
+        @classmethod
+        def FromDict(cls, values: dict):
+            """
+            Creates a result object from a dictionary returned by ToDict().
+            """
+            resultObject = cls(result=values["Result"], path=values["Path"], pathError=values.get("PathError", False),
+                               missingFiles=values.get("MissingFiles", []),
+                               additionalFiles=values.get("AdditionalFiles", []),
+                               ChecksumMismatch=values.get("ChecksumMismatch", []),
+                               masterChecksums=packedChecksums(values.get("MasterChecksums", dict())),
+                               backupChecksums=packedChecksums(values.get("BackupChecksums", dict())),
+                               skippedBytes=values.get("SkippedBytes", 0),
+                               mismatchOffsets=values.get("MismatchOffsets", dict()),
+                               badLines=values.get("BadLines", []),
+                               changedAttributes=values.get("ChangedAttributes", dict()),
+                               movedFiles=values.get("MovedFiles", dict()))
+            resultObject.PathBackup = values.get("PathBackup", resultObject.Path)
+            resultObject.DirStatus = values.get("DirStatus", vrfy.DIR_BOTH)
+            return resultObject
+
+    class Checksums(packedChecksums):
+        """
+        Dictionary dict[filename] = hash digest read from a checksum file, together with the hash algorithm in use and,
+        if recorded, size and mtime of the files at the time they were hashed. Digests are stored packed, see
+        packedChecksums.
+        """
+        def __init__(self, *args, algorithm: str = hasher.DEFAULT_ALGORITHM, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.Algorithm = algorithm
+            # dict[filename] = (size, mtime_ns)
+            self.FileStats = dict()
+            # list of (line number, reason) of lines that could not be read
+            self.BadLines = []
+            # dict[directory name] = tree digest of the sub-directory ("" if unknown), None if the checksum file does
+            # not record sub-directories (sums.csv format version < 4)
+            self.Directories = None
 
     VERSION_STR = "0.4.0"
-    HASH_ERROR = "ERROR"
+    HASH_ERROR = hasher.HASH_ERROR
+    # placeholder for files whose mismatch was detected without hashing them
+    HASH_SKIPPED = "SKIPPED"
+    # VerifyFiles: compare master/backup files by their hash digests, byte by byte, or by metadata only
+    COMPARE_HASH = "hash"
+    COMPARE_BYTES = "bytes"
+    COMPARE_METADATA = "metadata"
+    # attributes compared by VerifyFiles with compare="metadata"
+    ATTRIBUTE_TYPE = "type"
+    ATTRIBUTE_SIZE = "size"
+    ATTRIBUTE_MTIME = "mtime"
+    ATTRIBUTE_ACCESS = "access"
+    # directory states reported by vrfy.Walk()
+    DIR_BOTH = ""
+    DIR_MISSING = "[-]"
+    DIR_ADDITIONAL = "[+]"
+    # versioned sums.csv header: "#vrfy;<format version>;<hash algorithm>", files without header are SHA256
+    # version 2: "<filename>;<hash digest>"
+    # version 3: "<filename>;<hash digest>;<size>;<mtime_ns>"
+    SUMS_HEADER = "#vrfy"
+    SUMS_VERSION = 3
+    # sums.csv format version with sub-directory entries "<name>/;<tree digest>", see TreeDigest()
+    SUMS_VERSION_TREE = 4
+    # checksum files are never hashed themselves
+    CHECKSUM_FILES = ("sums.csv", manifest.FILE_NAME)
+    # number of parsed checksum file lines whose digests are validated and stored at once
+    PARSER_CHUNK_SIZE = 4096
+
+    def __init__(self, jobs: int = 1, executor="thread", cache: hashCache = None, paranoid: bool = False,
+                 algorithm: str = hasher.DEFAULT_ALGORITHM, blockSize: int = hasher.DEFAULT_BLOCK_SIZE,
+                 useMmap: bool = False, dropCache: bool = False, fullHash: bool = False, sampleBlocks: int = 0,
+                 compare: str = COMPARE_HASH, compareDigest: bool = True, keepChecksums: bool = True,
+                 hashUnmatched: bool = True, profiler: vrfyProfiler = None):
+        """
+        Parameters:
+            jobs (int): Number of files that get hashed concurrently.
+            executor (str | hashExecutor): Executor backend ("serial", "thread" or "process"), or an executor object
+                                            providing Map(func, items, fileStats=None) and Close(), e.g. an
+                                            ioScheduler.
+            cache (hashCache): Optional persistent hash cache. Unchanged files are not hashed again.
+            paranoid (bool): Always hash files, even if a valid cache entry exists. The cache still gets updated.
+            algorithm (str): Hash algorithm for new checksums, one of hasher.ALGORITHMS. Existing sums.csv files are
+                                always verified with the algorithm recorded in their header.
+            blockSize (int): Number of bytes read and hashed per step.
+            useMmap (bool): Hash large files through a memory map.
+            dropCache (bool): Advise the kernel to drop hashed file contents from the page cache (POSIX only).
+            fullHash (bool): VerifyFiles: Always hash master and backup files, even if their sizes already mismatch.
+            sampleBlocks (int): VerifyFiles: Number of pseudo random blocks compared (in addition to head and tail
+                                block) before equally sized files are hashed. 0 disables sampling.
+            compare (str): VerifyFiles: "hash" compares hash digests, "bytes" compares master and backup files byte by
+                                byte and stops reading at the first difference, "metadata" only compares file type,
+                                size and mtime (whole seconds) without reading any file contents.
+            compareDigest (bool): VerifyFiles with compare="bytes": Hash master files in the same pass, so that
+                                MasterChecksums/BackupChecksums are populated. Otherwise they are set to HASH_SKIPPED.
+            keepChecksums (bool): VerifyFiles/VerifyFilesAgainstChecksums: Keep the checksums of all files in the
+                                results. Otherwise only checksums of missing, additional and mismatched files are kept,
+                                which saves memory on huge directories.
+            hashUnmatched (bool): VerifyFiles: Hash missing and additional files. Can be disabled when DetectMoves() is
+                                used, which only hashes those files that have a counterpart of the same size.
+            profiler (vrfyProfiler): Optional profiler that collects the time of each phase per directory.
+        """
+        if compare not in (self.COMPARE_HASH, self.COMPARE_BYTES, self.COMPARE_METADATA):
+            raise ValueError("Unknown compare mode: " + str(compare))
+        self.__algorithm = algorithm
+        self.__hasherOptions = dict(blockSize=blockSize, useMmap=useMmap, dropCache=dropCache)
+        self.__hashers = {algorithm: hasher(algorithm, **self.__hasherOptions)}
+        if isinstance(executor, str):
+            self.__executor = hashExecutor(jobs=jobs, backend=executor)
+        else:
+            self.__executor = executor
+        self.__cache = cache
+        self.__paranoid = paranoid
+        self.__fullHash = fullHash
+        self.__sampleBlocks = max(0, int(sampleBlocks))
+        self.__compare = compare
+        self.__compareDigest = compareDigest
+        self.__keepChecksums = keepChecksums
+        self.__hashUnmatched = hashUnmatched
+        # (path, size, mtime) and checksums of the last checksum file read by VerifyFile()/VerifyFileList()
+        self.__checksumFileIndex = (None, None)
+        # live counters, see AddObserver()
+        self.Stats = vrfyStats()
+        # phase timing, None if profiling is disabled
+        self.Profiler = profiler
+
+    def Close(self) -> None:
+        """
+        Releases worker threads/processes used for hashing and closes the hash cache.
+        """
+        self.__executor.Close()
+        if self.__cache is not None:
+            self.__cache.Close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.Close()
+
+    def AddObserver(self, observer) -> None:
+        """
+        Registers a callback for progress and throughput updates.
+
+        Parameters:
+            observer (callable): Called as observer(stats, event) with the vrfyStats instance >>Stats<< and event
+                                "prescan", "file" (a file was hashed, possibly called from a worker thread),
+                                "directory" (vrfy.Walk() finished a directory) or "done" (vrfy.Walk() finished).
+        """
+        self.Stats.AddObserver(observer)
+
+    def RemoveObserver(self, observer) -> None:
+        """
+        Unregisters a callback registered with AddObserver().
+        """
+        self.Stats.RemoveObserver(observer)
+
+    def PreScan(self, pathMaster: str, pathBackup: str = None, recursive: bool = True, shard: tuple = None) -> tuple:
+        """
+        Counts the files and bytes a (recursive) operation on "pathMaster"/"pathBackup" is going to process, and sets
+        them as totals of >>Stats<< for progress and ETA estimates.
 
-    def __init__(self):
-        pass
+        Parameters:
+            pathMaster (str): Path to the (master) directory.
+            pathBackup (str): Optional, path to the backup directory. Omit for single directory operations.
+            recursive (bool): Also count files in all sub-directories.
+            shard (tuple): Optional (index, count), only count files of directories of this shard (see Walk()).
+
+        Returns:
+            numFiles, numBytes (int, int): Tuple. Number and total size of files.
+        """
+        numFiles = 0
+        numBytes = 0
+        stack = [(pathMaster, pathMaster)]
+        if pathBackup is not None and pathBackup != pathMaster:
+            stack.append((pathBackup, pathBackup))
+        while len(stack) > 0:
+            rootPath, path = stack.pop()
+            snapshot = self.__scan__(path)
+            if shard is None or self.__inShard__(rootPath, path, shard):
+                files, size = self.__countFiles__([snapshot])
+                numFiles += files
+                numBytes += size
+            if recursive:
+                stack.extend((rootPath, os.path.join(snapshot.Path, nextFolder)) for nextFolder in snapshot.Dirs)
+        self.Stats.SetTotals(numFiles, numBytes)
+        return numFiles, numBytes
 
     def GetVersion(self) -> str:
         """
@@ -41,7 +278,11 @@ class vrfy:
             expectedChecksum (str): Checksum value or path + file name of *.sha256-/sums.csv file.
 
         Returns:
-            result, calculatedChecksum (bool, str): Tuple. Result of verification and calculated sum of "filePath".
+            vrfy.Result: Result of the verification. The calculated checksum of "filePath" is stored in
+                            "MasterChecksums", the expected one in "BackupChecksums" (both by file name).
+
+        Raises:
+            ValueError: Hash algorithm of the checksum file requires a package that is not installed.
         """
         # start file verification, when filepath is valid
         if os.path.isfile(filePath):
@@ -51,15 +292,18 @@ class vrfy:
 
             resultVerify = True
             expectation = str(expectedChecksum)
-            calcChecksum = self.__calcChecksum__(filePath)
+            algorithm = self.__algorithm
             path, filename = os.path.split(filePath)
             # no hex checksum provided, read sums.csv / *.sha256sums-file
             if os.path.isfile(expectedChecksum):
                 try:
-                    sumsDict = self.__getChecksumsFromFile__(expectedChecksum)
+                    sumsDict = self.__loadChecksumFile__(expectedChecksum)
+                    algorithm = sumsDict.Algorithm
                     expectation = sumsDict[filename]
                 except Exception:
                     resultVerify = False
+                hasher.CheckAvailable(algorithm)
+            calcChecksum = self.__calcChecksum__(filePath, algorithm)
             # store calculated and expected checksum
             masterHashDict[filename] = calcChecksum
             expHashDict[filename] = expectation
@@ -76,76 +320,158 @@ class vrfy:
             # stop execution, since filepath is NOT valid
             return self.Result(result=False, path=filePath, pathError=True)
 
-    def VerifyFilesAgainstChecksums(self, path: str) -> Result:
+    def VerifyFileList(self, filePaths: list, expectedChecksum: str = "") -> Result:
+        """
+        Verifies the contents of all files in >>filePaths<< against one *.sha256sum-/sums.csv-file or checksum value.
+        The checksum file is read once and the files are hashed concurrently (see >>jobs<<). Files are looked up by
+        their path relative to the checksum file, or else by their file name.
+
+        Parameters:
+            filePaths (list): Paths + names of the files that should be verified.
+            expectedChecksum (str): Checksum value or path + file name of *.sha256sum-/sums.csv-file.
+
+        Returns:
+            vrfy.Result: Aggregated result, files are named as given in >>filePaths<<. Files without checksum are
+                            reported as additional files, files that do not exist as missing files.
+
+        Raises:
+            ValueError: Hash algorithm of the checksum file requires a package that is not installed.
+        """
+        expectation = str(expectedChecksum)
+        algorithm = self.__algorithm
+        sumsDict = None
+        path = ""
+        if os.path.isfile(expectation):
+            sumsDict = self.__loadChecksumFile__(expectation)
+            algorithm = sumsDict.Algorithm
+            hasher.CheckAvailable(algorithm)
+            path = os.path.dirname(expectation)
+        resultVerify = True
+        missingFiles = []
+        additionalFiles = []
+        checksumErrors = []
+        expHashDict = packedChecksums()
+        hashFiles = []
+        for filePath in dict.fromkeys(str(filePath) for filePath in filePaths):
+            if not os.path.isfile(filePath):
+                missingFiles.append(filePath)
+                continue
+            hashFiles.append(filePath)
+            if sumsDict is None:
+                expHashDict[filePath] = expectation
+                continue
+            entry = self.__lookupChecksumEntry__(sumsDict, path, filePath)
+            if entry is None:
+                additionalFiles.append(filePath)
+            else:
+                expHashDict[filePath] = sumsDict[entry]
+
+        masterHashDict = packedChecksums()
+        masterHashDict.Extend(hashFiles, self.__calcChecksums__(hashFiles, algorithm=algorithm))
+        for filePath in hashFiles:
+            if filePath in expHashDict and masterHashDict[filePath] != expHashDict[filePath]:
+                checksumErrors.append(filePath)
+
+        badLines = []
+        if sumsDict is not None:
+            badLines = [os.path.basename(expectation) + ":" + str(lineNumber) + ": " + reason
+                        for lineNumber, reason in sumsDict.BadLines]
+        if len(missingFiles) > 0 or len(additionalFiles) > 0 or len(checksumErrors) > 0 or len(badLines) > 0:
+            resultVerify = False
+        return self.__trimResult__(self.Result(result=resultVerify, path=path, missingFiles=missingFiles,
+                                               additionalFiles=additionalFiles, ChecksumMismatch=checksumErrors,
+                                               masterChecksums=masterHashDict, backupChecksums=expHashDict,
+                                               badLines=badLines))
+
+    def VerifyFilesAgainstChecksums(self, path: str, snapshot: dirSnapshot = None, checksums=None) -> Result:
         """
         Verifies the contents of directory >>path<< against the included checksums in sums.csv.
 
         Parameters:
             path (str): Path to directory whose files shall get verified.
+            snapshot (dirSnapshot): Optional, already scanned contents of >>path<<. If restricted to selected files
+                                    (dirSnapshot.Select()), only the checksums of these files are verified.
+            checksums (vrfy.Checksums): Optional, checksums of >>path<< to verify against instead of sums.csv, e.g.
+                                        taken from a manifest.
 
         Returns:
             vrfy.Result: Results result object of type vrfy.Result.
+
+        Raises:
+            ValueError: Hash algorithm of the checksums requires a package that is not installed.
         """
+        if snapshot is None:
+            snapshot = self.__scan__(path)
         # start file verification, when path is valid
-        if os.path.isdir(path):
+        if snapshot.Exists:
+            if snapshot.Selection is not None:
+                # snapshot restricted to selected files: only their checksums are verified
+                checksums = self.__selectChecksums__(checksums if checksums is not None else
+                                                     self.__readSumsCsvFile__(path), snapshot.Selection)
             # determine available files in path -> list of file names
-            files = [entryB for entryB in os.listdir(path) if
-                    not os.path.isdir(os.path.join(path, entryB))]
+            files = list(snapshot.Files)
 
             resultVerify = True
-            fileHashDict = dict()
+            fileHashDict = packedChecksums()
 
             # check if checksum file is available, if not abort execution
-            if "sums.csv" not in files and len(files) > 0:
+            if checksums is None and "sums.csv" not in files and len(files) > 0:
                 # calculate has values for additional files
-                for file in files:
-                    fileHashDict[file] = self.__calcChecksum__(os.path.join(path, file))
+                fileHashDict = self.__calcChecksumDict__(snapshot, files)
                 return self.Result(result=False, path=path, additionalFiles=files,
                                    masterChecksums=fileHashDict)
 
-            if len(files) > 0:
+            if manifest.FILE_NAME in files:
+                files.remove(manifest.FILE_NAME)
+            if len(files) > 0 or (checksums is not None and len(checksums) > 0):
                 # do not try to verify "sums.csv" as it will not be included in "sums.csv"
+                hashFiles = []
                 if "sums.csv" in files:
                     # save hashvalues for later analysis
-                    fileHashDict["sums.csv"] = self.__calcChecksum__(os.path.join(path, "sums.csv"))
+                    if checksums is None:
+                        hashFiles.append("sums.csv")
                     files.remove("sums.csv")
 
                 # read checksum file and get dictionary
-                sumsDict = self.__readSumsCsvFile__(path)
-
-                checksumErrors = []
-                # iterate through all files and compare their checksum with those stored in sums.csv
-                for file in sumsDict.keys():
-                    if file in files:
-                        checksumCalc = self.__calcChecksum__(os.path.join(path, file))
-                        checksumSaved = sumsDict[file]
-                        # save hashvalues for later analysis
-                        fileHashDict[file] = checksumCalc
-                        # verify calculated checksum against the one stored in sums.csv
-                        if checksumCalc == checksumSaved:
-                            pass
-                        else:
-                            # checksum mismatch -> set error flag and add file name to list of mismatched files
-                            checksumErrors.append(file)
-                            resultVerify = False
-                    else:
-                        # file is included in sums.csv, but not in directory
-                        resultVerify = False
+                sumsDict = checksums if checksums is not None else self.__readSumsCsvFile__(path)
+                # fail once instead of reporting every file as mismatched
+                hasher.CheckAvailable(sumsDict.Algorithm)
 
                 # verify that all files in current working directory are included in sums.csv, and vice versa
                 # set error flag if check failed
-                missingItemsInSumsCSV = [i for i in files if i not in sumsDict.keys()]
-                additionalItemsInSumsCSV = [i for i in sumsDict.keys() if i not in files]
+                fileSet = set(files)
+                missingItemsInSumsCSV = [i for i in files if i not in sumsDict]
+                additionalItemsInSumsCSV = [i for i in sumsDict.keys() if i not in fileSet]
                 if len(missingItemsInSumsCSV) != 0 or len(additionalItemsInSumsCSV) != 0:
                     resultVerify = False
 
-                # calculate has values for additional files
-                for file in missingItemsInSumsCSV:
-                    fileHashDict[file] = self.__calcChecksum__(os.path.join(path, file))
+                # hash all files included in sums.csv and directory, followed by additional files
+                verifiedFiles = [i for i in sumsDict.keys() if i in fileSet]
+                hashFiles = hashFiles + verifiedFiles + missingItemsInSumsCSV
+                fileHashDict = self.__calcChecksumDict__(snapshot, hashFiles, sumsDict.Algorithm)
+
+                # lines of sums.csv that could not be read fail the verification
+                badLines = ["sums.csv:" + str(lineNumber) + ": " + reason
+                            for lineNumber, reason in getattr(sumsDict, "BadLines", [])]
+                if len(badLines) > 0:
+                    resultVerify = False
+
+                checksumErrors = []
+                # iterate through all files and compare their checksum with those stored in sums.csv
+                for file in verifiedFiles:
+                    # verify calculated checksum against the one stored in sums.csv
+                    if fileHashDict[file] == sumsDict[file]:
+                        pass
+                    else:
+                        # checksum mismatch -> set error flag and add file name to list of mismatched files
+                        checksumErrors.append(file)
+                        resultVerify = False
 
-                return self.Result(result=resultVerify, path=path, missingFiles=additionalItemsInSumsCSV,
-                                   additionalFiles=missingItemsInSumsCSV, ChecksumMismatch=checksumErrors,
-                                   masterChecksums=fileHashDict, backupChecksums=sumsDict)
+                return self.__trimResult__(self.Result(result=resultVerify, path=path,
+                                                       missingFiles=additionalItemsInSumsCSV,
+                                                       additionalFiles=missingItemsInSumsCSV,
+                                                       ChecksumMismatch=checksumErrors, masterChecksums=fileHashDict,
+                                                       backupChecksums=sumsDict, badLines=badLines))
             else:
                 # return with True, in case no files needed to be verifed
                 return self.Result(result=True, path=path)
@@ -153,40 +479,52 @@ class vrfy:
             # stop execution, since path is NOT valid
             return self.Result(result=True, path=path, pathError=True)
 
-    def WriteChecksumFile(self, path: str) -> Result:
+    def WriteChecksumFile(self, path: str, snapshot: dirSnapshot = None, update: bool = False,
+                          treeDigests: bool = False) -> Result:
         """
         Creates file sums.csv with checksums for files in >>path<<.
+        The file is written to a temporary file first and then replaces sums.csv, i.e. an interrupted run never leaves
+        a partially written sums.csv behind.
 
         Parameters:
             path (str): Path to directory whose files shall get hashed and checksums stored in sums.csv.
+            snapshot (dirSnapshot): Optional, already scanned contents of >>path<<.
+            update (bool): Only hash files that are new or whose size/mtime changed since the existing sums.csv was
+                            written. Entries of deleted files are dropped.
+            treeDigests (bool): Also store the tree digests (see TreeDigest()) of all sub-directories, taken from their
+                            sums.csv-files. Sub-directories have to be written first, see Walk(bottomUp=True).
 
         Returns:
             vrfy.Result: Results result object of type vrfy.Result.
         """
+        if snapshot is None:
+            snapshot = self.__scan__(path)
         # start checksum creation, when path is valid
-        if os.path.isdir(path):
-            # determine available files in path -> list of file names
-            files = [entryB for entryB in os.listdir(path) if
-                           not os.path.isdir(os.path.join(path, entryB))]
-            # create sums.csv, if directory contains files
+        if snapshot.Exists:
             result = True
             hashErrors = []
-            if len(files) > 0:
+            # create sums.csv, if directory contains files (or sub-directories, whose tree digests shall be stored)
+            if len(snapshot.Files) > 0 or (treeDigests and len(snapshot.Dirs) > 0):
+                # reuse checksums of unchanged files, if an up to date sums.csv exists
+                existingSums = None
+                if update and "sums.csv" in snapshot.Files:
+                    existingSums = self.__readSumsCsvFile__(path)
+                files, fileStats, hashDigests = self.__hashDirectory__(snapshot, existingSums)
+                entries = []
+                # iterate through all files of current directory and add their names and checksums to "sums.csv"
+                for file, fileStat, hash_digest in zip(files, fileStats, hashDigests):
+                    # only add files without checksum errors or set error flag, when checksum calculation failed
+                    if hash_digest != self.HASH_ERROR and fileStat is not None:
+                        entries.append((file, hash_digest, fileStat.st_size, fileStat.st_mtime_ns))
+                    else:
+                        result = False
+                        hashErrors.append(str(file))
+                directories = None
+                if treeDigests:
+                    directories = {directory: self.__subTreeDigest__(os.path.join(path, directory))
+                                   for directory in snapshot.Dirs}
                 try:
-                    with open(os.path.join(path, "sums.csv"), "w") as f:
-                        # do not hash "sums.csv" itself
-                        if "sums.csv" in files:
-                            files.remove("sums.csv")
-                        # iterate through all files of current directory and add their names and checksums to "sums.csv"
-                        for file in files:
-                            hash_digest = self.__calcChecksum__(os.path.join(path, file))
-                            # only add files without checksum errors or set error flag, when checksum calculation
-                            # failed
-                            if hash_digest != self.HASH_ERROR:
-                                f.write(str(file) + ";" + str(hash_digest) + "\n")
-                            else:
-                                result = False
-                                hashErrors.append(str(file))
+                    self.__writeSumsCsvFile__(path, self.__algorithm, entries, directories)
                 except OSError:
                     return self.Result(result=False, path=path, ChecksumMismatch=hashErrors)
             return self.Result(result=result, path=path, ChecksumMismatch=hashErrors)
@@ -194,7 +532,291 @@ class vrfy:
             # stop execution, since path is NOT valid
             return self.Result(result=False, path=path, pathError=True)
 
-    def VerifyFiles(self, pathMaster: str, pathBackup: str) -> Result:
+    def TreeDigest(self, checksums) -> str:
+        """
+        Returns the Merkle digest of a directory tree: SHA256 over the hash algorithm, the sorted file names with their
+        hash digests and the sorted names of all sub-directories with their tree digests. Two directory trees with
+        equal tree digests have equal recorded contents.
+
+        Parameters:
+            checksums (vrfy.Checksums): Checksums of the directory, read from its sums.csv-file.
+
+        Returns:
+            str: Hex digest, "" if unknown (sums.csv-file without sub-directory entries, unknown tree digest of a
+                    sub-directory or unreadable lines).
+        """
+        if checksums.Directories is None or len(checksums.BadLines) > 0 or \
+                any(digest == "" for digest in checksums.Directories.values()):
+            return ""
+        treeHash = hashlib.sha256(checksums.Algorithm.encode("utf-8") + b"\0")
+        for fileName in sorted(checksums):
+            treeHash.update(b"f\0" + fileName.encode("utf-8", "surrogateescape") + b"\0" +
+                            checksums[fileName].encode("utf-8") + b"\0")
+        for directory in sorted(checksums.Directories):
+            treeHash.update(b"d\0" + directory.encode("utf-8", "surrogateescape") + b"\0" +
+                            checksums.Directories[directory].encode("utf-8") + b"\0")
+        return treeHash.hexdigest()
+
+    def CompareTrees(self, pathMaster: str, pathBackup: str):
+        """
+        Compares the recorded checksums (sums.csv-files with tree digests, see WriteChecksumFile()) of two directory
+        trees top-down, without reading any other files. Sub-directories with equal tree digests on both sides are
+        skipped as a whole (counted in Stats.SkippedTrees), i.e. only directories on the path to a difference are
+        read.
+
+        Parameters:
+            pathMaster (str): Path to the master directory.
+            pathBackup (str): Path to the backup directory.
+
+        Yields:
+            vrfy.Result: Result object of type vrfy.Result for each compared directory. Checksums of files that differ
+                            are reported as mismatch, files only recorded in master/backup as missing/additional.
+        """
+        stack = [(pathMaster, pathBackup)]
+        while len(stack) > 0:
+            currentMaster, currentBackup = stack.pop()
+            sumsMaster = self.__readSumsCsvFile__(currentMaster)
+            sumsBackup = self.__readSumsCsvFile__(currentBackup)
+            existsMaster = os.path.isdir(currentMaster)
+            existsBackup = os.path.isdir(currentBackup)
+
+            missingFiles = [fileName for fileName in sumsMaster if fileName not in sumsBackup]
+            additionalFiles = [fileName for fileName in sumsBackup if fileName not in sumsMaster]
+            checksumErrors = [fileName for fileName in sumsMaster
+                              if fileName in sumsBackup and sumsMaster[fileName] != sumsBackup[fileName]]
+            badLines = ["master sums.csv:" + str(lineNumber) + ": " + reason
+                        for lineNumber, reason in sumsMaster.BadLines]
+            badLines += ["backup sums.csv:" + str(lineNumber) + ": " + reason
+                         for lineNumber, reason in sumsBackup.BadLines]
+            result = len(missingFiles) == 0 and len(additionalFiles) == 0 and len(checksumErrors) == 0 and \
+                len(badLines) == 0 and existsMaster and existsBackup
+            if existsMaster and sumsMaster.Directories is None:
+                badLines.append("master sums.csv: no tree digests")
+                result = False
+            if existsBackup and sumsBackup.Directories is None:
+                badLines.append("backup sums.csv: no tree digests")
+                result = False
+            if existsMaster and existsBackup and sumsMaster.Algorithm != sumsBackup.Algorithm:
+                badLines.append("hash algorithms differ: " + sumsMaster.Algorithm + " / " + sumsBackup.Algorithm)
+                result = False
+
+            # descend into sub-directories whose tree digests differ or are unknown
+            directoriesMaster = sumsMaster.Directories if sumsMaster.Directories is not None else dict()
+            directoriesBackup = sumsBackup.Directories if sumsBackup.Directories is not None else dict()
+            for directory in sorted(set(directoriesMaster).union(directoriesBackup), reverse=True):
+                digestMaster = directoriesMaster.get(directory, "")
+                if digestMaster != "" and digestMaster == directoriesBackup.get(directory, ""):
+                    self.Stats.AddSkippedTree()
+                    continue
+                stack.append((os.path.join(currentMaster, directory), os.path.join(currentBackup, directory)))
+
+            resultObject = self.__trimResult__(self.Result(result=result, path=currentMaster,
+                                                           pathError=not (existsMaster and existsBackup),
+                                                           missingFiles=missingFiles, additionalFiles=additionalFiles,
+                                                           ChecksumMismatch=checksumErrors,
+                                                           masterChecksums=sumsMaster, backupChecksums=sumsBackup,
+                                                           badLines=badLines))
+            resultObject.PathBackup = currentBackup
+            if existsMaster and not existsBackup:
+                resultObject.DirStatus = self.DIR_MISSING
+            elif existsBackup and not existsMaster:
+                resultObject.DirStatus = self.DIR_ADDITIONAL
+            self.Stats.AddDirectory(0, 0)
+            yield resultObject
+        self.Stats.Finish()
+
+    def __subTreeDigest__(self, path: str) -> str:
+        """
+        Returns the tree digest of directory >>path<< from its sums.csv-file. An empty directory without sums.csv-file
+        has the tree digest of an empty directory, otherwise it is unknown ("").
+        """
+        if os.path.isfile(os.path.join(path, "sums.csv")):
+            return self.TreeDigest(self.__readSumsCsvFile__(path))
+        try:
+            with os.scandir(path) as entries:
+                if any(True for entry in entries):
+                    return ""
+        except OSError:
+            return ""
+        emptyChecksums = self.Checksums(algorithm=self.__algorithm)
+        emptyChecksums.Directories = dict()
+        return self.TreeDigest(emptyChecksums)
+
+    def AddToManifest(self, path: str, snapshot: dirSnapshot = None, sumsManifest: manifest = None,
+                      previous: manifest = None) -> Result:
+        """
+        Hashes the files in >>path<< and adds their checksums to >>sumsManifest<<.
+
+        Parameters:
+            path (str): Path to directory (within the manifest root) whose files shall get hashed.
+            snapshot (dirSnapshot): Optional, already scanned contents of >>path<<.
+            sumsManifest (manifest): Manifest the checksums are added to.
+            previous (manifest): Optional, previous manifest of the same tree. Checksums of files whose size/mtime did
+                                not change are taken from it instead of hashing the files.
+
+        Returns:
+            vrfy.Result: Results result object of type vrfy.Result.
+        """
+        if sumsManifest is None:
+            raise ValueError("No manifest provided for " + str(path))
+        if snapshot is None:
+            snapshot = self.__scan__(path)
+        if not snapshot.Exists:
+            return self.Result(result=False, path=path, pathError=True)
+        dirParts = sumsManifest.RelativeDir(path)
+        existingSums = self.__manifestChecksums__(previous, dirParts) if previous is not None else None
+        files, fileStats, hashDigests = self.__hashDirectory__(snapshot, existingSums)
+        hashErrors = []
+        for file, fileStat, hashDigest in zip(files, fileStats, hashDigests):
+            if hashDigest != self.HASH_ERROR and fileStat is not None:
+                sumsManifest.Add(dirParts, file, hashDigest, fileStat.st_size, fileStat.st_mtime_ns)
+            else:
+                hashErrors.append(str(file))
+        return self.Result(result=len(hashErrors) == 0, path=path, ChecksumMismatch=hashErrors)
+
+    def VerifyFilesAgainstManifest(self, path: str, snapshot: dirSnapshot = None,
+                                   sumsManifest: manifest = None) -> Result:
+        """
+        Verifies the contents of directory >>path<< against its entries in >>sumsManifest<<.
+
+        Parameters:
+            path (str): Path to directory (within the manifest root) whose files shall get verified.
+            snapshot (dirSnapshot): Optional, already scanned contents of >>path<<.
+            sumsManifest (manifest): Manifest of the directory tree.
+
+        Returns:
+            vrfy.Result: Results result object of type vrfy.Result.
+        """
+        if sumsManifest is None:
+            raise ValueError("No manifest provided for " + str(path))
+        checksums = self.__manifestChecksums__(sumsManifest, sumsManifest.RelativeDir(path))
+        return self.VerifyFilesAgainstChecksums(path, snapshot, checksums)
+
+    def CreateManifest(self, rootPath: str, recursive: bool = True, update: bool = False):
+        """
+        Creates the manifest >>rootPath<</vrfy.manifest with checksums of all files of the directory tree.
+        The manifest is written atomically once all directories were hashed.
+
+        Parameters:
+            rootPath (str): Path of the directory tree root.
+            recursive (bool): Also hash files in all sub-directories.
+            update (bool): Only hash files that are new or whose size/mtime changed since the existing manifest was
+                            written.
+
+        Yields:
+            vrfy.Result: Result object of type vrfy.Result for each visited directory, and a failed result for the
+                            manifest file if it could not be written.
+        """
+        previous = None
+        if update:
+            try:
+                previous = self.__timed__(vrfyProfiler.PHASE_PARSE, rootPath, manifest.Read, rootPath)
+            except (OSError, ValueError):
+                previous = None
+            if previous is not None and previous.Algorithm != self.__algorithm:
+                previous = None
+        sumsManifest = manifest(rootPath, self.__algorithm)
+        yield from self.Walk(rootPath, rootPath, functools.partial(self.AddToManifest, sumsManifest=sumsManifest,
+                                                                   previous=previous), recursive)
+        manifestPath = os.path.join(rootPath, manifest.FILE_NAME)
+        try:
+            with self.__openAtomic__(manifestPath) as f:
+                sumsManifest.Write(f)
+        except OSError:
+            yield self.Result(result=False, path=manifestPath, pathError=True)
+
+    def VerifyManifest(self, rootPath: str, recursive: bool = True, relativePaths=None):
+        """
+        Verifies all files of the directory tree at >>rootPath<< against the manifest >>rootPath<</vrfy.manifest.
+        Directories listed in the manifest that no longer exist are reported with all their files missing, unreadable
+        lines of the manifest are reported by a failed result for the manifest file.
+
+        Parameters:
+            rootPath (str): Path of the directory tree root.
+            recursive (bool): Also verify all sub-directories.
+            relativePaths (iterable): Optional, only verify these files (paths relative to >>rootPath<<), see
+                                        WalkFiles().
+
+        Yields:
+            vrfy.Result: Result object of type vrfy.Result for each visited directory.
+        """
+        try:
+            sumsManifest = self.__timed__(vrfyProfiler.PHASE_PARSE, rootPath, manifest.Read, rootPath)
+        except (OSError, ValueError):
+            yield self.Result(result=False, path=os.path.join(rootPath, manifest.FILE_NAME), pathError=True)
+            return
+        if len(sumsManifest.BadLines) > 0:
+            yield self.__manifestBadLines__(sumsManifest)
+        func = functools.partial(self.VerifyFilesAgainstManifest, sumsManifest=sumsManifest)
+        if relativePaths is not None:
+            yield from self.WalkFiles(rootPath, rootPath, func, relativePaths)
+            return
+        visited = set()
+        for resultObject in self.Walk(rootPath, rootPath, func, recursive):
+            visited.add(sumsManifest.RelativeDir(resultObject.Path))
+            yield resultObject
+        for dirParts in sumsManifest.Directories():
+            if dirParts not in visited and (recursive or len(dirParts) == 0):
+                checksums = self.__manifestChecksums__(sumsManifest, dirParts)
+                resultObject = self.Result(result=False, path=os.path.join(rootPath, *dirParts),
+                                           missingFiles=list(checksums.keys()), backupChecksums=checksums)
+                resultObject.DirStatus = self.DIR_MISSING
+                yield resultObject
+
+    def ConvertToManifest(self, rootPath: str, recursive: bool = True):
+        """
+        Collects the checksums of all sums.csv-files of the directory tree at >>rootPath<< into the manifest
+        >>rootPath<</vrfy.manifest. Files are not hashed, and the sums.csv-files are left in place.
+
+        Parameters:
+            rootPath (str): Path of the directory tree root.
+            recursive (bool): Also convert sums.csv-files of all sub-directories.
+
+        Yields:
+            vrfy.Result: Result object of type vrfy.Result for each visited directory. Directories whose sums.csv uses
+                            a different hash algorithm than the first converted one fail with "PathError".
+        """
+        sumsManifest = manifest(rootPath, None)
+        yield from self.Walk(rootPath, rootPath, functools.partial(self.__addSumsCsvToManifest__,
+                                                                   sumsManifest=sumsManifest), recursive)
+        if sumsManifest.Algorithm is None:
+            sumsManifest.Algorithm = self.__algorithm
+        manifestPath = os.path.join(rootPath, manifest.FILE_NAME)
+        try:
+            with self.__openAtomic__(manifestPath) as f:
+                sumsManifest.Write(f)
+        except OSError:
+            yield self.Result(result=False, path=manifestPath, pathError=True)
+
+    def ConvertFromManifest(self, rootPath: str):
+        """
+        Writes a sums.csv-file for every directory listed in the manifest >>rootPath<</vrfy.manifest. The manifest is
+        left in place. Unreadable lines of the manifest are reported by a failed result for the manifest file.
+
+        Parameters:
+            rootPath (str): Path of the directory tree root.
+
+        Yields:
+            vrfy.Result: Result object of type vrfy.Result for each directory listed in the manifest.
+        """
+        try:
+            sumsManifest = self.__timed__(vrfyProfiler.PHASE_PARSE, rootPath, manifest.Read, rootPath)
+        except (OSError, ValueError):
+            yield self.Result(result=False, path=os.path.join(rootPath, manifest.FILE_NAME), pathError=True)
+            return
+        if len(sumsManifest.BadLines) > 0:
+            yield self.__manifestBadLines__(sumsManifest)
+        for dirParts in sumsManifest.Directories():
+            path = os.path.join(rootPath, *dirParts)
+            try:
+                self.__writeSumsCsvFile__(path, sumsManifest.Algorithm, sumsManifest.Lookup(dirParts))
+            except OSError:
+                yield self.Result(result=False, path=path, pathError=True)
+                continue
+            yield self.Result(result=True, path=path)
+
+    def VerifyFiles(self, pathMaster: str, pathBackup: str, snapshotMaster: dirSnapshot = None,
+                    snapshotBackup: dirSnapshot = None) -> Result:
         """
         Verifies the contents of directory "pathMaster" against the contents of "pathBackup" based on the respective 
         file checksums.
@@ -203,118 +825,770 @@ class vrfy:
             pathMaster (str): Path to the master directory whose contents are considered valid and unchanged, serving as
                                 a baseline for comparison.
             pathBackup (str): Path to backup directory whose files shall get verified against the master copy.
+            snapshotMaster (dirSnapshot): Optional, already scanned contents of >>pathMaster<<.
+            snapshotBackup (dirSnapshot): Optional, already scanned contents of >>pathBackup<<.
 
         Returns:
             vrfy.Result: Results result object of type vrfy.Result.
         """
+        if snapshotMaster is None:
+            snapshotMaster = self.__scan__(pathMaster)
+        if snapshotBackup is None:
+            snapshotBackup = self.__scan__(pathBackup)
+
         # stop execution if both path are invalid
-        if not os.path.isdir(pathMaster) and not os.path.isdir(pathBackup):
+        if not snapshotMaster.Exists and not snapshotBackup.Exists:
             return self.Result(result=False, path=pathMaster, pathError=True)
 
         result = True
-        masterHashDict = dict()
-        backupHashDict = dict()
+        masterHashDict = packedChecksums()
+        backupHashDict = packedChecksums()
         missingItemsInPathBackup = []
         additionalItemsInPathBackup = []
         checksumErrors = []
 
         # stop execution, if backup path is invalid
-        if os.path.isdir(pathMaster) and not os.path.isdir(pathBackup):
-            filesMaster = [entryB for entryB in os.listdir(pathMaster) if
-                           not os.path.isdir(os.path.join(pathMaster, entryB))]
-            for file in filesMaster:
-                masterFilePath = os.path.join(pathMaster, file)
-                checksumMaster = self.__calcChecksum__(masterFilePath)
-                masterHashDict[file] = checksumMaster
+        if snapshotMaster.Exists and not snapshotBackup.Exists:
+            filesMaster = list(snapshotMaster.Files)
+            masterHashDict = self.__calcMissingChecksumDict__(snapshotMaster, filesMaster)
             return self.Result(result=False, path=pathMaster, pathError=True, missingFiles=filesMaster,
                                additionalFiles=[], ChecksumMismatch=[],
-                               masterChecksums=masterHashDict, backupChecksums=dict())
+                               masterChecksums=masterHashDict)
 
         # stop execution, if master path is invalid
-        if os.path.isdir(pathBackup) and not os.path.isdir(pathMaster):
-            filesBackup = [entryB for entryB in os.listdir(pathBackup) if
-                           not os.path.isdir(os.path.join(pathBackup, entryB))]
-            for file in filesBackup:
-                backupFilePath = os.path.join(pathBackup, file)
-                checksumBackup = self.__calcChecksum__(backupFilePath)
-                backupHashDict[file] = checksumBackup
+        if snapshotBackup.Exists and not snapshotMaster.Exists:
+            filesBackup = list(snapshotBackup.Files)
+            backupHashDict = self.__calcMissingChecksumDict__(snapshotBackup, filesBackup)
             return self.Result(result=False, path=pathMaster, pathError=True, missingFiles=[],
                                additionalFiles=filesBackup, ChecksumMismatch=[],
-                               masterChecksums=dict(), backupChecksums=backupHashDict)
+                               backupChecksums=backupHashDict)
 
         # below: both paths are valid
         # determine available files in master and backup paths -> lists of file names
-        filesMaster = [entryB for entryB in os.listdir(pathMaster) if
-                       not os.path.isdir(os.path.join(pathMaster, entryB))]
-        filesBackup = [entryB for entryB in os.listdir(pathBackup) if
-                       not os.path.isdir(os.path.join(pathBackup, entryB))]
+        filesMaster = list(snapshotMaster.Files)
+        filesBackup = list(snapshotBackup.Files)
+
+        # search for missing or additional files in master and backup, and set error flag
+        setMaster = set(filesMaster)
+        setBackup = set(filesBackup)
+        commonFiles = [i for i in filesMaster if i in setBackup]
+        missingItemsInPathBackup = [i for i in filesMaster if i not in setBackup]
+        additionalItemsInPathBackup = [i for i in filesBackup if i not in setMaster]
+        if len(missingItemsInPathBackup) != 0 or len(additionalItemsInPathBackup) != 0:
+            result = False
+
+        if self.__compare == self.COMPARE_METADATA:
+            # compare file type, size and mtime only, missing and additional files are not hashed
+            changedAttributes = self.__compareMetadata__(snapshotMaster, snapshotBackup, commonFiles)
+            for fileName in commonFiles:
+                if fileName in changedAttributes:
+                    masterHashDict[fileName] = self.HASH_SKIPPED
+                    backupHashDict[fileName] = self.HASH_SKIPPED
+                    checksumErrors.append(str(fileName))
+                    result = False
+            for missingBackup in missingItemsInPathBackup:
+                masterHashDict[missingBackup] = self.HASH_SKIPPED
+            for additionalBackup in additionalItemsInPathBackup:
+                backupHashDict[additionalBackup] = self.HASH_SKIPPED
+            return self.__trimResult__(self.Result(result=result, path=pathMaster,
+                                                   missingFiles=missingItemsInPathBackup,
+                                                   additionalFiles=additionalItemsInPathBackup,
+                                                   ChecksumMismatch=checksumErrors, masterChecksums=masterHashDict,
+                                                   backupChecksums=backupHashDict,
+                                                   changedAttributes=changedAttributes))
+
+        # cheap pre-filter: mismatching sizes and sampled blocks prove a mismatch without reading whole files
+        quickMismatches, skippedBytes = self.__quickCompare__(snapshotMaster, snapshotBackup, commonFiles)
+        hashedFiles = [i for i in commonFiles if i not in quickMismatches]
+
+        # compare master and backup copy of each file pair byte by byte, or hash both concurrently
+        mismatchOffsets = dict()
+        if self.__compare == self.COMPARE_BYTES:
+            compareResults = self.__executor.Map(self.__getHasher__().CompareFiles,
+                                                 [(snapshotMaster.FilePath(i), snapshotBackup.FilePath(i),
+                                                   self.__compareDigest) for i in hashedFiles])
+            pairDigests = []
+            for fileName, (equal, offset, digest) in zip(hashedFiles, compareResults):
+                if digest is None:
+                    digest = self.HASH_SKIPPED
+                if equal:
+                    pairDigests += [digest, digest]
+                else:
+                    # backup file was not read completely, its digest is unknown
+                    pairDigests += [digest, self.HASH_ERROR if digest == self.HASH_ERROR else self.HASH_SKIPPED]
+                    if offset is not None:
+                        mismatchOffsets[fileName] = offset
+            hashFiles = []
+        else:
+            pairDigests = []
+            hashFiles = []
+            for fileName in hashedFiles:
+                hashFiles.append((snapshotMaster, fileName))
+                hashFiles.append((snapshotBackup, fileName))
+        # hash missing and additional files
+        if self.__hashUnmatched:
+            hashFiles += [(snapshotMaster, i) for i in missingItemsInPathBackup]
+            hashFiles += [(snapshotBackup, i) for i in additionalItemsInPathBackup]
+        hashDigests = pairDigests + self.__calcChecksums__([snapshot.FilePath(i) for snapshot, i in hashFiles],
+                                                           self.__fileStats__(hashFiles))
 
         # start file verification, when files are included in master directory
         # iterate through all files of master directory and verify their checksums to those of the backup directory
-        # not executed, when no entires in filesMaster list
-        for fileNameMaster in filesMaster:
-            # master file is not included on backup directory -> set error flag
-            if fileNameMaster not in filesBackup:
+        # not executed, when no entires in commonFiles list
+        digestIterator = iter(hashDigests)
+        for fileName in commonFiles:
+            if fileName in quickMismatches:
+                # mismatch detected by pre-filter, files were not hashed
+                masterHashDict[fileName] = self.HASH_SKIPPED
+                backupHashDict[fileName] = self.HASH_SKIPPED
+                checksumErrors.append(str(fileName))
                 result = False
+                continue
+            checksumMaster = next(digestIterator)
+            checksumBackup = next(digestIterator)
+            # save hashvalues for later analysis
+            masterHashDict[fileName] = checksumMaster
+            backupHashDict[fileName] = checksumBackup
+            # verify that both match and both are NOT "HASH_ERROR"
+            if checksumBackup == checksumMaster and (checksumMaster != self.HASH_ERROR) and \
+                    fileName not in mismatchOffsets:
+                pass
             else:
-                # calculate checksums for master and backup file
-                masterFilePath = os.path.join(pathMaster, fileNameMaster)
-                backupFilePath = os.path.join(pathBackup, fileNameMaster)
-                checksumMaster = self.__calcChecksum__(masterFilePath)
-                checksumBackup = self.__calcChecksum__(backupFilePath)
-                # save hashvalues for later analysis
-                masterHashDict[fileNameMaster] = checksumMaster
-                backupHashDict[fileNameMaster] = checksumBackup
-                # verify that both match and both are NOT "HASH_ERROR"
-                if checksumBackup == checksumMaster and (checksumMaster != self.HASH_ERROR):
-                    pass
-                else:
-                    # checksum mismatch -> set error flag and add file name to list of mismatched files
-                    checksumErrors.append(str(fileNameMaster))
-                    result = False
-
-        # search for missing or additional files in master and backup, and set error flag
-        missingItemsInPathBackup = [i for i in filesMaster if i not in filesBackup]
-        additionalItemsInPathBackup = [i for i in filesBackup if i not in filesMaster]
-        if len(missingItemsInPathBackup) != 0 or len(additionalItemsInPathBackup) != 0:
-            result = False
+                # checksum mismatch -> set error flag and add file name to list of mismatched files
+                checksumErrors.append(str(fileName))
+                result = False
 
-        # calculate checksums for additional and missing files
+        # store checksums for additional and missing files
         for missingBackup in missingItemsInPathBackup:
-            masterFilePath = os.path.join(pathMaster, missingBackup)
-            checksumMaster = self.__calcChecksum__(masterFilePath)
-            masterHashDict[missingBackup] = checksumMaster
+            masterHashDict[missingBackup] = next(digestIterator) if self.__hashUnmatched else self.HASH_SKIPPED
         for additionalBackup in additionalItemsInPathBackup:
-            backupFilePath = os.path.join(pathBackup, additionalBackup)
-            checksumBackup = self.__calcChecksum__(backupFilePath)
-            backupHashDict[additionalBackup] = checksumBackup
+            backupHashDict[additionalBackup] = next(digestIterator) if self.__hashUnmatched else self.HASH_SKIPPED
 
-        return self.Result(result=result, path=pathMaster, missingFiles=missingItemsInPathBackup,
-                           additionalFiles=additionalItemsInPathBackup, ChecksumMismatch=checksumErrors,
-                           masterChecksums=masterHashDict, backupChecksums=backupHashDict)
+        return self.__trimResult__(self.Result(result=result, path=pathMaster, missingFiles=missingItemsInPathBackup,
+                                               additionalFiles=additionalItemsInPathBackup,
+                                               ChecksumMismatch=checksumErrors, masterChecksums=masterHashDict,
+                                               backupChecksums=backupHashDict, skippedBytes=skippedBytes,
+                                               mismatchOffsets=mismatchOffsets))
 
-    def __calcChecksum__(self, filePath: str) -> str:
+    def __compareMetadata__(self, snapshotMaster: dirSnapshot, snapshotBackup: dirSnapshot, fileNames: list) -> dict:
+        """
+        Compares file type, size and mtime (whole seconds) of master/backup file pairs without reading them.
+
+        Parameters:
+            snapshotMaster (dirSnapshot): Scanned contents of the master directory.
+            snapshotBackup (dirSnapshot): Scanned contents of the backup directory.
+            fileNames (list): Names of files included in master and backup directory.
+
+        Returns:
+            dict: dict[filename] = list of differing attributes (ATTRIBUTE_*), for all files that differ.
+        """
+        changedAttributes = dict()
+        for fileName in fileNames:
+            typeMaster = snapshotMaster.FileType(fileName)
+            typeBackup = snapshotBackup.FileType(fileName)
+            statMaster = snapshotMaster.Stat(fileName)
+            statBackup = snapshotBackup.Stat(fileName)
+            if typeMaster is None or typeBackup is None or statMaster is None or statBackup is None:
+                changedAttributes[fileName] = [self.ATTRIBUTE_ACCESS]
+                continue
+            attributes = []
+            if typeMaster != typeBackup:
+                attributes.append(self.ATTRIBUTE_TYPE)
+            if statMaster.st_size != statBackup.st_size:
+                attributes.append(self.ATTRIBUTE_SIZE)
+            # copies on other file systems often keep only whole seconds
+            if statMaster.st_mtime_ns // 1000000000 != statBackup.st_mtime_ns // 1000000000:
+                attributes.append(self.ATTRIBUTE_MTIME)
+            if len(attributes) > 0:
+                changedAttributes[fileName] = attributes
+        return changedAttributes
+
+    def __quickCompare__(self, snapshotMaster: dirSnapshot, snapshotBackup: dirSnapshot, fileNames: list) -> tuple:
+        """
+        Detects mismatching master/backup file pairs without hashing them: Pairs of different size are mismatched, and
+        optionally sampled blocks (head, tail and pseudo random offsets) of equally sized pairs are compared.
+        Disabled, when full hashing is requested.
+
+        Parameters:
+            snapshotMaster (dirSnapshot): Scanned contents of the master directory.
+            snapshotBackup (dirSnapshot): Scanned contents of the backup directory.
+            fileNames (list): Names of files included in master and backup directory.
+
+        Returns:
+            mismatches, skippedBytes (set, int): Tuple. Names of mismatched files and number of bytes not read.
+        """
+        mismatches = set()
+        skippedBytes = 0
+        if self.__fullHash or len(fileNames) == 0:
+            return mismatches, skippedBytes
+
+        sampleFiles = []
+        for fileName in fileNames:
+            statMaster = snapshotMaster.Stat(fileName)
+            statBackup = snapshotBackup.Stat(fileName)
+            if statMaster is None or statBackup is None:
+                continue
+            if statMaster.st_size != statBackup.st_size:
+                mismatches.add(fileName)
+                skippedBytes += statMaster.st_size + statBackup.st_size
+            elif self.__sampleBlocks > 0:
+                sampleFiles.append(fileName)
+
+        if len(sampleFiles) > 0:
+            samplePairs = [(snapshotMaster.FilePath(i), snapshotBackup.FilePath(i), snapshotMaster.Stat(i).st_size,
+                            self.__sampleBlocks) for i in sampleFiles]
+            sampleResults = self.__executor.Map(self.__getHasher__().CompareSamples, samplePairs)
+            for fileName, samplePair, (equal, bytesRead) in zip(sampleFiles, samplePairs, sampleResults):
+                if not equal:
+                    mismatches.add(fileName)
+                    skippedBytes += 2 * samplePair[2] - bytesRead
+        return mismatches, skippedBytes
+
+    def Walk(self, pathMaster: str, pathBackup: str, func, recursive: bool = True, shard: tuple = None,
+             bottomUp: bool = False):
+        """
+        Executes >>func<< on "pathMaster"/"pathBackup" and, if requested, on all of their sub-directories.
+        Directories are visited depth-first in sorted order using an explicit stack, and results are yielded as soon as
+        a directory is finished.
+
+        Parameters:
+            pathMaster (str): Path to the master directory whose contents are considered valid and unchanged, serving as
+                                a baseline for comparison.
+            pathBackup (str): Path to backup directory whose files shall get verified against the master copy. Same as
+                                >>pathMaster<< for single directory operations.
+            func (callable): Function that gets executed on the respective folder, e.g. VerifyFiles (two paths) or
+                                VerifyFilesAgainstChecksums/WriteChecksumFile (one path).
+            recursive (bool): Also visit all sub-directories.
+            shard (tuple): Optional (index, count) with 1 <= index <= count: Only directories assigned to shard
+                                >>index<< by GetShard() are processed, all others are traversed only. Running all
+                                >>count<< shards (e.g. on different nodes) processes every directory exactly once.
+            bottomUp (bool): Process each directory after all of its sub-directories (post-order), e.g. for
+                                WriteChecksumFile with tree digests.
+
+        Yields:
+            vrfy.Result: Result object of type vrfy.Result for each processed directory.
+        """
+        numParam = self.__getNumParam__(func)
+        if shard is not None and not 1 <= shard[0] <= shard[1]:
+            raise ValueError("Invalid shard: " + str(shard))
+
+        stack = [(pathMaster, pathBackup, None, None)]
+        while len(stack) > 0:
+            currentMaster, currentBackup, snapshotMaster, snapshotBackup = stack.pop()
+            if snapshotMaster is None:
+                # read master and backup directories once, the snapshots are passed on to >>func<<
+                snapshotMaster = self.__scan__(currentMaster)
+                if currentBackup != currentMaster:
+                    snapshotBackup = self.__scan__(currentBackup)
+                else:
+                    snapshotBackup = snapshotMaster
+
+                subFolders = sorted(set(snapshotMaster.Dirs).union(snapshotBackup.Dirs)) if recursive else []
+                if bottomUp and len(subFolders) > 0:
+                    # revisit the directory once all of its sub-directories are finished
+                    stack.append((currentMaster, currentBackup, snapshotMaster, snapshotBackup))
+                # push in reverse order, so that sub-directories are visited in sorted order
+                for nextFolder in reversed(subFolders):
+                    stack.append((os.path.join(currentMaster, nextFolder), os.path.join(currentBackup, nextFolder),
+                                  None, None))
+                if bottomUp and len(subFolders) > 0:
+                    continue
+            if shard is not None and not self.__inShard__(pathMaster, currentMaster, shard):
+                continue
+
+            yield self.__processDirectory__(func, numParam, currentMaster, currentBackup, snapshotMaster,
+                                            snapshotBackup)
+        self.Stats.Finish()
+
+    def WalkFiles(self, pathMaster: str, pathBackup: str, func, relativePaths, shard: tuple = None):
+        """
+        Executes >>func<< like Walk(), but only on the files >>relativePaths<<: Files are grouped by directory, each
+        directory is read once and >>func<< gets a snapshot restricted to the listed files (dirSnapshot.Select()).
+        Directories are visited in the same order as by Walk().
+
+        Parameters:
+            pathMaster (str): Path to the master directory (root of >>relativePaths<<).
+            pathBackup (str): Path to backup directory. Same as >>pathMaster<< for single directory operations.
+            func (callable): Function that gets executed on the respective folder, e.g. VerifyFiles (two paths) or
+                                VerifyFilesAgainstChecksums (one path).
+            relativePaths (iterable): Paths of files relative to >>pathMaster<</>>pathBackup<<.
+            shard (tuple): Optional (index, count), see Walk().
+
+        Yields:
+            vrfy.Result: Result object of type vrfy.Result for each directory including listed files.
+
+        Raises:
+            ValueError: A path is absolute or outside of >>pathMaster<<.
+        """
+        numParam = self.__getNumParam__(func)
+        if shard is not None and not 1 <= shard[0] <= shard[1]:
+            raise ValueError("Invalid shard: " + str(shard))
+
+        groups = dict()
+        for relativePath in relativePaths:
+            normPath = os.path.normpath(relativePath)
+            if os.path.isabs(normPath) or normPath == os.pardir or normPath.startswith(os.pardir + os.sep):
+                raise ValueError("Path outside of " + str(pathMaster) + ": " + str(relativePath))
+            dirName, fileName = os.path.split(normPath)
+            groups.setdefault(dirName, set()).add(fileName)
+
+        # depth-first in sorted order, same as Walk()
+        for dirName in sorted(groups, key=lambda name: name.split(os.sep) if name != "" else []):
+            currentMaster = os.path.join(pathMaster, dirName) if dirName != "" else pathMaster
+            currentBackup = os.path.join(pathBackup, dirName) if dirName != "" else pathBackup
+            if shard is not None and not self.__inShard__(pathMaster, currentMaster, shard):
+                continue
+            snapshotMaster = self.__scan__(currentMaster).Select(groups[dirName])
+            if currentBackup != currentMaster:
+                snapshotBackup = self.__scan__(currentBackup).Select(groups[dirName])
+            else:
+                snapshotBackup = snapshotMaster
+            yield self.__processDirectory__(func, numParam, currentMaster, currentBackup, snapshotMaster,
+                                            snapshotBackup)
+        self.Stats.Finish()
+
+    def DetectMoves(self, results, pathMaster: str, pathBackup: str, hashUnmatched: bool = False):
+        """
+        Detects files that were moved or renamed between master and backup tree in the results of VerifyFiles, e.g.
+        Walk(pathMaster, pathBackup, VerifyFiles). Missing and additional files of all directories are indexed by size,
+        files of a size that occurs in master and backup are hashed (unless already hashed), and files with identical
+        contents are reported as moved (Result.MovedFiles) instead of missing/additional.
+        Results are passed on in order, results from the first one with missing or additional files on are held back
+        until all moves are known.
+
+        Parameters:
+            results (iterable): Results of VerifyFiles, e.g. returned by Walk() or WalkFiles().
+            pathMaster (str): Path to the master directory (root of the walk).
+            pathBackup (str): Path to the backup directory (root of the walk).
+            hashUnmatched (bool): Also hash the remaining missing and additional files whose checksums are not known
+                                (e.g. with vrfy(hashUnmatched=False)), so that their checksums can be printed.
+
+        Yields:
+            vrfy.Result: Results of >>results<<, updated for moved files.
+        """
+        index = digestIndex()
+        # digests of all files hashed by the index, dict[filePath] = hash digest
+        digests = dict()
+
+        def calcChecksums(filePaths: list, fileStats: list) -> list:
+            hashDigests = self.__calcChecksums__(filePaths, fileStats)
+            digests.update(zip(filePaths, hashDigests))
+            return hashDigests
+
+        pending = []
+        for resultObject in results:
+            if len(pending) == 0 and len(resultObject.MissingFiles) == 0 and len(resultObject.AdditionalFiles) == 0:
+                yield resultObject
+                continue
+            pending.append(resultObject)
+            for group, rootPath, path, fileNames, checksums in (
+                    (self.DIR_MISSING, pathMaster, resultObject.Path, resultObject.MissingFiles,
+                     resultObject.MasterChecksums),
+                    (self.DIR_ADDITIONAL, pathBackup, resultObject.PathBackup, resultObject.AdditionalFiles,
+                     resultObject.BackupChecksums)):
+                for fileName in fileNames:
+                    filePath = os.path.join(path, fileName)
+                    try:
+                        stat = os.stat(filePath)
+                    except OSError:
+                        continue
+                    index.Add(group, self.__relativePath__(rootPath, path, fileName), filePath, stat,
+                              checksums.get(fileName))
+        if len(pending) == 0:
+            return
+
+        numHashed = index.Resolve(calcChecksums, invalidDigests=(self.HASH_ERROR, self.HASH_SKIPPED))
+        moves = dict(index.Match(self.DIR_MISSING, self.DIR_ADDITIONAL))
+        movedTo = set(moves.values())
+        unmatched = []
+        for resultObject in pending:
+            missingFiles = []
+            for fileName in resultObject.MissingFiles:
+                relativePath = self.__relativePath__(pathMaster, resultObject.Path, fileName)
+                if relativePath in moves:
+                    resultObject.MovedFiles[fileName] = moves[relativePath]
+                else:
+                    missingFiles.append(fileName)
+            additionalFiles = [fileName for fileName in resultObject.AdditionalFiles
+                               if self.__relativePath__(pathBackup, resultObject.PathBackup, fileName) not in movedTo]
+            if len(missingFiles) != len(resultObject.MissingFiles) or \
+                    len(additionalFiles) != len(resultObject.AdditionalFiles):
+                resultObject.MissingFiles = missingFiles
+                resultObject.AdditionalFiles = additionalFiles
+                resultObject.Result = len(missingFiles) == 0 and len(additionalFiles) == 0 and \
+                    len(resultObject.ChecksumMismatch) == 0 and len(resultObject.BadLines) == 0 and \
+                    not resultObject.PathError
+            if hashUnmatched:
+                for path, fileNames, checksums in (
+                        (resultObject.Path, missingFiles, resultObject.MasterChecksums),
+                        (resultObject.PathBackup, additionalFiles, resultObject.BackupChecksums)):
+                    unmatched.extend((checksums, fileName, os.path.join(path, fileName)) for fileName in fileNames
+                                     if checksums.get(fileName, self.HASH_SKIPPED) == self.HASH_SKIPPED)
+
+        pendingPaths = [filePath for checksums, fileName, filePath in unmatched if filePath not in digests]
+        if len(pendingPaths) > 0:
+            digests.update(zip(pendingPaths, self.__calcChecksums__(pendingPaths)))
+        for checksums, fileName, filePath in unmatched:
+            checksums[fileName] = digests[filePath]
+        if numHashed + len(pendingPaths) > 0:
+            self.Stats.Finish()
+        yield from pending
+
+    def FindDuplicates(self, rootPath: str, recursive: bool = True) -> list:
+        """
+        Finds files with identical contents within directory (tree) >>rootPath<<. Files are indexed by size and only
+        files that share their size with another file are hashed. Empty files, symlinks and checksum files are ignored.
+
+        Parameters:
+            rootPath (str): Path to the directory.
+            recursive (bool): Include all sub-directories.
+
+        Returns:
+            List[tuple]: (digest, size, list of paths relative to >>rootPath<<) per set of identical files, sorted by
+                            their first path.
+        """
+        index = digestIndex()
+
+        def indexDirectory(path: str, snapshot: dirSnapshot = None) -> vrfy.Result:
+            for fileName in snapshot.Files:
+                if fileName in self.CHECKSUM_FILES or snapshot.FileType(fileName) != dirSnapshot.TYPE_FILE:
+                    continue
+                stat = snapshot.Stat(fileName)
+                if stat is not None:
+                    index.Add(None, self.__relativePath__(rootPath, path, fileName), snapshot.FilePath(fileName),
+                              stat)
+            return self.Result(result=True, path=path)
+
+        for resultObject in self.Walk(rootPath, rootPath, indexDirectory, recursive):
+            pass
+        index.Resolve(self.__calcChecksums__, acrossGroups=False, invalidDigests=(self.HASH_ERROR,))
+        self.Stats.Finish()
+        return [(digest, size, [name for group, name in files]) for digest, size, files in index.Groups()]
+
+    @staticmethod
+    def __relativePath__(rootPath: str, path: str, fileName: str) -> str:
+        """
+        Returns the path of file >>fileName<< in directory >>path<< relative to >>rootPath<<, separated by "/".
+        """
+        relativeDir = os.path.relpath(path, rootPath)
+        if relativeDir == os.curdir:
+            return fileName
+        return relativeDir.replace(os.sep, "/") + "/" + fileName
+
+    def __scan__(self, path: str) -> dirSnapshot:
+        """
+        Returns dirSnapshot.Scan(>>path<<), timed by the profiler. Temporary files of checksum files left behind by an
+        interrupted run (see __openAtomic__()) are left out.
+        """
+        return self.__timed__(vrfyProfiler.PHASE_SCAN, path, dirSnapshot.Scan, path, self.__isTemporaryFile__)
+
+    def __timed__(self, phase: str, path: str, func, *args, **kwargs):
+        """
+        Returns func(*args, **kwargs). If profiling is enabled, its duration is added to >>phase<< of directory
+        >>path<<.
+        """
+        if self.Profiler is None:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.Profiler.Add(phase, path, time.perf_counter() - start)
+
+    def __processDirectory__(self, func, numParam: int, currentMaster: str, currentBackup: str,
+                             snapshotMaster: dirSnapshot, snapshotBackup: dirSnapshot) -> Result:
+        """
+        Executes >>func<< on a single directory (pair) for Walk()/WalkFiles() and counts it in >>Stats<<.
+
+        Returns:
+            vrfy.Result: Result of >>func<< with "PathBackup" and "DirStatus" set.
+        """
+        if numParam == 1:
+            resultObject = self.__timed__(vrfyProfiler.PHASE_PROCESS, currentBackup, func, currentBackup,
+                                          snapshot=snapshotBackup)
+        else:
+            resultObject = self.__timed__(vrfyProfiler.PHASE_PROCESS, currentMaster, func, currentMaster,
+                                          currentBackup, snapshotMaster=snapshotMaster, snapshotBackup=snapshotBackup)
+        resultObject.PathBackup = currentBackup
+        self.Stats.AddDirectory(*self.__countFiles__([snapshotMaster] if snapshotBackup is snapshotMaster
+                                                     else [snapshotMaster, snapshotBackup]))
+        if snapshotMaster.Exists and not snapshotBackup.Exists:
+            resultObject.DirStatus = self.DIR_MISSING
+        elif snapshotBackup.Exists and not snapshotMaster.Exists:
+            resultObject.DirStatus = self.DIR_ADDITIONAL
+        return resultObject
+
+    @staticmethod
+    def __getNumParam__(func) -> int:
+        """
+        Returns the number of paths >>func<< takes (1 or 2), i.e. its number of parameters without default value.
+
+        Raises:
+            ValueError: Unsupported signature of >>func<<.
+        """
+        numParam = len([p for p in signature(func).parameters.values() if p.default is p.empty])
+        if numParam not in (1, 2):
+            raise ValueError("Unsupported function signature: " + str(func))
+        return numParam
+
+    @staticmethod
+    def GetShard(relativePath: str, count: int) -> int:
+        """
+        Returns the shard (1 to >>count<<) directory >>relativePath<< is assigned to. The assignment only depends on
+        the relative path, i.e. it is the same on all nodes and platforms.
+
+        Parameters:
+            relativePath (str): Path of the directory relative to the root of the operation ("" for the root).
+            count (int): Number of shards.
+
+        Returns:
+            int: Shard index.
+        """
+        relativePath = relativePath.replace(os.sep, "/").strip("/")
+        if relativePath == ".":
+            relativePath = ""
+        return zlib.crc32(relativePath.encode("utf-8", "surrogateescape")) % count + 1
+
+    def __inShard__(self, rootPath: str, path: str, shard: tuple) -> bool:
+        """
+        Returns True, if directory >>path<< below >>rootPath<< belongs to >>shard<< (index, count).
+        """
+        index, count = shard
+        return self.GetShard(os.path.relpath(path, rootPath), count) == index
+
+    def __hashDirectory__(self, snapshot: dirSnapshot, existingSums=None) -> tuple:
+        """
+        Hashes all files of a directory, except for checksum files.
+
+        Parameters:
+            snapshot (dirSnapshot): Scanned contents of the directory.
+            existingSums (vrfy.Checksums): Optional, previously calculated checksums. They are reused for files whose
+                                            size/mtime still match, if calculated with the configured algorithm.
+
+        Returns:
+            files, fileStats, hashDigests (list, list, list): Tuple. File names, their stat results (None, if not
+                                                              accessible) and hash digests.
+        """
+        files = [file for file in snapshot.Files if file not in self.CHECKSUM_FILES]
+        fileStats = [snapshot.Stat(file) for file in files]
+        if existingSums is None or existingSums.Algorithm != self.__algorithm:
+            existingSums = self.Checksums()
+        hashDigests = [None] * len(files)
+        for index, (file, fileStat) in enumerate(zip(files, fileStats)):
+            if file in existingSums and fileStat is not None and \
+                    existingSums.FileStats.get(file) == (fileStat.st_size, fileStat.st_mtime_ns):
+                hashDigests[index] = existingSums[file]
+        pending = [index for index, hashDigest in enumerate(hashDigests) if hashDigest is None]
+        calculated = self.__calcChecksums__([snapshot.FilePath(files[index]) for index in pending],
+                                            self.__fileStats__([(snapshot, files[index]) for index in pending]))
+        for index, hashDigest in zip(pending, calculated):
+            hashDigests[index] = hashDigest
+        return files, fileStats, hashDigests
+
+    def __addSumsCsvToManifest__(self, path: str, snapshot: dirSnapshot = None,
+                                 sumsManifest: manifest = None) -> Result:
+        """
+        Adds the checksums of sums.csv in >>path<< to >>sumsManifest<<.
+        """
+        if snapshot is None:
+            snapshot = self.__scan__(path)
+        if not snapshot.Exists:
+            return self.Result(result=False, path=path, pathError=True)
+        if "sums.csv" not in snapshot.Files:
+            return self.Result(result=True, path=path)
+        sumsDict = self.__readSumsCsvFile__(path)
+        if sumsManifest.Algorithm is None:
+            sumsManifest.Algorithm = sumsDict.Algorithm
+        elif sumsManifest.Algorithm != sumsDict.Algorithm:
+            return self.Result(result=False, path=path, pathError=True)
+        dirParts = sumsManifest.RelativeDir(path)
+        for file, hashDigest in sumsDict.items():
+            sumsManifest.Add(dirParts, file, hashDigest, *sumsDict.FileStats.get(file, (None, None)))
+        return self.Result(result=True, path=path)
+
+    def __selectChecksums__(self, checksums, fileNames: set):
+        """
+        Returns the entries of >>checksums<< for files >>fileNames<< as vrfy.Checksums. Unreadable lines of the checksum
+        file are kept.
+        """
+        selected = self.Checksums(algorithm=getattr(checksums, "Algorithm", self.__algorithm))
+        fileStats = getattr(checksums, "FileStats", dict())
+        for fileName in checksums:
+            if fileName in fileNames:
+                selected[fileName] = checksums[fileName]
+                if fileName in fileStats:
+                    selected.FileStats[fileName] = fileStats[fileName]
+        selected.BadLines = list(getattr(checksums, "BadLines", []))
+        return selected
+
+    def __manifestChecksums__(self, sumsManifest: manifest, dirParts: tuple):
+        """
+        Returns the entries of directory >>dirParts<< in >>sumsManifest<< as vrfy.Checksums.
+        """
+        checksums = self.Checksums(algorithm=sumsManifest.Algorithm)
+        for fileName, hashDigest, size, mtime in sumsManifest.Lookup(dirParts):
+            checksums[fileName] = hashDigest
+            if size is not None and mtime is not None:
+                checksums.FileStats[fileName] = (size, mtime)
+        return checksums
+
+    @staticmethod
+    def __manifestBadLines__(sumsManifest: manifest) -> Result:
+        """
+        Returns a failed result for the manifest file of >>sumsManifest<< with its unreadable lines.
+        """
+        return vrfy.Result(result=False, path=os.path.join(sumsManifest.Path, manifest.FILE_NAME),
+                           badLines=[manifest.FILE_NAME + ":" + str(lineNumber) + ": " + reason
+                                     for lineNumber, reason in sumsManifest.BadLines])
+
+    def __calcChecksum__(self, filePath: str, algorithm: str = None) -> str:
         """
         Calculates and returns file hash for >>filePath<<.
 
         Parameters:
             filePath (str): Path and name of the file that shall get hashed.
+            algorithm (str): Hash algorithm, defaults to the configured algorithm.
 
         Returns:
             str: Hash digest.
         """
-        sha256_hash = hashlib.sha256()
-        try:
-            with open(filePath, 'rb') as f:
-                while True:
-                    block = f.read(8192)
-                    if not block:
-                        break
-                    sha256_hash.update(block)
-        except OSError:
-            # print("ERROR: Unable to calculate SHA256 hash.")
-            return self.HASH_ERROR
-        return str(sha256_hash.hexdigest())
+        return self.__calcChecksums__([filePath], algorithm=algorithm)[0]
+
+    def __calcChecksums__(self, filePaths: list, fileStats: list = None, algorithm: str = None) -> list:
+        """
+        Calculates file hashes for all files in >>filePaths<< using the configured executor.
+        Digests of unchanged files are taken from the hash cache, if enabled.
+
+        Parameters:
+            filePaths (list): Paths and names of the files that shall get hashed.
+            fileStats (list): Optional, known stat results of >>filePaths<< (None for unknown entries).
+            algorithm (str): Hash algorithm, defaults to the configured algorithm.
+
+        Returns:
+            list: Hash digests in the order of >>filePaths<<.
+        """
+        fileHasher = self.__getHasher__(algorithm)
+        if self.__cache is None:
+            return self.__hashFiles__(fileHasher, filePaths, fileStats)
+
+        hashDigests = [None] * len(filePaths)
+        fileStats = list(fileStats) if fileStats is not None else [None] * len(filePaths)
+        pending = []
+        for index, filePath in enumerate(filePaths):
+            if fileStats[index] is None:
+                try:
+                    fileStats[index] = os.stat(filePath)
+                except OSError:
+                    pending.append(index)
+                    continue
+            if not self.__paranoid:
+                hashDigests[index] = self.__cache.Lookup(fileStats[index], fileHasher.Algorithm)
+            if hashDigests[index] is None:
+                pending.append(index)
+
+        self.Stats.AddCacheLookups(len(filePaths) - len(pending), len(pending))
+        calculated = self.__hashFiles__(fileHasher, [filePaths[index] for index in pending],
+                                        [fileStats[index] for index in pending])
+        for index, hashDigest in zip(pending, calculated):
+            hashDigests[index] = hashDigest
+            if fileStats[index] is not None and hashDigest != self.HASH_ERROR:
+                self.__cache.Store(fileStats[index], fileHasher.Algorithm, hashDigest)
+        self.__cache.Commit()
+        return hashDigests
+
+    def __hashFiles__(self, fileHasher: hasher, filePaths: list, fileStats: list = None) -> list:
+        """
+        Hashes all files in >>filePaths<< using the configured executor and counts them in >>Stats<<.
+
+        Parameters:
+            fileHasher (hasher): Hasher to use.
+            filePaths (list): Paths and names of the files that shall get hashed.
+            fileStats (list): Optional, known stat results of >>filePaths<< (None for unknown entries).
+
+        Returns:
+            list: Hash digests in the order of >>filePaths<<.
+        """
+        recorder = statsRecorder(fileHasher.CalcChecksumStats, self.Stats, profiler=self.Profiler)
+        results = self.__executor.Map(recorder, filePaths, fileStats=fileStats)
+        if recorder.Recorded == 0:
+            # hashed in worker processes, count the files now
+            for filePath, (hashDigest, numBytes, readTime, hashTime) in zip(filePaths, results):
+                self.Stats.AddFile(numBytes, readTime, hashTime)
+                if self.Profiler is not None:
+                    self.Profiler.AddFile(filePath, readTime, hashTime)
+        return [result[0] for result in results]
+
+    def __trimResult__(self, resultObject: Result) -> Result:
+        """
+        Drops checksums of passed files from >>resultObject<<, unless all checksums shall be kept.
+        """
+        if not self.__keepChecksums:
+            resultObject.DropPassedChecksums()
+        return resultObject
+
+    def __countFiles__(self, snapshots: list) -> tuple:
+        """
+        Returns number and total size of the files in >>snapshots<<.
+        """
+        numFiles = 0
+        numBytes = 0
+        for snapshot in snapshots:
+            for fileName in snapshot.Files:
+                fileStat = snapshot.Stat(fileName)
+                numFiles += 1
+                numBytes += fileStat.st_size if fileStat is not None else 0
+        return numFiles, numBytes
+
+    def __calcMissingChecksumDict__(self, snapshot: dirSnapshot, fileNames: list) -> packedChecksums:
+        """
+        Returns the checksums of files >>fileNames<< that are missing on the other side of VerifyFiles. Files are only
+        hashed, if contents are compared and missing files shall be hashed.
+        """
+        if self.__compare == self.COMPARE_METADATA or not self.__hashUnmatched:
+            return packedChecksums((fileName, self.HASH_SKIPPED) for fileName in fileNames)
+        return self.__calcChecksumDict__(snapshot, fileNames)
+
+    def __calcChecksumDict__(self, snapshot: dirSnapshot, fileNames: list, algorithm: str = None) -> packedChecksums:
+        """
+        Calculates file hashes for files >>fileNames<< within the directory of >>snapshot<<.
+
+        Parameters:
+            snapshot (dirSnapshot): Scanned contents of the directory the files are located in.
+            fileNames (list): Names of the files that shall get hashed.
+            algorithm (str): Hash algorithm, defaults to the configured algorithm.
+
+        Returns:
+            packedChecksums:   dict[filename] = hash digest, in the order of >>fileNames<<.
+        """
+        hashDigests = self.__calcChecksums__([snapshot.FilePath(fileName) for fileName in fileNames],
+                                             self.__fileStats__([(snapshot, fileName) for fileName in fileNames]),
+                                             algorithm)
+        return packedChecksums(zip(fileNames, hashDigests))
+
+    def __getHasher__(self, algorithm: str = None) -> hasher:
+        """
+        Returns the hasher for >>algorithm<< (default: configured algorithm).
+        """
+        if algorithm is None:
+            algorithm = self.__algorithm
+        if algorithm not in self.__hashers:
+            self.__hashers[algorithm] = hasher(algorithm, **self.__hasherOptions)
+        return self.__hashers[algorithm]
+
+    def __fileStats__(self, files: list):
+        """
+        Returns the stat results of >>files<< taken from their directory snapshots, when required for hashing (hash
+        cache) or for scheduling (ioScheduler).
+
+        Parameters:
+            files (list): List of (dirSnapshot, filename) tuples.
+
+        Returns:
+            list | None: Stat results in the order of >>files<<, or None when no stat results are required.
+        """
+        if self.__cache is None and not isinstance(self.__executor, ioScheduler):
+            return None
+        return [snapshot.Stat(fileName) for snapshot, fileName in files]
 
     def __getChecksumsFromFile__(self, filePathName: str) -> dict:
         """
@@ -330,56 +1604,274 @@ class vrfy:
         path, filename = os.path.split(filePathName)
         name, extension = os.path.splitext(os.path.basename(filePathName))
         if extension == ".sha256sum":
-            return self.__readSha256SumFile__(path, filename)
+            return self.__timed__(vrfyProfiler.PHASE_PARSE, path, self.__readSha256SumFile__, path, filename)
         elif filename == "sums.csv":
             return self.__readSumsCsvFile__(path)
         else:
-            return dict()
+            return self.Checksums()
+
+    def __loadChecksumFile__(self, filePathName: str) -> dict:
+        """
+        Returns the checksums of *.sha256sum-/sums.csv-file >>filePathName<< like __getChecksumsFromFile__(). The last
+        file read is kept in memory and reused as long as its size and mtime are unchanged.
+        """
+        try:
+            stat = os.stat(filePathName)
+            key = (os.path.abspath(filePathName), stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            return self.__getChecksumsFromFile__(filePathName)
+        cachedKey, sumsDict = self.__checksumFileIndex
+        if cachedKey != key:
+            sumsDict = self.__getChecksumsFromFile__(filePathName)
+            self.__checksumFileIndex = (key, sumsDict)
+        return sumsDict
+
+    @staticmethod
+    def __lookupChecksumEntry__(sumsDict, sumsPath: str, filePath: str):
+        """
+        Returns the name under which >>filePath<< is listed in >>sumsDict<< of a checksum file in directory
+        >>sumsPath<<: its relative path ("/" separated) or else its file name. None, if it is not listed.
+        """
+        try:
+            relativePath = os.path.relpath(os.path.abspath(filePath), os.path.abspath(sumsPath))
+        except ValueError:
+            # different drive (Windows)
+            relativePath = None
+        if relativePath is not None:
+            relativePath = relativePath.replace(os.sep, "/")
+            if relativePath in sumsDict:
+                return relativePath
+            if "./" + relativePath in sumsDict:
+                return "./" + relativePath
+        fileName = os.path.basename(filePath)
+        if fileName in sumsDict:
+            return fileName
+        return None
 
     def __readSha256SumFile__(self, filePath: str, fileName: str) -> dict:
         """
-        Reads and decodes *.sha256sum-files and returns a filename / hash digest dictionary.
+        Reads and decodes *.sha256sum-files line by line and returns a filename / hash digest dictionary.
+        Supports text ("<digest>  <filename>") and binary ("<digest> *<filename>") entries, BSD style entries
+        ("SHA256 (<filename>) = <digest>") and escaped file names (line starting with a backslash). Invalid
+        lines are reported in >>BadLines<< of the returned dictionary.
 
         Parameters:
             filePath (str): Path to directory where *.sha256sum-file is located.
             fileName (str): Name of *.sha256sum-file with file extension.
 
         Returns:
-            dict:   dict[filename] = hash digest.
+            vrfy.Checksums:   dict[filename] = hash digest.
         """
-        sumsDict = dict()
-        # read and decode sums.csv into dictionary sumsDict[<<fileName>>] = <<hash digest>>
+        sumsDict = self.Checksums(algorithm=hasher.ALGORITHM_SHA256)
+        entries = []
         try:
-            with open(os.path.join(filePath, fileName), "r") as f:
-                for line in f.readlines():
-                    entry = line.replace("\n", "").split("  ")
-                    sumsDict[entry[1]] = entry[0]
+            with open(os.path.join(filePath, fileName), "r", newline="\n") as f:
+                for lineNumber, line in enumerate(f, 1):
+                    line = checksumFormat.StripLineEnd(line)
+                    if line == "":
+                        continue
+                    escaped = line.startswith("\\")
+                    if escaped:
+                        line = line[1:]
+                    if line.startswith("SHA256 (") and ") = " in line:
+                        separator = line.rindex(") = ")
+                        name, digest = line[8:separator], line[separator + 4:]
+                    else:
+                        digest, separator, name = line.partition(" ")
+                        if separator == "" or len(name) < 2 or name[0] not in (" ", "*"):
+                            sumsDict.BadLines.append((lineNumber, "invalid line format"))
+                            continue
+                        name = name[1:]
+                    if escaped:
+                        try:
+                            name = checksumFormat.Unescape(name)
+                        except ValueError:
+                            sumsDict.BadLines.append((lineNumber, "invalid escape sequence"))
+                            continue
+                    entries.append((lineNumber, name, digest.lower(), None))
+                    if len(entries) >= self.PARSER_CHUNK_SIZE:
+                        self.__addEntries__(sumsDict, entries)
+                        entries = []
         except OSError:
             # except file errors, and close verification with FAIL (i.e. "False" result)
-            return dict()
+            return self.Checksums(algorithm=hasher.ALGORITHM_SHA256)
+        self.__addEntries__(sumsDict, entries)
+        sumsDict.BadLines.sort()
         return sumsDict
 
     def __readSumsCsvFile__(self, filePath: str) -> dict:
         """
-        Reads and decodes sums.csv-files and returns a filename / hash digest dictionary.
+        Reads the sums.csv-file in directory >>filePath<<, see __parseSumsCsvFile__(). Parsing is timed by the profiler.
+        """
+        return self.__timed__(vrfyProfiler.PHASE_PARSE, filePath, self.__parseSumsCsvFile__, filePath)
+
+    def __parseSumsCsvFile__(self, filePath: str) -> dict:
+        """
+        Reads and decodes sums.csv-files line by line and returns a filename / hash digest dictionary.
+        The hash algorithm is taken from the header line, sums.csv-files without header use SHA256. Invalid lines are
+        reported in >>BadLines<< of the returned dictionary.
 
         Parameters:
             filePath (str): Path to directory where sums.csv-file is located.
 
         Returns:
-            dict:   dict[filename] = hash digest.
+            vrfy.Checksums:   dict[filename] = hash digest.
         """
         # read and decode sums.csv into dictionary sumsDict[<<fileName>>] = <<hash digest>>
-        sumsDict = dict()
+        sumsDict = self.Checksums()
+        entries = []
+        version = 1
         try:
-            with open(os.path.join(filePath, "sums.csv"), "r") as f:
-                for line in f.readlines():
-                    entry = line.replace("\n", "").split(";")
-                    # compatibility layer for legacy sums.csv, where hash digest started with "b'" and ended with "'"
-                    if entry[1][:2] == "b'" and entry[1][-1] == "'":
-                        entry[1] = entry[1][2:-1]
-                    sumsDict[entry[0]] = entry[1]
+            with open(os.path.join(filePath, "sums.csv"), "r", newline="\n") as f:
+                for lineNumber, line in enumerate(f, 1):
+                    line = checksumFormat.StripLineEnd(line)
+                    if lineNumber == 1 and self.__isSumsCsvHeader__(line):
+                        header = line.split(";")
+                        version = int(header[1])
+                        sumsDict.Algorithm = header[2]
+                        if version >= self.SUMS_VERSION_TREE:
+                            sumsDict.Directories = dict()
+                        continue
+                    if line == "":
+                        continue
+                    fileStat = None
+                    entry = line.rsplit(";", 3) if version >= 3 else []
+                    if len(entry) == 4 and entry[2].isdigit() and entry[3].isdigit():
+                        # file names may include ";", size and mtime are the last fields
+                        name, digest = entry[0], entry[1]
+                        fileStat = (int(entry[2]), int(entry[3]))
+                    else:
+                        name, separator, digest = line.rpartition(";")
+                        if separator == "":
+                            sumsDict.BadLines.append((lineNumber, "invalid line format"))
+                            continue
+                        # compatibility layer for legacy sums.csv, where hash digest started with "b'" and ended
+                        # with "'"
+                        if digest[:2] == "b'" and digest[-1:] == "'":
+                            digest = digest[2:-1]
+                    try:
+                        name = checksumFormat.UnquoteFileName(name)
+                    except ValueError:
+                        sumsDict.BadLines.append((lineNumber, "invalid quoted file name"))
+                        continue
+                    if sumsDict.Directories is not None and name.endswith("/") and fileStat is None:
+                        # sub-directory entry with its tree digest, "" if unknown
+                        digest = digest.lower()
+                        if digest != "" and (len(digest) != 2 * hashlib.sha256().digest_size or
+                                             not checksumFormat.IsHexDigest(digest)):
+                            sumsDict.BadLines.append((lineNumber, "invalid tree digest"))
+                            continue
+                        sumsDict.Directories[name[:-1]] = digest
+                        continue
+                    entries.append((lineNumber, name, digest.lower(), fileStat))
+                    if len(entries) >= self.PARSER_CHUNK_SIZE:
+                        self.__addEntries__(sumsDict, entries)
+                        entries = []
         except OSError:
             # except file errors, and close verification with FAIL (i.e. "False" result)
-            return dict()
+            return self.Checksums()
+        self.__addEntries__(sumsDict, entries)
+        sumsDict.BadLines.sort()
         return sumsDict
+
+    def __addEntries__(self, sumsDict, entries: list) -> None:
+        """
+        Validates the hash digests of parsed checksum file entries and adds them to >>sumsDict<<. Entries whose digest
+        does not match length and hex format of the algorithm are reported in >>sumsDict.BadLines<<.
+
+        Parameters:
+            sumsDict (vrfy.Checksums): Checksums to add the entries to.
+            entries (list): List of (line number, filename, hash digest, (size, mtime_ns) or None) tuples.
+        """
+        digestLength = 2 * hasher.DIGEST_SIZES.get(sumsDict.Algorithm, 0)
+        # validate all digests at once, look at single entries only if any of them is invalid
+        if not (all(len(entry[2]) == digestLength for entry in entries) and
+                checksumFormat.IsHexDigest("".join(entry[2] for entry in entries))):
+            validEntries = []
+            for entry in entries:
+                if len(entry[2]) != digestLength:
+                    sumsDict.BadLines.append((entry[0], "invalid hash digest length"))
+                elif not checksumFormat.IsHexDigest(entry[2]):
+                    sumsDict.BadLines.append((entry[0], "invalid hash digest"))
+                else:
+                    validEntries.append(entry)
+            entries = validEntries
+        sumsDict.Extend([entry[1] for entry in entries], [entry[2] for entry in entries])
+        for lineNumber, fileName, digest, fileStat in entries:
+            if fileStat is not None:
+                sumsDict.FileStats[fileName] = fileStat
+
+    def __writeSumsCsvFile__(self, filePath: str, algorithm: str, entries: list, directories: dict = None) -> None:
+        """
+        Writes sums.csv in directory >>filePath<<, replacing an existing file atomically.
+
+        Parameters:
+            filePath (str): Path to directory where sums.csv-file shall be written.
+            algorithm (str): Hash algorithm of the checksums.
+            entries (list): List of (filename, hash digest, size, mtime_ns) tuples. Format version 2 is written, if
+                            size or mtime_ns of any file is unknown (None).
+            directories (dict): Optional, dict[sub-directory name] = tree digest. Format version 4 is written, if
+                            given.
+        """
+        version = self.SUMS_VERSION
+        if directories is not None:
+            version = self.SUMS_VERSION_TREE
+        elif any(size is None or mtime is None for file, hashDigest, size, mtime in entries):
+            version = 2
+        with self.__openAtomic__(os.path.join(filePath, "sums.csv")) as f:
+            f.write(self.SUMS_HEADER + ";" + str(version) + ";" + algorithm + "\n")
+            for file, hashDigest, size, mtime in entries:
+                if version >= 3 and size is not None and mtime is not None:
+                    f.write(checksumFormat.QuoteFileName(str(file)) + ";" + str(hashDigest) + ";" + str(size) + ";" +
+                            str(mtime) + "\n")
+                else:
+                    f.write(checksumFormat.QuoteFileName(str(file)) + ";" + str(hashDigest) + "\n")
+            for directory in sorted(directories if directories is not None else []):
+                f.write(checksumFormat.QuoteFileName(str(directory) + "/") + ";" + directories[directory] + "\n")
+
+    @classmethod
+    def __isTemporaryFile__(cls, fileName: str) -> bool:
+        """
+        Returns True, if >>fileName<< is a temporary file of a checksum file, ".<checksum file>.<pid>.tmp".
+        """
+        if not fileName.startswith(".") or not fileName.endswith(".tmp"):
+            return False
+        for checksumFile in cls.CHECKSUM_FILES:
+            prefix = "." + checksumFile + "."
+            if fileName.startswith(prefix) and fileName[len(prefix):-len(".tmp")].isdigit():
+                return True
+        return False
+
+    @contextlib.contextmanager
+    def __openAtomic__(self, filePath: str):
+        """
+        Opens a temporary file for writing, which replaces >>filePath<< once it was written completely. The temporary
+        file gets removed, if writing fails.
+
+        Parameters:
+            filePath (str): Path + name of the file to (re)place.
+
+        Yields:
+            file: Text file object.
+        """
+        path, fileName = os.path.split(filePath)
+        tmpPath = os.path.join(path, "." + fileName + "." + str(os.getpid()) + ".tmp")
+        try:
+            with open(tmpPath, "w") as f:
+                yield f
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmpPath, filePath)
+        except BaseException:
+            try:
+                os.remove(tmpPath)
+            except OSError:
+                pass
+            raise
+
+    def __isSumsCsvHeader__(self, line: str) -> bool:
+        """
+        Returns True, if >>line<< is a versioned sums.csv header "#vrfy;<format version>;<hash algorithm>".
+        """
+        entry = line.rstrip("\n").split(";")
+        return len(entry) == 3 and entry[0] == self.SUMS_HEADER and entry[1].isdigit() and entry[2] in hasher.ALGORITHMS
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+import heapq
+import os
+import threading
+
+
+class vrfyProfiler:
+    """
+    Collects the time spent per directory in the phases of a run: reading directories ("scan"), parsing checksum
+    files and manifests ("parse"), the operation on the directory besides parsing, i.e. mainly waiting for hashing
+    ("process"), waiting for file reads and hashing of each file ("read"/"hash", summed over worker threads) and
+    printing results ("output"). The slowest files and directories are kept.
+
+    vrfy only calls a profiler if one was passed (vrfy(profiler=...)), i.e. disabled profiling costs a single
+    comparison per directory and file.
+    """
+    PHASE_SCAN = "scan"
+    PHASE_PARSE = "parse"
+    PHASE_PROCESS = "process"
+    PHASE_READ = "read"
+    PHASE_HASH = "hash"
+    PHASE_OUTPUT = "output"
+    PHASES = (PHASE_SCAN, PHASE_PARSE, PHASE_PROCESS, PHASE_READ, PHASE_HASH, PHASE_OUTPUT)
+    # phases of wall clock time, i.e. without the per-file times summed over threads
+    WALL_PHASES = (PHASE_SCAN, PHASE_PARSE, PHASE_PROCESS, PHASE_OUTPUT)
+
+    DEFAULT_TOP = 10
+
+    def __init__(self, top: int = DEFAULT_TOP):
+        """
+        Parameters:
+            top (int): Number of slowest files and directories to keep.
+        """
+        self.Top = max(0, int(top))
+        self.__lock = threading.Lock()
+        # dict[directory path] = dict[phase] = seconds
+        self.__directories = dict()
+        # min-heap of the slowest files: (seconds, path)
+        self.__slowFiles = []
+
+    def Add(self, phase: str, path: str, seconds: float) -> None:
+        """
+        Adds >>seconds<< to >>phase<< of directory >>path<<.
+        """
+        with self.__lock:
+            phases = self.__directories.setdefault(str(path), dict())
+            phases[phase] = phases.get(phase, 0.0) + seconds
+
+    def AddFile(self, filePath: str, readTime: float, hashTime: float) -> None:
+        """
+        Adds the read and hash time of a hashed file to its directory and to the slowest files.
+        """
+        filePath = str(filePath)
+        with self.__lock:
+            phases = self.__directories.setdefault(os.path.dirname(filePath), dict())
+            phases[self.PHASE_READ] = phases.get(self.PHASE_READ, 0.0) + readTime
+            phases[self.PHASE_HASH] = phases.get(self.PHASE_HASH, 0.0) + hashTime
+            if self.Top > 0:
+                if len(self.__slowFiles) < self.Top:
+                    heapq.heappush(self.__slowFiles, (readTime + hashTime, filePath))
+                elif readTime + hashTime > self.__slowFiles[0][0]:
+                    heapq.heapreplace(self.__slowFiles, (readTime + hashTime, filePath))
+
+    def Totals(self) -> dict:
+        """
+        Returns:
+            dict: dict[phase] = seconds, summed over all directories.
+        """
+        totals = {phase: 0.0 for phase in self.PHASES}
+        with self.__lock:
+            for phases in self.__directories.values():
+                for phase, seconds in phases.items():
+                    totals[phase] = totals.get(phase, 0.0) + seconds
+        return totals
+
+    def SlowestFiles(self) -> list:
+        """
+        Returns:
+            List[tuple]: (seconds, path) of the slowest files (read and hash time), slowest first.
+        """
+        with self.__lock:
+            return sorted(self.__slowFiles, reverse=True)
+
+    def SlowestDirectories(self) -> list:
+        """
+        Returns:
+            List[tuple]: (seconds, path) of the slowest directories (wall clock phases), slowest first.
+        """
+        with self.__lock:
+            times = [(sum(phases.get(phase, 0.0) for phase in self.WALL_PHASES), path)
+                     for path, phases in self.__directories.items()]
+        return heapq.nlargest(self.Top, times)
+
+    def WriteFolded(self, filePath: str) -> None:
+        """
+        Writes the wall clock phases per directory as folded stacks ("vrfy;<dir>;<sub-dir>;<phase> <microseconds>"),
+        e.g. as input of flamegraph.pl or speedscope. Time of the phase "process" excludes parsing.
+
+        Raises:
+            OSError: File can not be written.
+        """
+        with self.__lock:
+            directories = sorted(self.__directories.items())
+        with open(filePath, "w", errors="surrogateescape") as f:
+            for path, phases in directories:
+                frames = ["vrfy"] + [part.replace(";", "_") for part in os.path.normpath(path).split(os.sep)
+                                     if part not in ("", os.curdir)]
+                for phase in self.WALL_PHASES:
+                    seconds = phases.get(phase, 0.0)
+                    if phase == self.PHASE_PROCESS:
+                        # parsing happens within the operation on the directory and is reported on its own
+                        seconds -= phases.get(self.PHASE_PARSE, 0.0)
+                    microseconds = int(round(seconds * 1e6))
+                    if microseconds > 0:
+                        f.write(";".join(frames + [phase]) + " " + str(microseconds) + "\n")
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+import threading
+import time
+
+
+class vrfyStats:
+    """
+    Live counters of a vrfy instance: directories and files processed, bytes hashed, time spent waiting for reads
+    versus hashing, and hash cache hits. Optional totals (see vrfy.PreScan()) enable progress and ETA estimates.
+
+    Observers are called as observer(stats, event) with event "prescan", "file", "directory" or "done". "file"
+    events may be delivered from worker threads.
+    """
+    EVENT_PRESCAN = "prescan"
+    EVENT_FILE = "file"
+    EVENT_DIRECTORY = "directory"
+    EVENT_DONE = "done"
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__observers = []
+        self.Reset()
+
+    def Reset(self) -> None:
+        """
+        Sets all counters to zero and restarts the clock. Observers are kept.
+        """
+        with self.__lock:
+            self.StartTime = time.time()
+            self.EndTime = None
+            # totals of a pre-scan, None if unknown
+            self.TotalFiles = None
+            self.TotalBytes = None
+            # finished directories and the size of their files (hashed, cached or skipped)
+            self.Directories = 0
+            self.Files = 0
+            self.Bytes = 0
+            # files hashed so far, bytes read, and seconds spent waiting for reads and hashing (summed over threads)
+            self.HashedFiles = 0
+            self.HashedBytes = 0
+            self.ReadTime = 0.0
+            self.HashTime = 0.0
+            self.CacheHits = 0
+            self.CacheMisses = 0
+            # sub-trees skipped by vrfy.CompareTrees(), since their tree digests matched
+            self.SkippedTrees = 0
+            self.__hashedBytesAtDirectory = 0
+
+    def AddObserver(self, observer) -> None:
+        """
+        Registers callable >>observer<<(stats, event).
+        """
+        with self.__lock:
+            self.__observers.append(observer)
+
+    def RemoveObserver(self, observer) -> None:
+        """
+        Unregisters >>observer<<.
+        """
+        with self.__lock:
+            if observer in self.__observers:
+                self.__observers.remove(observer)
+
+    def SetTotals(self, totalFiles: int, totalBytes: int) -> None:
+        """
+        Sets the number of files and bytes expected to be processed.
+        """
+        with self.__lock:
+            self.TotalFiles = totalFiles
+            self.TotalBytes = totalBytes
+        self.__notify__(self.EVENT_PRESCAN)
+
+    def AddFile(self, numBytes: int, readTime: float, hashTime: float) -> None:
+        """
+        Counts a hashed file.
+        """
+        with self.__lock:
+            self.HashedFiles += 1
+            self.HashedBytes += numBytes
+            self.ReadTime += readTime
+            self.HashTime += hashTime
+        self.__notify__(self.EVENT_FILE)
+
+    def AddCacheLookups(self, hits: int, misses: int) -> None:
+        """
+        Counts hash cache lookups.
+        """
+        with self.__lock:
+            self.CacheHits += hits
+            self.CacheMisses += misses
+
+    def AddDirectory(self, numFiles: int, numBytes: int) -> None:
+        """
+        Counts a finished directory with >>numFiles<< files of >>numBytes<< total size.
+        """
+        with self.__lock:
+            self.Directories += 1
+            self.Files += numFiles
+            self.Bytes += numBytes
+            self.__hashedBytesAtDirectory = self.HashedBytes
+        self.__notify__(self.EVENT_DIRECTORY)
+
+    def AddSkippedTree(self) -> None:
+        """
+        Counts a sub-tree that did not need to be compared.
+        """
+        with self.__lock:
+            self.SkippedTrees += 1
+
+    def Finish(self) -> None:
+        """
+        Stops the clock of the run.
+        """
+        with self.__lock:
+            self.EndTime = time.time()
+        self.__notify__(self.EVENT_DONE)
+
+    def Elapsed(self) -> float:
+        """
+        Returns the seconds since start (until Finish(), if called).
+        """
+        return (self.EndTime if self.EndTime is not None else time.time()) - self.StartTime
+
+    def BytesPerSecond(self) -> float:
+        """
+        Returns the hashing throughput in bytes per second.
+        """
+        elapsed = self.Elapsed()
+        return self.HashedBytes / elapsed if elapsed > 0 else 0.0
+
+    def FilesPerSecond(self) -> float:
+        """
+        Returns the number of hashed files per second.
+        """
+        elapsed = self.Elapsed()
+        return self.HashedFiles / elapsed if elapsed > 0 else 0.0
+
+    def Progress(self):
+        """
+        Returns the processed fraction (0.0 to 1.0) of the pre-scanned bytes, or None without totals. Files of the
+        current directory count once they are hashed, cached and skipped files once their directory is finished.
+        """
+        if self.TotalBytes is None:
+            return None
+        if self.TotalBytes == 0:
+            return 1.0
+        done = self.Bytes + self.HashedBytes - self.__hashedBytesAtDirectory
+        return min(1.0, done / self.TotalBytes)
+
+    def ETA(self):
+        """
+        Returns the estimated number of seconds until the run is finished, or None if unknown.
+        """
+        progress = self.Progress()
+        if progress is None or progress <= 0.0:
+            return None
+        return self.Elapsed() * (1.0 - progress) / progress
+
+    def ToDict(self) -> dict:
+        """
+        Returns counters and derived rates as a JSON serializable dictionary.
+        """
+        return {"StartTime": self.StartTime, "EndTime": self.EndTime, "Elapsed": self.Elapsed(),
+                "TotalFiles": self.TotalFiles, "TotalBytes": self.TotalBytes, "Directories": self.Directories,
+                "Files": self.Files, "Bytes": self.Bytes, "HashedFiles": self.HashedFiles,
+                "HashedBytes": self.HashedBytes, "ReadTime": self.ReadTime, "HashTime": self.HashTime,
+                "CacheHits": self.CacheHits, "CacheMisses": self.CacheMisses, "SkippedTrees": self.SkippedTrees,
+                "BytesPerSecond": self.BytesPerSecond(), "FilesPerSecond": self.FilesPerSecond()}
+
+    def __notify__(self, event: str) -> None:
+        """
+        Calls all observers with >>event<<.
+        """
+        for observer in list(self.__observers):
+            observer(self, event)
+
+
+class statsRecorder:
+    """
+    Wraps hasher.CalcChecksumStats and counts each hashed file in a vrfyStats instance (and profiler) as soon as it is
+    finished.
+    In worker processes nothing is counted, the caller has to count the returned results (see Recorded).
+    """
+    def __init__(self, func, stats: vrfyStats, profiler=None):
+        """
+        Parameters:
+            func (callable): Function returning (digest, numBytes, readTime, hashTime), e.g. CalcChecksumStats.
+            stats (vrfyStats): Counters to update.
+            profiler (vrfyProfiler): Optional profiler that gets the read and hash time of each file.
+        """
+        self.__func = func
+        self.__stats = stats
+        self.__profiler = profiler
+        # number of results counted, only updated within the creating process
+        self.Recorded = 0
+
+    def __getstate__(self) -> dict:
+        # counters and observers stay in the creating process
+        return {"func": self.__func}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__func = state["func"]
+        self.__stats = None
+        self.__profiler = None
+        self.Recorded = 0
+
+    def __call__(self, item) -> tuple:
+        result = self.__func(item)
+        if self.__stats is not None:
+            self.__stats.AddFile(result[1], result[2], result[3])
+            if self.__profiler is not None:
+                self.__profiler.AddFile(item, result[2], result[3])
+            self.Recorded += 1
+        return result